@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+""" file:    bench_bbox.py (benchmarks)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Benchmark selecting collections from a COGJ header by bbox,
+        comparing a shapely intersects loop with the vectorized version used
+        by Geo_Serverless.get_collections_for_bbox
+
+    Run with `python benchmarks/bench_bbox.py` from the repository root.
+"""
+
+import pathlib
+import sys
+import timeit
+
+import numpy as np
+from shapely.geometry import box
+
+# Add the flask API folder to the path so we can load Geo_Serverless
+API_LOCATION = pathlib.Path(__file__).parent.parent / 'flask' / 'api'
+sys.path.insert(0, str(API_LOCATION))
+
+from geo_serverless import Geo_Serverless  # pylint: disable=C0413
+
+QUERY = "-1,-1,1,1"
+COUNTS = (100, 1000, 10000, 100000)
+
+def make_header(count, seed=42):
+    "Make a header with `count` randomly placed collections"
+    rand = np.random.RandomState(seed)
+    corners = rand.uniform(-90, 90, (count, 2))
+    bboxes = np.hstack([corners, corners + rand.uniform(0, 2, (count, 2))])
+    return {
+        "bbox": [-90, -90, 92, 92],
+        "collections": [
+            {"start": idx, "size": 1, "features": 1, "bbox": list(bbox)}
+            for idx, bbox in enumerate(bboxes)
+        ]
+    }
+
+def shapely_loop(header, bbox):
+    "The old version of get_collections_for_bbox"
+    filter_bbox = box(*[float(i) for i in bbox.split(",")])
+    return [c for c in header["collections"] if filter_bbox.intersects(box(*c["bbox"]))]
+
+def main():
+    "Run the benchmark and print a table of timings"
+    print("{:>12} {:>15} {:>15} {:>10}".format("collections", "shapely (ms)", "numpy (ms)", "speedup"))
+    for count in COUNTS:
+        geo = Geo_Serverless("http://localhost/dummy.json")
+        geo.header = make_header(count)
+        geo.get_collections_for_bbox(QUERY)  # warm up the cached bbox array
+
+        # Check we get the same answers
+        assert shapely_loop(geo.header, QUERY) == geo.get_collections_for_bbox(QUERY)
+
+        repeat = max(1, 10000 // count)
+        loop = min(timeit.repeat(lambda: shapely_loop(geo.header, QUERY), number=repeat, repeat=3)) / repeat
+        vect = min(timeit.repeat(lambda: geo.get_collections_for_bbox(QUERY), number=repeat, repeat=3)) / repeat
+        print("{:>12} {:>15.3f} {:>15.3f} {:>9.0f}x".format(count, loop * 1e3, vect * 1e3, loop / vect))
+
+if __name__ == '__main__':
+    main()
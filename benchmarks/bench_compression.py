@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+""" file:    bench_compression.py (benchmarks)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Benchmark compressing COGJ collections, comparing the bytes
+        a reader has to transfer (for the whole file and for a bbox query)
+        and the time to decode every collection, for each codec
+
+    Run with `python benchmarks/bench_compression.py` from the repository root.
+"""
+
+import json
+import pathlib
+import tempfile
+import timeit
+
+import numpy as np
+from shapely.geometry import LineString, shape
+
+from cogj import Feature
+from cogj.compression import available_codecs
+from cogj.reader import LocalReader
+from cogj.writer import Writer
+
+WATERCOURSE = pathlib.Path(__file__).parent.parent / 'jupyter' / 'resources' / 'watercourse.geojson'
+COUNTS = (10000, 100000)
+COLLECTION_SIZE = 1000
+
+def make_features(count, seed=42):
+    "Make `count` wiggly watercourse-ish linestrings"
+    rand = np.random.RandomState(seed)
+    starts = rand.uniform(110, 155, (count, 2)) - (0, 45)
+    return [
+        Feature(LineString(start + np.cumsum(rand.normal(0, 0.001, (20, 2)), axis=0)),
+                {'id': idx, 'name': 'creek {}'.format(idx), 'perennial': bool(idx % 2)})
+        for idx, start in enumerate(starts)
+    ]
+
+def load_watercourse():
+    "Load the watercourse sample, or None if it's not there (e.g. a git-lfs pointer)"
+    try:
+        with open(WATERCOURSE, 'rb') as src:
+            data = json.load(src)
+    except (OSError, ValueError):
+        return None
+    return [
+        Feature(shape(f['geometry']), f.get('properties'))
+        for f in data['features'] if f.get('geometry')
+    ]
+
+def query_bbox(header):
+    "A bbox covering about a tenth of the dataset in each direction"
+    minx, miny, maxx, maxy = header['bbox']
+    centre_x, centre_y = (minx + maxx) / 2, (miny + maxy) / 2
+    half_x, half_y = (maxx - minx) / 20, (maxy - miny) / 20
+    return (centre_x - half_x, centre_y - half_y, centre_x + half_x, centre_y + half_y)
+
+def decode_all(path):
+    "Decode every collection in a file"
+    with LocalReader(path) as reader:
+        return sum(1 for _ in reader.features())
+
+def run(name, features, tempdir):
+    "Write the features with each codec and print a row for each"
+    for codec in [None] + available_codecs():
+        path = pathlib.Path(tempdir) / '{}-{}.json'.format(name, codec)
+        with Writer(path, collection_size=COLLECTION_SIZE, codec=codec) as writer:
+            writer.extend(features)
+        with LocalReader(path) as reader:
+            total = sum(c['size'] for c in reader.header['collections'])
+            query = sum(c.entry['size'] for c in reader.query(query_bbox(reader.header)))
+        assert decode_all(path) == len(features)
+        decode = min(timeit.repeat(lambda: decode_all(path), number=1, repeat=3))
+        print("{:>12} {:>8} {:>8} {:>14.1f} {:>16.1f} {:>12.1f}".format(
+            name, len(features), codec or 'none', total / 1e6, query / 1e6, decode * 1e3))
+
+def main():
+    "Run the benchmark and print a table of sizes and timings"
+    print("{:>12} {:>8} {:>8} {:>14} {:>16} {:>12}".format(
+        "dataset", "features", "codec", "total (MB)", "bbox query (MB)", "decode (ms)"))
+    with tempfile.TemporaryDirectory() as tempdir:
+        watercourse = load_watercourse()
+        if watercourse is None:
+            print("{:>12} skipped, {} isn't available".format('watercourse', WATERCOURSE))
+        else:
+            run('watercourse', watercourse, tempdir)
+        for count in COUNTS:
+            run('synthetic', make_features(count), tempdir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+""" file:    bench_reproject.py (benchmarks)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Benchmark reprojecting a FeatureCollection. We compare the
+        original per-geometry path, which set up a new transformation for
+        every ring, with the per-geometry path using cached transformers,
+        and with `reproject_collection`, which transforms every coordinate
+        in the collection in one call
+
+    Run with `python benchmarks/bench_reproject.py` from the repository root.
+"""
+
+import timeit
+
+import numpy as np
+import pyproj
+from shapely.geometry import Point
+
+from cogj import Feature, FeatureCollection
+from cogj.reproject import GEOJSON_PROJ, get_projector, reproject, reproject_collection
+
+FROM_CRS = 'epsg:3112'
+COUNTS = (10, 100, 1000)
+
+def make_collection(count, seed=42):
+    "Make a collection of `count` parcel-ish polygons"
+    rand = np.random.RandomState(seed)
+    centres = rand.uniform(-1e6, 1e6, (count, 2))
+    return FeatureCollection([
+        Feature(Point(x, y).buffer(rand.uniform(10, 100), 4), {'idx': idx})
+        for idx, (x, y) in enumerate(centres)
+    ])
+
+def uncached_projector(from_crs, to_crs=GEOJSON_PROJ):
+    "A projector which sets up a new transformer on every call, like the original version"
+    def _project(*coords):
+        transformer = pyproj.Transformer.from_crs(from_crs, to_crs, always_xy=True)
+        return np.asarray(transformer.transform(*coords))
+    return _project
+
+def per_geometry(collection, projector):
+    "Reproject a collection one geometry at a time"
+    return FeatureCollection([reproject(f, projector=projector) for f in collection])
+
+def main():
+    "Run the benchmark and print a table of timings"
+    print("{:>10} {:>15} {:>15} {:>12} {:>17} {:>15}".format(
+        "features", "uncached (ms)", "per geom (ms)", "bulk (ms)",
+        "bulk vs uncached", "bulk vs cached"))
+    uncached, cached = uncached_projector(FROM_CRS), get_projector(FROM_CRS)
+    for count in COUNTS:
+        collection = make_collection(count)
+
+        # Check we get the same answers
+        output = reproject_collection(collection, FROM_CRS)
+        for projector in (uncached, cached):
+            expected = per_geometry(collection, projector)
+            assert all(a.geometry.equals_exact(b.geometry, 1e-9) for a, b in zip(expected, output))
+
+        # The per-geometry paths are slow enough that we only run them once
+        slow = timeit.timeit(lambda: per_geometry(collection, uncached), number=1)
+        loop = timeit.timeit(lambda: per_geometry(collection, cached), number=1)
+        bulk = min(timeit.repeat(lambda: reproject_collection(collection, FROM_CRS),
+                                 number=1, repeat=3))
+        print("{:>10} {:>15.1f} {:>15.1f} {:>12.1f} {:>16.1f}x {:>14.1f}x".format(
+            count, slow * 1e3, loop * 1e3, bulk * 1e3, slow / bulk, loop / bulk))
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,9 @@
 
 from ._version import __version__
 
-from .feature import Feature, FeatureCollection
+from .feature import Feature, FeatureCollection, LazyFeatureCollection
+from .columnar import ColumnarCollection
+from .table import AttributeTable
 from .filter import FeatureFilter
 from .resample import resample, resample_linestring_count
-from .reproject import get_projector, reproject
+from .reproject import get_projector, get_transformer, reproject, reproject_collection
@@ -7,7 +7,60 @@
 
 import click
 
+from ..compression import CODECS, get_codec
+from ..index import PACKERS
+from ..writer import convert, COLLECTION_SIZE
+
 @click.command("convert")
-def convert_command():
+@click.argument('source', type=click.Path(exists=True))
+@click.argument('sink', type=click.Path())
+@click.option('--layer', default=None,
+              help='The layer to read from the source. Defaults to the first layer')
+@click.option('--collection-size', '-n', default=COLLECTION_SIZE, show_default=True,
+              help='The maximum number of features in each collection')
+@click.option('--method', default='str', show_default=True, type=click.Choice(list(PACKERS)),
+              help='How to pack features into collections (Sort-Tile-Recursive or Hilbert)')
+@click.option('--name', default=None, help='A name for the dataset')
+@click.option('--description', default=None, help='A description of the dataset')
+@click.option('--spool-dir', default=None, type=click.Path(exists=True, file_okay=False),
+              help='Where to put temporary files. Defaults to the system temp directory')
+@click.option('--jobs', '-j', default=1, show_default=True, type=click.IntRange(min=0),
+              help='The number of processes to build collections with, 0 for one per CPU')
+@click.option('--precision', '-p', default=None, type=click.IntRange(min=0),
+              help='Round coordinates to this many decimal places (e.g. 6 for ~10cm in WGS84)')
+@click.option('--grid', default=None, type=click.FloatRange(min=0, min_open=True),
+              help='Snap coordinates to a grid with this spacing instead')
+@click.option('--codec', default=None, type=click.Choice(CODECS),
+              help='Compress each collection with this codec (zstd needs the zstandard package)')
+@click.option('--compression-level', default=None, type=int,
+              help="The compression level. Defaults to the codec's default")
+def convert_command(source, sink, layer, collection_size, method, name, description,  # pylint: disable=R0913
+                    spool_dir, jobs, precision, grid, codec, compression_level):
     "Convert a vector file format to Cloud-Optimized GeoJson (COGJ)"
-    click.echo('Not implemented yet!')
+    if precision is not None and grid is not None:
+        raise click.UsageError('Only one of --precision or --grid can be given')
+    if codec is not None:
+        try:
+            get_codec(codec)
+        except ValueError as err:
+            raise click.BadParameter(str(err), param_hint='--codec')
+    metadata = {
+        key: value
+        for key, value in (('name', name), ('description', description))
+        if value is not None
+    }
+    header = convert(
+        source, sink,
+        layer=layer,
+        metadata=metadata,
+        collection_size=collection_size,
+        partition=method,
+        spool_dir=spool_dir,
+        jobs=jobs,
+        precision=precision,
+        grid=grid,
+        codec=codec,
+        compression_level=compression_level
+    )
+    click.echo('Wrote {0} features in {1} collections to {2}'.format(
+        header['features'], len(header['collections']), sink))
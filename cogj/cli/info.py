@@ -5,11 +5,71 @@
     description: Returns information about COGJ files
 """
 
+import json
+
 import click
 
+from ..reader import read_header, header_summary, is_url
+
+def _bytes(size):
+    "Format a number of bytes for humans"
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if abs(size) < 1000:
+            break
+        size /= 1000
+    else:
+        unit = 'TB'
+    return '{:.0f} {}'.format(size, unit) if unit == 'B' else '{:.1f} {}'.format(size, unit)
+
+def _format(source, summary):
+    "Format a header summary as text"
+    lines = ['File: {}'.format(source)]
+    for key in ('name', 'description', 'version', 'published'):
+        if key in summary:
+            lines.append('{}: {}'.format(key.capitalize(), summary[key]))
+    if summary['size'] is not None:
+        lines.append('Size: {} (header {})'.format(
+            _bytes(summary['size']), _bytes(summary['header_size'])))
+    lines.append('Features: {} in {} collections'.format(
+        summary['features'], summary['collections']))
+    if summary['bbox'] is not None:
+        lines.append('Bounding box: {}'.format(', '.join(map(str, summary['bbox']))))
+    if summary['collections']:
+        sizes, counts = summary['collection_bytes'], summary['collection_features']
+        lines.append('Collection sizes: {} min, {} median, {} max'.format(
+            _bytes(sizes['min']), _bytes(sizes['median']), _bytes(sizes['max'])))
+        lines.append('Features per collection: {} min, {:.0f} median, {} max'.format(
+            counts['min'], counts['median'], counts['max']))
+    if summary['codecs']:
+        lines.append('Compression: {} ({} uncompressed, {:.1f}x)'.format(
+            ', '.join(summary['codecs']), _bytes(summary['uncompressed_bytes']),
+            summary['compression_ratio']))
+    if summary['overlap_ratio'] is not None:
+        lines.append('Overlap ratio: {:.3f} (bbox intersection area / collection bbox area)'.format(
+            summary['overlap_ratio']))
+    if summary['coverage_ratio'] is not None:
+        lines.append('Coverage ratio: {:.3f} (collection bbox area / dataset bbox area)'.format(
+            summary['coverage_ratio']))
+    return '\n'.join(lines)
+
 @click.command('info')
-def info_command():
+@click.argument('source')
+@click.option('--json', 'as_json', is_flag=True, default=False,
+              help='Print the information as JSON for scripting')
+def info_command(source, as_json):
     """
-    Return information about this file
+    Return information about a COGJ file, which can be local or a URL
+
+    Only the header is read (with an HTTP range request for URLs), so this
+    is quick no matter how big the file is.
     """
-    click.echo('Not implemented yet')
+    try:
+        summary = header_summary(read_header(source))
+    except (OSError, ValueError) as err:
+        raise click.ClickException('Could not read header from {}: {}'.format(source, err))
+    if not is_url(source):
+        source = click.format_filename(source)
+    if as_json:
+        click.echo(json.dumps(dict(summary, source=source)))
+    else:
+        click.echo(_format(source, summary))
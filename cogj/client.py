@@ -0,0 +1,436 @@
+""" file:    client.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Read remote COGJ files over HTTP. Requests go through a
+        pool of keep-alive connections, nearby collections are merged into
+        one range request, and requests are made concurrently, so features
+        arrive as each collection is downloaded.
+"""
+
+import asyncio
+import http.client
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .reader import TIMEOUT, _read_header, decode_collection, overlapping, features_in_bbox, \
+    collection_bounds
+from .utilities import bounded_map
+
+# Collections closer together than this (in bytes) get fetched in one request
+DEFAULT_GAP = 64 * 1024
+
+# Don't merge collections into requests bigger than this (in bytes)
+DEFAULT_MAX_SIZE = 8 * 1024 * 1024
+
+# Number of range requests to have in flight at once
+DEFAULT_CONCURRENCY = 8
+
+# Errors we get when the server has closed a keep-alive connection on us
+STALE_CONNECTION = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+class RequestError(OSError):
+
+    "Raised when the server doesn't give us the bytes we asked for"
+
+def coalesce(ranges, gap=DEFAULT_GAP, max_size=DEFAULT_MAX_SIZE):
+    """
+    Merge byte ranges which are close together
+
+    Parameters:
+        ranges - a list of (start, size) ranges
+        gap - merge ranges which are at most this many bytes apart. Use a
+            negative gap to never merge ranges.
+        max_size - don't merge ranges into requests bigger than this
+
+    Returns:
+        a list of (start, end, members) tuples where end is exclusive and
+        members are the indices of the ranges covered by the merged range
+    """
+    order = sorted(range(len(ranges)), key=lambda idx: ranges[idx][0])
+    merged = []
+    for idx in order:
+        start, size = ranges[idx]
+        end = start + size
+        if merged:
+            last_start, last_end, members = merged[-1]
+            if start - last_end <= gap and max(end, last_end) - last_start <= max_size:
+                merged[-1] = (last_start, max(end, last_end), members + [idx])
+                continue
+        merged.append((start, end, [idx]))
+    return merged
+
+class RateLimiter:
+
+    """
+    Space requests out so we make at most `rate` per second
+
+    Parameters:
+        rate - the maximum number of requests per second, or None for no limit
+    """
+
+    def __init__(self, rate=None):
+        if rate is not None and rate <= 0:
+            raise ValueError('Rate limit should be positive, not {}'.format(rate))
+        self.rate = rate
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        "Block until we're allowed to make another request"
+        if self.rate is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + 1 / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+class ConnectionPool:
+
+    """
+    A pool of HTTP/1.1 keep-alive connections to one server
+
+    Connections are opened as they're needed and kept for reuse, so
+    concurrent requests each get their own connection but we don't pay for
+    a new connection (and TLS handshake) on every request.
+
+    Parameters:
+        url - a URL on the server
+        size - the maximum number of idle connections to keep
+        timeout - seconds to wait for the server
+        rate - the maximum number of requests per second. Optional, defaults
+            to no limit.
+    """
+
+    def __init__(self, url, size=DEFAULT_CONCURRENCY, timeout=TIMEOUT, rate=None):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError('Expected an HTTP(S) URL, not {}'.format(url))
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == 'https' \
+            else http.client.HTTPConnection
+        self.host, self.port = parts.hostname, parts.port
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate)
+        self.opened = 0
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        with self._lock:
+            self.opened += 1
+        return self._connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(self, method, path, headers=None):
+        """
+        Make a request, reading the whole response
+
+        Parameters:
+            method - the HTTP method
+            path - the path (and query string) to request
+            headers - a dictionary of request headers
+
+        Returns:
+            the response status, headers and body
+        """
+        self.limiter.wait()
+        try:
+            connection, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self._connect(), False
+        try:
+            try:
+                connection.request(method, path, headers=headers or {})
+                response = connection.getresponse()
+            except STALE_CONNECTION:
+                if not reused:
+                    raise
+                # The server closed the connection while it was idle, try a fresh one
+                connection.close()
+                connection = self._connect()
+                connection.request(method, path, headers=headers or {})
+                response = connection.getresponse()
+            body = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        return response.status, response.headers, body
+
+    def close(self):
+        "Close all the idle connections"
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class Client:
+
+    """
+    Read a remote COGJ file
+
+    The header is fetched once and cached. Collections overlapping a bbox
+    are found from the header, nearby collections are merged into single
+    range requests, and up to `concurrency` requests are in flight at once
+    over a pool of keep-alive connections.
+
+    Parameters:
+        url - the URL of the COGJ file
+        concurrency - the number of requests to have in flight at once.
+            Optional, defaults to 8.
+        rate - the maximum number of requests per second. Optional, defaults
+            to no limit.
+        gap - merge collections which are at most this many bytes apart
+            into one request. Optional, defaults to 64 kB.
+        max_size - don't merge collections into requests bigger than this.
+            Optional, defaults to 8 MB.
+        timeout - seconds to wait for the server. Optional, defaults to 30.
+        backend - the JSON backend to decode collections with (see
+            `cogj.encoding.get_loader`)
+
+    Use as a context manager, or call `close` when you're done.
+    """
+
+    def __init__(self, url, concurrency=DEFAULT_CONCURRENCY, rate=None, gap=DEFAULT_GAP,
+                 max_size=DEFAULT_MAX_SIZE, timeout=TIMEOUT, backend=None):
+        if concurrency < 1:
+            raise ValueError('Concurrency should be at least 1, not {}'.format(concurrency))
+        self.url = url
+        parts = urlsplit(url)
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.concurrency = concurrency
+        self.gap, self.max_size = gap, max_size
+        self.backend = backend
+        self.pool = ConnectionPool(url, size=concurrency, timeout=timeout, rate=rate)
+        self._header = self._bounds = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        "Close the connections to the server"
+        self.pool.close()
+
+    def fetch(self, start, end):
+        """
+        Fetch a range of bytes from the file
+
+        Parameters:
+            start - the first byte to fetch
+            end - the byte after the last one to fetch
+
+        Returns:
+            the bytes. There might be fewer than we asked for if the range
+            runs past the end of the file.
+
+        Raises:
+            RequestError if the server doesn't send the bytes
+        """
+        status, _, body = self.pool.request(
+            'GET', self.path, headers={'Range': 'bytes={}-{}'.format(start, end - 1)})
+        if status == 206:
+            return body
+        if status == 200:
+            # The server ignored the range and sent the whole file
+            return body[start:end]
+        raise RequestError('Got status {} reading bytes {}-{} from {}'.format(
+            status, start, end - 1, self.url))
+
+    @property
+    def header(self):
+        "The header of the file, fetched the first time we need it"
+        if self._header is None:
+            self._header = _read_header(lambda size: self.fetch(0, size), self.url)
+            self._bounds = collection_bounds(self._header)
+        return self._header
+
+    def collections(self, bbox=None):
+        """
+        Find the collections overlapping a bounding box
+
+        Parameters:
+            bbox - a (minx, miny, maxx, maxy) bounding box. Optional, if
+                None we return all the collections.
+
+        Returns:
+            a list of collection entries from the header
+        """
+        collections = self.header['collections']
+        if bbox is None:
+            return list(collections)
+        return [collections[idx] for idx in overlapping(self._bounds, bbox)]
+
+    def _requests(self, collections):
+        "Merge the ranges for some collections into (start, end, collections) requests"
+        ranges = [(c['start'], c['size']) for c in collections]
+        return [
+            (start, end, [collections[idx] for idx in members])
+            for start, end, members in coalesce(ranges, gap=self.gap, max_size=self.max_size)
+        ]
+
+    def _fetch_collections(self, start, end, collections):
+        "Fetch a merged request, splitting it into (collection, bytes) pairs"
+        data = self.fetch(start, end)
+        result = []
+        for collection in collections:
+            offset = collection['start'] - start
+            body = data[offset:offset + collection['size']]
+            if len(body) != collection['size']:
+                raise RequestError('Collection at {} runs past the end of {}'.format(
+                    collection['start'], self.url))
+            result.append((collection, body))
+        return result
+
+    def _decode_collections(self, start, end, collections):
+        "Fetch and decode a merged request into (collection, features) pairs"
+        return [
+            (collection, decode_collection(data, collection, self.backend))
+            for collection, data in self._fetch_collections(start, end, collections)
+        ]
+
+    def iter_collections(self, collections, decode=False):
+        """
+        Fetch collections, yielding them as they arrive (which won't be in
+        the same order as they were asked for)
+
+        Parameters:
+            collections - a list of collection entries from the header
+            decode - if True, yield the features in each collection rather
+                than its bytes. Optional, defaults to False.
+
+        Yields:
+            (collection, bytes) pairs with the bytes as stored in the file
+            (so compressed if the collection has a codec), or (collection,
+            features) pairs if decode is True
+        """
+        func = self._decode_collections if decode else self._fetch_collections
+        requests = self._requests(list(collections))
+        if len(requests) <= 1 or self.concurrency == 1:
+            for request in requests:
+                yield from func(*request)
+            return
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(requests))) as executor:
+            for result in bounded_map(executor, func, requests, self.concurrency, ordered=False):
+                yield from result
+
+    def features(self, bbox=None):
+        """
+        Read features, decoding each collection as it arrives
+
+        Parameters:
+            bbox - a (minx, miny, maxx, maxy) bounding box. Optional, if
+                given we only fetch the collections overlapping the bbox,
+                and only yield features which overlap it.
+
+        Yields:
+            `cogj.Feature` objects
+        """
+        for _, features in self.iter_collections(self.collections(bbox), decode=True):
+            if bbox is None:
+                yield from features
+            else:
+                yield from features_in_bbox(features, bbox)
+
+class AsyncClient:
+
+    """
+    Read a remote COGJ file from asyncio code
+
+    This takes the same arguments as `Client`, and the requests go through
+    the same connection pool - they're made (and collections decoded) on a
+    pool of `concurrency` threads so they don't block the event loop.
+
+        async with AsyncClient(url) as client:
+            async for feature in client.features(bbox):
+                ...
+    """
+
+    def __init__(self, url, **kwargs):
+        self.client = Client(url, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=self.client.concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        "Close the connections to the server"
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def fetch(self, start, end):
+        "Fetch a range of bytes from the file, see `Client.fetch`"
+        return await self._run(self.client.fetch, start, end)
+
+    async def header(self):
+        "Return the header of the file, fetching it the first time"
+        if self.client._header is None:  # pylint: disable=W0212
+            await self._run(lambda: self.client.header)
+        return self.client.header
+
+    async def collections(self, bbox=None):
+        "Find the collections overlapping a bounding box, see `Client.collections`"
+        await self.header()
+        return self.client.collections(bbox)
+
+    async def iter_collections(self, collections, decode=False):
+        """
+        Fetch collections, yielding them as they arrive. See
+        `Client.iter_collections`.
+        """
+        client = self.client
+        func = client._decode_collections if decode else client._fetch_collections  # pylint: disable=W0212
+        requests = iter(client._requests(list(collections)))  # pylint: disable=W0212
+        pending = set()
+        try:
+            while True:
+                for request in requests:
+                    pending.add(self._run(func, *request))
+                    if len(pending) >= client.concurrency:
+                        break
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def features(self, bbox=None):
+        """
+        Read features, decoding each collection as it arrives. See
+        `Client.features`.
+        """
+        async for _, features in self.iter_collections(await self.collections(bbox), decode=True):
+            if bbox is None:
+                for feature in features:
+                    yield feature
+            else:
+                for feature in features_in_bbox(features, bbox):
+                    yield feature
@@ -0,0 +1,337 @@
+""" file:    columnar.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Columnar (GeoArrow-style) storage for feature collections -
+        all coordinates in one contiguous buffer plus offset arrays, so
+        bulk operations can run over a single array
+"""
+
+import struct
+import sys
+
+import numpy as np
+from shapely import wkb, wkt
+
+from . import kernels
+from .feature import Feature, FeatureCollection
+
+# Geometry type codes, these match the WKB/GeoArrow codes
+NULL, POINT, LINESTRING, POLYGON, MULTIPOINT, MULTILINESTRING, MULTIPOLYGON = range(7)
+TYPE_CODES = {
+    'Point': POINT,
+    'LineString': LINESTRING,
+    'Polygon': POLYGON,
+    'MultiPoint': MULTIPOINT,
+    'MultiLineString': MULTILINESTRING,
+    'MultiPolygon': MULTIPOLYGON
+}
+GEOMETRY_TYPES = {code: name for name, code in TYPE_CODES.items()}
+
+# WKB flag for geometries with z coordinates (the EWKB convention GEOS uses)
+WKB_Z = 0x80000000
+
+# Byte order marker for WKB we write, we use native order so coordinate
+# buffers can be copied straight in
+WKB_ORDER = b'\x01' if sys.byteorder == 'little' else b'\x00'
+UINT32 = struct.Struct('=I')
+HEADER = struct.Struct('=cI')
+HEADER_COUNT = struct.Struct('=cII')
+
+def _read_wkb(data, pos, ndim):
+    """
+    Read the geometry starting at `pos` in a WKB buffer into parts, each of
+    which is a list of rings, each of which is an (n, ndim) array of
+    coordinates viewing the buffer.
+
+    Everything gets the same three levels of nesting: a LineString is one part
+    with one ring, a MultiPoint is one part per point with a single-vertex
+    ring each, and so on.
+
+    Returns:
+        the parts, and the position of the end of the geometry
+    """
+    order = '<' if data[pos] == 1 else '>'
+    dtype = np.dtype(order + 'f8')
+    uint32 = struct.Struct(order + 'I')
+    kind = uint32.unpack_from(data, pos + 1)[0]
+    pos += 5
+    has_z = bool(kind & WKB_Z) or (kind & 0xffff) // 1000 in (1, 3)
+    kind = (kind & 0xffff) % 1000
+    if (3 if has_z else 2) != ndim:
+        raise ValueError('All geometries must have the same number of dimensions')
+
+    def _ring(pos):
+        size = uint32.unpack_from(data, pos)[0]
+        ring = np.frombuffer(data, dtype, count=size * ndim, offset=pos + 4)
+        return ring.reshape((size, ndim)), pos + 4 + 8 * size * ndim
+
+    if kind == POINT:
+        return [[np.frombuffer(data, dtype, count=ndim, offset=pos).reshape((1, ndim))]], \
+            pos + 8 * ndim
+    if kind == LINESTRING:
+        ring, pos = _ring(pos)
+        return [[ring]], pos
+    count = uint32.unpack_from(data, pos)[0]
+    pos += 4
+    if kind == POLYGON:
+        rings = []
+        for _ in range(count):
+            ring, pos = _ring(pos)
+            rings.append(ring)
+        return [rings], pos
+    if kind in (MULTIPOINT, MULTILINESTRING, MULTIPOLYGON):
+        parts = []
+        for _ in range(count):
+            part, pos = _read_wkb(data, pos, ndim)
+            parts.extend(part)
+        return parts, pos
+    raise ValueError("Don't know how to read WKB geometry type {}".format(kind))
+
+def _parts(geom, ndim):
+    """
+    Split a geometry into parts (see `_read_wkb`). We go through WKB since
+    it gets us all the coordinates with one call into GEOS, rather than a
+    round trip per ring.
+    """
+    if geom is None or geom.is_empty:
+        return []
+    return _read_wkb(geom.wkb, 0, ndim)[0]
+
+def _gather(offsets, index):
+    """
+    Select items from a ragged array
+
+    Parameters:
+        offsets - an (n + 1,) array of offsets into the next level down
+        index - the items to select
+
+    Returns:
+        the new offsets, and the indices of the selected items in the next
+        level down
+    """
+    starts, counts = offsets[index], offsets[index + 1] - offsets[index]
+    new_offsets = np.append(0, np.cumsum(counts)).astype(np.int64)
+    positions = np.arange(new_offsets[-1]) - np.repeat(new_offsets[:-1], counts)
+    return new_offsets, np.repeat(starts, counts) + positions
+
+class ColumnarCollection:
+
+    """
+    A FeatureCollection stored as flat arrays
+
+    All the coordinates live in one contiguous (n, ndim) float64 array. Offset
+    arrays map geometries to parts, parts to rings and rings to coordinates:
+    the coordinates of ring `i` are `coords[ring_offsets[i]:ring_offsets[i + 1]]`
+    and so on up the levels. The type code for each geometry says how to put
+    the parts back together (see `TYPE_CODES`).
+
+    Parameters:
+        coords - an (n, ndim) array of coordinates
+        geometry_offsets - an (ngeometries + 1,) array of offsets into parts
+        part_offsets - an (nparts + 1,) array of offsets into rings
+        ring_offsets - an (nrings + 1,) array of offsets into coords
+        type_codes - an (ngeometries,) array of geometry type codes
+        properties - a list of property dicts, one per geometry. Optional,
+            defaults to None for every geometry
+    """
+
+    geom_type = 'FeatureCollection'
+
+    def __init__(self, coords, geometry_offsets, part_offsets, ring_offsets,
+                 type_codes, properties=None):
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.geometry_offsets = np.asarray(geometry_offsets, dtype=np.int64)
+        self.part_offsets = np.asarray(part_offsets, dtype=np.int64)
+        self.ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+        self.type_codes = np.asarray(type_codes, dtype=np.uint8)
+        self.properties = list(properties) if properties is not None \
+            else [None] * len(self.type_codes)
+
+        # Check everything lines up
+        if self.coords.ndim != 2:
+            raise ValueError('Coordinates should be an (n, ndim) array')
+        levels = (
+            (self.geometry_offsets, len(self.part_offsets) - 1),
+            (self.part_offsets, len(self.ring_offsets) - 1),
+            (self.ring_offsets, len(self.coords))
+        )
+        for offsets, size in levels:
+            if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != size \
+                    or np.any(np.diff(offsets) < 0):
+                raise ValueError('Offsets should increase from 0 to the size of the next level')
+        if not len(self.type_codes) == len(self.properties) == len(self.geometry_offsets) - 1:
+            raise ValueError('Need one type code and set of properties per geometry')
+
+    @classmethod
+    def from_features(cls, objects):
+        """
+        Pack features into flat arrays
+
+        Parameters:
+            objects - an iterable of `cogj.Feature` or `shapely.geometry`
+                objects, or a `cogj.FeatureCollection`
+
+        Returns:
+            a ColumnarCollection instance
+        """
+        features = [obj if isinstance(obj, Feature) else Feature(obj) for obj in objects]
+        ndim = 3 if any(f.geometry is not None and f.geometry.has_z for f in features) else 2
+
+        coords, type_codes = [], []
+        geometry_offsets, part_offsets, ring_offsets = [0], [0], [0]
+        for feature in features:
+            geom = feature.geometry
+            if geom is None or (geom.is_empty and geom.geom_type == 'GeometryCollection'):
+                # Untyped empty geometries are stored as nulls
+                type_codes.append(NULL)
+            else:
+                try:
+                    type_codes.append(TYPE_CODES[geom.geom_type])
+                except KeyError:
+                    raise ValueError("Don't know how to store a {}".format(geom.geom_type))
+            parts = _parts(geom, ndim)
+            for rings in parts:
+                for ring in rings:
+                    coords.append(ring)
+                    ring_offsets.append(ring_offsets[-1] + len(ring))
+                part_offsets.append(part_offsets[-1] + len(rings))
+            geometry_offsets.append(geometry_offsets[-1] + len(parts))
+
+        return cls(
+            coords=np.vstack(coords) if coords else np.empty((0, ndim)),
+            geometry_offsets=geometry_offsets,
+            part_offsets=part_offsets,
+            ring_offsets=ring_offsets,
+            type_codes=type_codes,
+            properties=[f.properties for f in features]
+        )
+
+    @property
+    def coordinate_offsets(self):
+        "Return an (ngeometries + 1,) array of offsets straight into coords"
+        return self.ring_offsets[self.part_offsets[self.geometry_offsets]]
+
+    @property
+    def bounds(self):
+        """
+        Return an (ngeometries, 4) array of (minx, miny, maxx, maxy) bounds
+
+        Bounds are calculated over the coordinate buffer in one go. Empty and
+        null geometries get NaN bounds.
+        """
+        return kernels.bounds(self.coords, self.coordinate_offsets)
+
+    def with_coords(self, coords):
+        """
+        Return a new collection with the same structure but new coordinates
+
+        Useful for bulk operations (e.g. reprojection) which map the whole
+        coordinate buffer at once. The offsets are shared.
+
+        Parameters:
+            coords - the new (n, ndim) coordinate array, must be the same
+                length as the current one
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        if len(coords) != len(self.coords):
+            raise ValueError('Expected {} coordinates, got {}'.format(len(self.coords), len(coords)))
+        return type(self)(
+            coords, self.geometry_offsets, self.part_offsets,
+            self.ring_offsets, self.type_codes, self.properties
+        )
+
+    def take(self, index):
+        """
+        Select geometries (and their properties) from the collection
+
+        Parameters:
+            index - an array of geometry indices, or a boolean mask
+
+        Returns:
+            a new ColumnarCollection
+        """
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        index = index.astype(np.int64)
+        geometry_offsets, parts = _gather(self.geometry_offsets, index)
+        part_offsets, rings = _gather(self.part_offsets, parts)
+        ring_offsets, coords = _gather(self.ring_offsets, rings)
+        return type(self)(
+            self.coords[coords], geometry_offsets, part_offsets, ring_offsets,
+            self.type_codes[index], [self.properties[i] for i in index.tolist()]
+        )
+
+    def geometry(self, idx):
+        """
+        Build the shapely geometry at index idx
+
+        Parameters:
+            idx - the index of the geometry
+
+        Returns:
+            the shapely geometry, or None for a null geometry
+        """
+        code = int(self.type_codes[idx])
+        if code == NULL:
+            return None
+        first, last = self.geometry_offsets[idx:idx + 2].tolist()
+        if first == last:
+            return wkt.loads('{} EMPTY'.format(GEOMETRY_TYPES[code]))
+        return wkb.loads(self._wkb(code, first, last))
+
+    def _wkb(self, code, first, last):
+        """
+        Write the geometry made of parts first to last as WKB, copying
+        coordinates straight out of the buffer
+        """
+        flag = WKB_Z if self.coords.shape[1] == 3 else 0
+        part_offsets = self.part_offsets[first:last + 1].tolist()
+        ring_offsets = self.ring_offsets[part_offsets[0]:part_offsets[-1] + 1].tolist()
+        base = part_offsets[0]
+
+        def _ring(ring, closed=False):
+            start, end = ring_offsets[ring - base], ring_offsets[ring - base + 1]
+            coords = self.coords[start:end]
+            if closed and len(coords) and coords[0].tolist() != coords[-1].tolist():
+                # Polygon rings have to be closed in WKB (shapely closes them for us
+                # when we build polygons from coordinates)
+                return UINT32.pack(len(coords) + 1) + coords.tobytes() + coords[0].tobytes()
+            return UINT32.pack(len(coords)) + coords.tobytes()
+
+        def _single(kind, part):
+            rings = range(part_offsets[part - first], part_offsets[part - first + 1])
+            if kind == POINT:
+                start = ring_offsets[rings[0] - base]
+                return HEADER.pack(WKB_ORDER, kind | flag) + self.coords[start].tobytes()
+            if kind == LINESTRING:
+                return HEADER.pack(WKB_ORDER, kind | flag) + _ring(rings[0])
+            return HEADER_COUNT.pack(WKB_ORDER, kind | flag, len(rings)) \
+                + b''.join(_ring(ring, closed=True) for ring in rings)
+
+        if code in (POINT, LINESTRING, POLYGON):
+            return _single(code, first)
+        # Multi-part types are the single-part codes plus three
+        return HEADER_COUNT.pack(WKB_ORDER, code | flag, last - first) \
+            + b''.join(_single(code - 3, part) for part in range(first, last))
+
+    @property
+    def geometries(self):
+        "Return iterator over geometries"
+        for idx in range(len(self)):
+            yield self.geometry(idx)
+
+    def to_features(self):
+        "Return a FeatureCollection with the same geometries and properties"
+        return FeatureCollection([
+            Feature(geom, props)
+            for geom, props in zip(self.geometries, self.properties)
+        ])
+
+    def __len__(self):
+        return len(self.type_codes)
+
+    def __iter__(self):
+        for geom, props in zip(self.geometries, self.properties):
+            yield Feature(geom, props)
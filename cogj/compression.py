@@ -0,0 +1,120 @@
+""" file:    compression.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Compress COGJ collections one at a time, so the file stays
+        range-addressable. Each collection entry in the header records the
+        codec it was compressed with, and readers decompress transparently.
+"""
+
+import collections
+import zlib
+from functools import lru_cache
+
+# Codecs we know about. gzip comes with Python, zstd needs the zstandard package
+CODECS = ('gzip', 'zstd')
+
+# wbits for zlib to write and read gzip (rather than raw zlib) streams
+GZIP_WBITS = 31
+
+Codec = collections.namedtuple('Codec', 'name compress decompress')
+
+def _gzip_compress(data, level=None):
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, GZIP_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+def _gzip_decompress(data):
+    return zlib.decompress(data, GZIP_WBITS)
+
+def _zstd():
+    try:
+        import zstandard  # pylint: disable=C0415
+    except ImportError:
+        raise ValueError('zstd compression needs the zstandard package (pip install zstandard)')
+
+    def _compress(data, level=None):
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+
+    def _decompress(data):
+        # Frames written by ZstdCompressor.compress record their size, so
+        # we don't need to give a maximum output size
+        return zstandard.ZstdDecompressor().decompress(data)
+    return Codec('zstd', _compress, _decompress)
+
+@lru_cache(maxsize=None)
+def get_codec(name):
+    """
+    Get a codec by name
+
+    Parameters:
+        name - one of 'gzip' or 'zstd'
+
+    Returns:
+        a Codec with `compress(data, level=None)` and `decompress(data)`
+        functions
+
+    Raises:
+        ValueError if the codec is unknown or its package isn't installed
+    """
+    if name == 'gzip':
+        return Codec('gzip', _gzip_compress, _gzip_decompress)
+    if name == 'zstd':
+        return _zstd()
+    raise ValueError('Unknown codec {}, expected one of {}'.format(name, ', '.join(CODECS)))
+
+def available_codecs():
+    "Return the names of the codecs we can use with the packages installed"
+    available = []
+    for name in CODECS:
+        try:
+            get_codec(name)
+        except ValueError:
+            continue
+        available.append(name)
+    return available
+
+def compress(data, codec, level=None):
+    """
+    Compress a collection body
+
+    This is a module-level function so it can be pickled and run in
+    worker processes.
+
+    Parameters:
+        data - the bytes to compress
+        codec - the name of the codec to use
+        level - the compression level. Optional, defaults to the codec's
+            default.
+    """
+    return get_codec(codec).compress(data, level)
+
+def decompress_collection(data, entry):
+    """
+    Decompress a collection's bytes if its header entry says it's compressed
+
+    Parameters:
+        data - the bytes of the collection as stored in the file
+        entry - the collection's entry from the header
+
+    Returns:
+        the uncompressed JSON bytes, or data itself if the collection isn't
+        compressed
+
+    Raises:
+        ValueError if the bytes don't decompress to the size recorded in the
+        header
+    """
+    codec = entry.get('codec')
+    if codec is None:
+        return data
+    decompress = get_codec(codec).decompress
+    try:
+        result = decompress(data)
+    except Exception as err:  # zlib.error, zstandard.ZstdError
+        raise ValueError("Couldn't decompress collection: {}".format(err))
+    size = entry.get('uncompressed_size')
+    if size is not None and len(result) != size:
+        raise ValueError('Collection decompressed to {} bytes, expected {}'.format(
+            len(result), size))
+    return result
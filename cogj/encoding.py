@@ -0,0 +1,248 @@
+""" file:    encoding.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Fast compact JSON encoding for features. Coordinates are
+        formatted straight from numpy arrays to bytes, and everything else
+        goes through a pluggable JSON backend (orjson or ujson if they're
+        installed, otherwise the standard library)
+"""
+
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# JSON backends in order of preference
+BACKENDS = ('orjson', 'ujson', 'json')
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+_stdlib_dumps.backend = 'json'
+
+def _orjson_dumps():
+    import orjson
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    return lambda obj: orjson.dumps(obj, option=options)
+
+def _has_nonfinite(obj):
+    "Check whether an object has any NaN or infinite floats in it"
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_nonfinite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_nonfinite(value) for value in obj)
+    if isinstance(obj, (np.ndarray, np.floating)):
+        return obj.dtype.kind in 'fc' and not np.isfinite(obj).all()
+    return False
+
+def _ujson_dumps():
+    import ujson
+    return lambda obj: ujson.dumps(obj).encode('utf-8')
+
+@lru_cache(maxsize=None)
+def get_backend(name=None):
+    """
+    Return a function which encodes Python objects as compact JSON bytes
+
+    Parameters:
+        name - the backend to use ('orjson', 'ujson' or 'json'). Optional,
+            defaults to the COGJ_JSON_BACKEND environment variable, or the
+            first backend that's installed.
+
+    Returns:
+        a function taking an object and returning bytes. Objects the backend
+        can't handle (e.g. huge integers) fall back to the standard library,
+        as do objects with NaN or infinite floats, so these are written as
+        NaN/Infinity whichever backend is installed (orjson would write null).
+    """
+    name = name or os.environ.get('COGJ_JSON_BACKEND')
+    loaders = {'orjson': _orjson_dumps, 'ujson': _ujson_dumps, 'json': lambda: _stdlib_dumps}
+    if name is not None and name not in loaders:
+        raise ValueError('Unknown JSON backend {}, expected one of {}'.format(name, BACKENDS))
+    for backend in ([name] if name else BACKENDS):
+        try:
+            dumps = loaders[backend]()
+            break
+        except ImportError:
+            if name is not None:
+                raise
+    if dumps is _stdlib_dumps:
+        return dumps
+
+    def _dumps(obj):
+        try:
+            data = dumps(obj)
+        except (TypeError, ValueError, OverflowError):
+            return _stdlib_dumps(obj)
+        # orjson writes non-finite floats as null rather than raising
+        if b'null' in data and _has_nonfinite(obj):
+            return _stdlib_dumps(obj)
+        return data
+    _dumps.backend = backend
+    return _dumps
+
+def _stdlib_loads(data):
+    if isinstance(data, str):
+        return json.loads(data)
+    return json.loads(bytes(data).decode('utf-8'))
+
+@lru_cache(maxsize=None)
+def get_loader(name=None):
+    """
+    Return a function which decodes JSON from bytes, memoryviews or strings
+
+    Parameters:
+        name - the backend to use, as for `get_backend`. orjson reads
+            memoryviews directly, the others need a copy.
+    """
+    name = name or os.environ.get('COGJ_JSON_BACKEND')
+    if name is not None and name not in BACKENDS:
+        raise ValueError('Unknown JSON backend {}, expected one of {}'.format(name, BACKENDS))
+    for backend in ([name] if name else BACKENDS):
+        try:
+            if backend == 'orjson':
+                from orjson import loads
+                return loads
+            if backend == 'ujson':
+                import ujson
+                return lambda data: ujson.loads(data if isinstance(data, str) else bytes(data))
+        except ImportError:
+            if name is not None:
+                raise
+    return _stdlib_loads
+
+def format_coords(coords, precision=None, backend=None):
+    """
+    Format an (n, ndim) array of coordinates as a JSON array of positions
+
+    Parameters:
+        coords - the coordinates, or a single (ndim,) position
+        precision - the number of decimal places to round to. Optional, if
+            None we write coordinates at full precision. Either way we write
+            the shortest representation which round-trips (the same as the
+            json module)
+        backend - the JSON backend (see `get_backend`). If this is orjson
+            the array is formatted by orjson directly, which is much faster
+            but writes some numbers differently (e.g. 1e16 vs 1e+16)
+
+    Returns:
+        the JSON as bytes, e.g. b'[[1.5,2.0],[3.0,4.25]]'
+    """
+    coords = np.asarray(coords, dtype=float)
+    if coords.ndim == 1:
+        return format_coords(coords.reshape((1, -1)), precision, backend)[1:-1]
+    count, ndim = coords.shape
+    if not np.isfinite(coords).all():
+        raise ValueError('Coordinates must be finite to encode as JSON')
+    if precision is not None:
+        # Adding zero gets rid of any -0.0s from rounding
+        coords = np.round(coords, int(precision)) + 0.0
+    dumps = get_backend(backend)
+    if dumps.backend == 'orjson' and count:
+        return dumps(np.ascontiguousarray(coords))
+    position = '[' + ','.join(['%r'] * ndim) + ']'
+    text = ('[' + ','.join([position] * count) + ']') % tuple(coords.ravel().tolist())
+    return text.encode('ascii')
+
+# Coordinate encoders take a geometry and a function to format coordinates
+def _point(geom, fmt):
+    return fmt(np.asarray(geom.coords)[0])
+
+def _linestring(geom, fmt):
+    return fmt(geom.coords)
+
+def _polygon(geom, fmt):
+    rings = [geom.exterior] + list(geom.interiors)
+    return b'[' + b','.join(fmt(r.coords) for r in rings) + b']'
+
+def _multipoint(geom, fmt):
+    return fmt([p.coords[0] for p in geom.geoms])
+
+def _multi(encoder):
+    def _encode(geom, fmt):
+        return b'[' + b','.join(encoder(g, fmt) for g in geom.geoms) + b']'
+    return _encode
+
+COORDINATE_ENCODERS = {
+    'Point': _point,
+    'LineString': _linestring,
+    'LinearRing': _linestring,
+    'Polygon': _polygon,
+    'MultiPoint': _multipoint,
+    'MultiLineString': _multi(_linestring),
+    'MultiPolygon': _multi(_polygon)
+}
+
+def encode_geometry(geom, precision=None, backend=None):
+    """
+    Encode a shapely geometry as compact GeoJSON bytes
+
+    Parameters:
+        geom - the geometry to encode
+        precision - the number of decimal places for coordinates (see
+            `format_coords`). Optional, defaults to full precision.
+        backend - the JSON backend to fall back on for geometries we don't
+            format directly (see `get_backend`)
+    """
+    if geom is None:
+        return b'null'
+    kind = geom.geom_type
+    if kind == 'GeometryCollection' and not geom.is_empty:
+        return b'{"type":"GeometryCollection","geometries":[' \
+            + b','.join(encode_geometry(g, precision, backend) for g in geom.geoms) \
+            + b']}'
+    try:
+        coordinates = COORDINATE_ENCODERS[kind](
+            geom, lambda coords: format_coords(coords, precision, backend))
+    except (KeyError, IndexError, ValueError):
+        # Empty or non-finite geometries - let the JSON backend deal with these
+        return get_backend(backend)(geom.__geo_interface__)
+    return b'{"type":"' + kind.encode('ascii') + b'","coordinates":' + coordinates + b'}'
+
+def encode_feature(feature, precision=None, backend=None):
+    """
+    Encode a `cogj.Feature` as compact GeoJSON bytes
+
+    Parameters:
+        feature - the feature to encode
+        precision - the number of decimal places for coordinates. Optional,
+            defaults to full precision.
+        backend - the JSON backend to encode properties with (see
+            `get_backend`)
+    """
+    return b'{"type":"Feature","geometry":' \
+        + encode_geometry(feature.geometry, precision, backend) \
+        + b',"properties":' + get_backend(backend)(feature.properties) + b'}'
+
+def write_collection(features, sink, precision=None, backend=None):
+    """
+    Write features as a compact GeoJSON FeatureCollection straight into a
+    file or buffer, one feature at a time
+
+    Parameters:
+        features - an iterable of `cogj.Feature` instances
+        sink - a binary file-like object to write to
+        precision - the number of decimal places for coordinates. Optional,
+            defaults to full precision.
+        backend - the JSON backend to encode properties with
+
+    Returns:
+        the number of bytes written
+    """
+    written = sink.write(b'{"type":"FeatureCollection","features":[')
+    for idx, feature in enumerate(features):
+        if idx:
+            written += sink.write(b',')
+        written += sink.write(encode_feature(feature, precision, backend))
+    written += sink.write(b']}')
+    return written
+
+def encode_collection(features, precision=None, backend=None):
+    "Encode features as a compact GeoJSON FeatureCollection, see `write_collection`"
+    return b'{"type":"FeatureCollection","features":[' \
+        + b','.join(encode_feature(f, precision, backend) for f in features) \
+        + b']}'
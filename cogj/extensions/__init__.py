@@ -0,0 +1,6 @@
+""" file:    __init__.py (cogj.extensions)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Compiled Cython extensions for cogj - see cogj.kernels
+"""
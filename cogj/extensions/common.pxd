@@ -0,0 +1,21 @@
+# Shared definitions for the OpenMP extensions
+#
+# NUM_THREADS is the number of threads for parallel loops. The build sets it
+# to one per CPU with -DCOGJ_NUM_THREADS=n (see setup_extensions.py); without
+# that we let OpenMP decide, which respects OMP_NUM_THREADS. Compilers
+# without OpenMP (e.g. Apple clang) run the loops serially on one thread.
+
+cdef extern from *:
+    """
+    #ifdef _OPENMP
+    #include <omp.h>
+    #endif
+    #ifndef COGJ_NUM_THREADS
+    #ifdef _OPENMP
+    #define COGJ_NUM_THREADS omp_get_max_threads()
+    #else
+    #define COGJ_NUM_THREADS 1
+    #endif
+    #endif
+    """
+    int NUM_THREADS "COGJ_NUM_THREADS"
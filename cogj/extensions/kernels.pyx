@@ -0,0 +1,170 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+""" file:    kernels.pyx (cogj.extensions)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Compiled kernels for the hot loops in resampling, bounds
+        calculation and reprojection. Loops over features/rings run in
+        parallel with OpenMP.
+
+    Don't use these directly - use `cogj.kernels`, which checks inputs and
+    falls back to numpy if the extension isn't built.
+"""
+
+from cython.parallel cimport prange
+from libc.math cimport sqrt, NAN
+from libc.stdint cimport int64_t
+
+import numpy as np
+
+from .common cimport NUM_THREADS
+
+# eps for managing zero vs nonzero norms (matches LinestringSampler)
+cdef double NORM_TOLERANCE = 1e-10
+
+def ring_lengths(const double[:, ::1] coords, const int64_t[::1] offsets):
+    """
+    Return the length of each ring in a ragged coordinate array
+    """
+    cdef Py_ssize_t nrings = offsets.shape[0] - 1
+    cdef Py_ssize_t ring, idx
+    cdef double dx, dy, total
+    lengths = np.zeros(nrings)
+    cdef double[::1] out = lengths
+
+    for ring in prange(nrings, nogil=True, num_threads=NUM_THREADS, schedule='guided'):
+        total = 0
+        for idx in range(offsets[ring], offsets[ring + 1] - 1):
+            dx = coords[idx + 1, 0] - coords[idx, 0]
+            dy = coords[idx + 1, 1] - coords[idx, 1]
+            total = total + sqrt(dx * dx + dy * dy)
+        out[ring] = total
+    return lengths
+
+def sample_rings(const double[:, ::1] coords, const int64_t[::1] offsets,
+                 const int64_t[::1] new_offsets, const double[::1] lengths):
+    """
+    Sample new_offsets[i + 1] - new_offsets[i] evenly spaced points along
+    each ring. Rings with less than two vertices are copied across.
+
+    Each ring is a single walk along its segments, since the samples are
+    in order.
+    """
+    cdef Py_ssize_t nrings = offsets.shape[0] - 1
+    cdef Py_ssize_t ndim = coords.shape[1]
+    cdef Py_ssize_t ring, start, end, count, seg, jdx, kdx, target
+    cdef double step, distance, seg_start, norm, dx, dy, fraction
+    new_coords = np.empty((new_offsets[nrings], ndim))
+    cdef double[:, ::1] out = new_coords
+
+    for ring in prange(nrings, nogil=True, num_threads=NUM_THREADS, schedule='guided'):
+        start = offsets[ring]
+        end = offsets[ring + 1]
+        count = new_offsets[ring + 1] - new_offsets[ring]
+        if end - start < 2:
+            for jdx in range(end - start):
+                for kdx in range(ndim):
+                    out[new_offsets[ring] + jdx, kdx] = coords[start + jdx, kdx]
+            continue
+
+        step = lengths[ring] / (count - 1 if count > 1 else 1)
+        seg = start
+        seg_start = 0
+        dx = coords[seg + 1, 0] - coords[seg, 0]
+        dy = coords[seg + 1, 1] - coords[seg, 1]
+        norm = sqrt(dx * dx + dy * dy)
+        for jdx in range(count):
+            # Move along to the segment this sample lands in
+            distance = jdx * step
+            while distance > seg_start + norm and seg < end - 2:
+                seg_start = seg_start + norm
+                seg = seg + 1
+                dx = coords[seg + 1, 0] - coords[seg, 0]
+                dy = coords[seg + 1, 1] - coords[seg, 1]
+                norm = sqrt(dx * dx + dy * dy)
+
+            # Interpolate along the segment
+            fraction = (distance - seg_start) / norm if norm > NORM_TOLERANCE else 0
+            target = new_offsets[ring] + jdx
+            for kdx in range(ndim):
+                out[target, kdx] = coords[seg, kdx] \
+                    + (coords[seg + 1, kdx] - coords[seg, kdx]) * fraction
+    return new_coords
+
+def sample_distances(const double[:, ::1] points, const double[:, ::1] unit_vectors,
+                     const double[::1] cumulative_norm, const double[::1] distances):
+    """
+    Sample distances along a single linestring (see LinestringSampler.sample)
+    """
+    cdef Py_ssize_t nsamples = distances.shape[0]
+    cdef Py_ssize_t nsegments = cumulative_norm.shape[0]
+    cdef Py_ssize_t ndim = points.shape[1]
+    cdef Py_ssize_t idx, kdx, low, high, mid
+    cdef double offset
+    samples = np.empty((nsamples, ndim))
+    cdef double[:, ::1] out = samples
+
+    for idx in prange(nsamples, nogil=True, num_threads=NUM_THREADS):
+        # Binary search for the first segment ending at or after the distance
+        low = 0
+        high = nsegments
+        while low < high:
+            mid = (low + high) // 2
+            if cumulative_norm[mid] < distances[idx]:
+                low = mid + 1
+            else:
+                high = mid
+        if low > nsegments - 1:
+            low = nsegments - 1
+        offset = cumulative_norm[low - 1] if low > 0 else 0
+        for kdx in range(ndim):
+            out[idx, kdx] = points[low, kdx] + unit_vectors[low, kdx] * (distances[idx] - offset)
+    return samples
+
+def bounds(const double[:, ::1] coords, const int64_t[::1] offsets):
+    """
+    Return (minx, miny, maxx, maxy) bounds for each geometry in a ragged
+    coordinate array. Empty geometries get NaN bounds.
+    """
+    cdef Py_ssize_t ngeoms = offsets.shape[0] - 1
+    cdef Py_ssize_t geom, idx
+    cdef double minx, miny, maxx, maxy
+    result = np.empty((ngeoms, 4))
+    cdef double[:, ::1] out = result
+
+    for geom in prange(ngeoms, nogil=True, num_threads=NUM_THREADS, schedule='guided'):
+        if offsets[geom + 1] == offsets[geom]:
+            out[geom, 0] = NAN
+            out[geom, 1] = NAN
+            out[geom, 2] = NAN
+            out[geom, 3] = NAN
+            continue
+        minx = maxx = coords[offsets[geom], 0]
+        miny = maxy = coords[offsets[geom], 1]
+        for idx in range(offsets[geom] + 1, offsets[geom + 1]):
+            minx = min(minx, coords[idx, 0])
+            maxx = max(maxx, coords[idx, 0])
+            miny = min(miny, coords[idx, 1])
+            maxy = max(maxy, coords[idx, 1])
+        out[geom, 0] = minx
+        out[geom, 1] = miny
+        out[geom, 2] = maxx
+        out[geom, 3] = maxy
+    return result
+
+def interleave(columns):
+    """
+    Scatter separate x, y (and z) arrays back into one (n, ndim) array
+    """
+    cdef Py_ssize_t ndim = len(columns)
+    cdef Py_ssize_t size = len(columns[0]) if ndim else 0
+    cdef Py_ssize_t idx, kdx
+    cdef const double[::1] column
+    result = np.empty((size, ndim))
+    cdef double[:, ::1] out = result
+
+    for kdx in range(ndim):
+        column = columns[kdx]
+        for idx in prange(size, nogil=True, num_threads=NUM_THREADS):
+            out[idx, kdx] = column[idx]
+    return result
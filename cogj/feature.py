@@ -7,9 +7,11 @@
 """
 
 import json
+from collections.abc import Mapping
 
-from shapely.geometry import mapping
+from shapely.geometry import mapping, shape
 
+from .encoding import encode_feature, encode_collection
 from .identity import IdentityMixin
 
 class Feature(IdentityMixin):
@@ -34,13 +36,27 @@ class Feature(IdentityMixin):
         "Two features are equal if their representations are equal"
         return self.__geo_interface__ == other.__geo_interface__
 
-    def json(self, compact=False, **kwargs):
+    def json(self, compact=False, precision=None, grid=None, **kwargs):
         """
         Serialize to JSON
 
+        Compact output is formatted directly from the coordinate arrays
+        using `cogj.encoding`, which is much faster.
+
         Parameters:
+            compact - if True, write without any whitespace
+            precision - the number of decimal places to round coordinates
+                to, dropping any consecutive vertices which end up the same.
+                Optional, defaults to full precision.
+            grid - the grid spacing to snap coordinates to instead.
+                Optional, see `cogj.quantize.quantize`
             kwargs - get passed to `jaon.dumps`. Useful for pretty-printing
         """
+        if precision is not None or grid is not None:
+            from .quantize import quantize
+            return quantize(self, precision, grid).json(compact, **kwargs)
+        if compact and not kwargs:
+            return encode_feature(self).decode('utf-8')
         if compact:
             kwargs.update(separators=(',', ':'))
         return json.dumps(mapping(self), **kwargs)
@@ -71,6 +87,24 @@ class FeatureCollection:
             except ValueError:
                 raise ValueError('Features must be cogj.Feature or shapely geometry')
 
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Build a FeatureCollection from columnar arrays
+
+        Parameters:
+            arrays - a `cogj.columnar.ColumnarCollection` instance
+        """
+        return cls(list(arrays))
+
+    def to_arrays(self):
+        """
+        Pack the features into columnar arrays (one coordinate buffer plus
+        offsets, see `cogj.columnar.ColumnarCollection`)
+        """
+        from .columnar import ColumnarCollection
+        return ColumnarCollection.from_features(self.features)
+
     @property
     def geometries(self):
         "Return iterator over feature geometries"
@@ -94,13 +128,202 @@ class FeatureCollection:
         "Two FeatureCollections are equal if their representations are equal"
         return self.__geo_interface__ == other.__geo_interface__
 
-    def json(self, compact=False, **kwargs):
+    def json(self, compact=False, precision=None, grid=None, **kwargs):
         """
         Serialize to JSON
 
+        Compact output is formatted directly from the coordinate arrays
+        using `cogj.encoding`, which is much faster.
+
         Parameters:
+            compact - if True, write without any whitespace
+            precision - the number of decimal places to round coordinates
+                to, dropping any consecutive vertices which end up the same.
+                Optional, defaults to full precision.
+            grid - the grid spacing to snap coordinates to instead.
+                Optional, see `cogj.quantize.quantize`
             kwargs - get passed to `jaon.dumps`. Useful for pretty-printing
         """
+        if precision is not None or grid is not None:
+            from .quantize import quantize
+            return quantize(self, precision, grid).json(compact, **kwargs)
+        if compact and not kwargs:
+            return encode_collection(self.features).decode('utf-8')
         if compact:
             kwargs.update(separators=(',', ':'))
         return json.dumps(mapping(self), **kwargs)
+
+
+def as_feature(obj):
+    """
+    Convert an object to a `cogj.Feature`
+
+    Parameters:
+        obj - a `cogj.Feature`, a shapely geometry or a GeoJSON-like feature
+            mapping (e.g. a fiona record)
+    """
+    if isinstance(obj, Feature):
+        return obj
+    if hasattr(obj, 'geom_type'):
+        return Feature(obj)
+    if isinstance(obj, Mapping) and 'geometry' in obj:
+        geometry = obj['geometry']
+        properties = obj.get('properties')
+        return Feature(
+            geometry=shape(geometry) if geometry is not None else None,
+            properties=dict(properties) if properties is not None else None
+        )
+    raise ValueError('Features must be cogj.Feature, shapely geometry or GeoJSON features')
+
+
+class LazyFeatureCollection:
+
+    """
+    GeoJSON FeatureCollection which streams its features instead of
+    holding them in memory
+
+    Features are converted to `cogj.Feature` instances as they're
+    iterated over, so counting, filtering and serializing a collection
+    each take one pass over the source and never hold the whole layer.
+
+    Parameters:
+        source - either an iterable of features (`cogj.Feature`, shapely
+            geometries or GeoJSON-like mappings), or a function returning a
+            new one each time it's called. Iterators can only be read
+            once, pass a function (or use `from_file`) to re-open the
+            source for each pass.
+    """
+
+    geom_type = 'FeatureCollection'
+
+    def __init__(self, source):
+        if callable(source):
+            self._open = source
+            self._once = False
+        else:
+            self._open = lambda: source
+            self._once = iter(source) is source
+        self._consumed = False
+
+    @classmethod
+    def from_file(cls, path, layer=None):
+        """
+        Stream features from a vector dataset with fiona, re-opening the
+        file for each pass
+
+        Parameters:
+            path - the path to the vector dataset
+            layer - the layer to read. Optional, defaults to the first layer
+        """
+        def _records():
+            import fiona
+            with fiona.open(path, layer=layer) as src:
+                yield from src
+        return cls(_records)
+
+    def __iter__(self):
+        source = self._open()
+        if self._once:
+            # One-shot iterator, make sure we don't silently come up empty
+            if self._consumed:
+                raise ValueError('Features have already been consumed, pass a function '
+                                 'returning a new iterable to read them more than once')
+            self._consumed = True
+        return map(as_feature, source)
+
+    @property
+    def geometries(self):
+        "Return iterator over feature geometries"
+        for feature in self:
+            yield feature.geometry
+
+    def count(self):
+        "Count the features, which takes a pass over the source"
+        return sum(1 for _ in self)
+
+    def filter(self, predicate):
+        """
+        Lazily filter features
+
+        Parameters:
+            predicate - a function taking a `cogj.Feature` and returning
+                True to keep it
+
+        Returns:
+            a new LazyFeatureCollection
+        """
+        return self.pipe(lambda features: filter(predicate, features))
+
+    def map(self, func):
+        """
+        Lazily transform features (e.g. reproject or resample them)
+
+        Parameters:
+            func - a function taking a `cogj.Feature` and returning a new one
+
+        Returns:
+            a new LazyFeatureCollection
+        """
+        return self.pipe(lambda features: map(func, features))
+
+    def pipe(self, *steps):
+        """
+        Lazily run features through functions which take an iterable of
+        features and return a new one, e.g. a `cogj.FeatureFilter` (without
+        chunking)
+
+        Returns:
+            a new LazyFeatureCollection
+        """
+        def _open():
+            features = iter(self)
+            for step in steps:
+                features = step(features)
+            return features
+        return LazyFeatureCollection(_open)
+
+    def materialize(self):
+        "Read all the features into a `cogj.FeatureCollection`"
+        return FeatureCollection(self)
+
+    @property
+    def __geo_interface__(self):
+        "Note that this reads every feature into memory"
+        return self.materialize().__geo_interface__
+
+    def iter_json(self, compact=False, precision=None, grid=None, **kwargs):
+        """
+        Serialize to JSON incrementally, one feature at a time
+
+        Parameters are the same as `FeatureCollection.json`. The output
+        matches `FeatureCollection.json` unless you pass `indent`, in which
+        case each feature is indented on its own.
+
+        Returns:
+            an iterator over strings which join to make the JSON document
+        """
+        if precision is not None or grid is not None:
+            from .quantize import quantize
+            features = (quantize(f, precision, grid) for f in self)
+        else:
+            features = iter(self)
+        if compact and not kwargs:
+            prefix, separator, suffix = '{"type":"FeatureCollection","features":[', ',', ']}'
+            encode = lambda f: encode_feature(f).decode('utf-8')  # pylint: disable=C3001
+        else:
+            if compact:
+                kwargs.update(separators=(',', ':'))
+            default_separator = ',' if kwargs.get('indent') is not None else ', '
+            separator = kwargs.get('separators', (default_separator,))[0]
+            template = json.dumps({"type": "FeatureCollection", "features": []}, **kwargs)
+            before, _, after = template.partition('[]')
+            prefix, suffix = before + '[', ']' + after
+            encode = lambda f: json.dumps(mapping(f), **kwargs)  # pylint: disable=C3001
+        yield prefix
+        for idx, feature in enumerate(features):
+            yield (separator if idx else '') + encode(feature)
+        yield suffix
+
+    def json(self, compact=False, precision=None, grid=None, **kwargs):
+        "Serialize to JSON, see `iter_json` to do this incrementally"
+        return ''.join(self.iter_json(compact, precision, grid, **kwargs))
@@ -5,14 +5,83 @@
     description: Functions to filter vector data
 """
 
-from collections import Iterable
+import copy
+import logging
+import os
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
+import numpy as np
 from voluptuous import Schema, ALLOW_EXTRA, MultipleInvalid
 from toolz.curried import take, compose
 
 from .feature import Feature
 from .logging import LoggerMixin
-from .utilities import grouper
+from .predicates import compile_schema, compile_mask
+from .spatial import SpatialFilter
+from .utilities import grouper, bounded_map
+
+# Number of features sent to each worker if we're running in parallel but
+# haven't been asked for chunks
+CHUNK_SIZE = 1000
+
+# Executors for running chunks in parallel
+EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor
+}
+
+class FilterStats:
+
+    """
+    Aggregate counts of the features a FeatureFilter has kept and rejected
+
+    Attributes:
+        outside - the number of features outside the area of interest
+        kept - the number of features which passed validation
+        rejected - the number of features which failed validation
+        errors - a Counter of rejections by voluptuous error type (e.g.
+            'RangeInvalid'). Features rejected by a compiled schema are
+            counted as 'Invalid' since we don't know which check failed.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        "Set all the counts back to zero"
+        self.outside = 0
+        self.kept = 0
+        self.rejected = 0
+        self.errors = Counter()
+
+    @property
+    def seen(self):
+        "The number of features checked"
+        return self.outside + self.kept + self.rejected
+
+    def update(self, other):
+        "Add the counts from another FilterStats instance"
+        self.outside += other.outside
+        self.kept += other.kept
+        self.rejected += other.rejected
+        self.errors.update(other.errors)
+
+    def as_dict(self):
+        "Return the counts as a dictionary"
+        return {
+            'seen': self.seen,
+            'outside': self.outside,
+            'kept': self.kept,
+            'rejected': self.rejected,
+            'errors': dict(self.errors)
+        }
+
+    def __repr__(self):
+        return 'FilterStats(outside={}, kept={}, rejected={}, errors={})'.format(
+            self.outside, self.kept, self.rejected, dict(self.errors))
+
 
 class FeatureFilter(LoggerMixin):
 
@@ -27,16 +96,72 @@ class FeatureFilter(LoggerMixin):
             False, no feature properties are kept, if an iterable of
             feature keys, only those features are kept
         chunk - if not False, returns the features in chunks of n
+        compile_schema - if True, compile the schema into a plain Python
+            predicate where we can (see `cogj.predicates.compile_schema`),
+            which is much faster than validating with voluptuous when lots of
+            features are rejected. Schemas we can't compile fall back to
+            voluptuous, and either way the same features are kept.
+        lean - if True, don't log anything per feature, even at DEBUG level.
+            Instead we log a summary of the counts in `stats` when each
+            pipeline finishes. Useful for large datasets.
+        area - an area of interest, either a shapely geometry or a
+            (minx, miny, maxx, maxy) bounding box. If given, only features
+            intersecting it are kept (see `cogj.spatial.SpatialFilter`).
+            This runs before validation.
+        spatial_index - if True, index the parts of a multipart area with an
+            STRtree. Worthwhile for complex areas with lots of parts.
+        executor - if 'thread' or 'process', features are grouped into chunks
+            (of `chunk` features, or 1000 if we're not chunking) and each chunk
+            is filtered in a pool of threads or processes. Optional, defaults
+            to None (filter in this thread). Processes need a picklable schema
+            (no lambdas) and transform.
+        jobs - the number of workers. Optional, defaults to one per CPU.
+        transform - a function taking a list of filtered features and
+            returning a new list (e.g. `cogj.writer.reproject_features`),
+            run on each chunk by the workers. Only used with an executor.
+        ordered - if True, chunks come back in the same order as the
+            input, otherwise in the order they finish
+        in_flight - the maximum number of chunks in flight at once, so
+            we don't read ahead of a slow consumer. Optional, defaults to
+            2 * jobs.
+
+    Counts of kept and rejected features accumulate in `stats` (see
+    `FilterStats`) across calls.
     """
 
-    def __init__(self, limit=None, schema=None, keep_properties=True, chunk=False):
+    def __init__(self, limit=None, schema=None, keep_properties=True, chunk=False,
+                 compile_schema=True, lean=False, area=None, spatial_index=False,
+                 executor=None, jobs=None, transform=None, ordered=True,
+                 in_flight=None):  # pylint: disable=W0621,R0913,R0914
+        if executor is not None and executor not in EXECUTORS:
+            raise ValueError('Unknown executor {}, expected one of {}'.format(
+                executor, tuple(EXECUTORS)))
+        self.executor = executor
+        self.jobs = jobs or os.cpu_count() or 1
+        self.transform = transform
+        self.ordered = ordered
+        self.in_flight = in_flight or 2 * self.jobs
+        self.compile_schema = compile_schema
+        self.lean = lean
+        self.spatial = SpatialFilter(area, index=spatial_index) if area is not None else None
+        self.stats = FilterStats()
         self.schema = schema
         self.limit = limit
         self.chunk = chunk or False
         self.set_property_filter(keep_properties)
 
+        # Enough to build the same filter in a worker process
+        self._config = dict(
+            keep_properties=keep_properties, compile_schema=compile_schema,
+            lean=lean, area=area, spatial_index=spatial_index)
+
         # Set up pipeline, in reverse order
         steps = [self.validate, self.process]
+        if self.spatial is not None:
+            steps.insert(0, self.intersecting)
+        if self.executor is not None:
+            self.logger.debug('Filtering chunks with %s %s workers', self.jobs, self.executor)
+            steps = [self.parallel]
         if self.limit is not None:
             self.logger.debug(f'Loading %s features only', self.limit)
             steps.append(take(self.limit))
@@ -52,15 +177,13 @@ class FeatureFilter(LoggerMixin):
     def set_property_filter(self, keep_properties=False):
         "Set keep_properties attribute"
         if isinstance(keep_properties, str):
-            self._process_properties = lambda f: \
-                self._filter_properties({keep_properties,}, f)
+            self._keep = {keep_properties,}
         elif isinstance(keep_properties, Iterable):
-            self._process_properties = lambda f: \
-                self._filter_properties(set(keep_properties), f)
+            self._keep = set(keep_properties)
         elif keep_properties:
-            self._process_properties = self._allow_properties
+            self._keep = True
         else:
-            self._process_properties = self._remove_properties
+            self._keep = False
 
     @property
     def schema(self):
@@ -74,6 +197,79 @@ class FeatureFilter(LoggerMixin):
             new_schema = Schema(new_schema, extra=ALLOW_EXTRA)
         self.logger.debug('Updating schema to %s', new_schema)
         self._schema = new_schema  # pylint: disable=W0201
+        self._predicate = self._mask = None  # pylint: disable=W0201
+        if new_schema is not None and self.compile_schema:
+            self._predicate = compile_schema(new_schema)  # pylint: disable=W0201
+            self._mask = compile_mask(new_schema)  # pylint: disable=W0201
+            if self._predicate is None:
+                self.logger.debug("Can't compile schema, validating with voluptuous")
+
+    def filter_chunk(self, chunk):
+        """
+        Filter a chunk of features, returning a list of the features kept
+        (after `transform`, if there is one) and the stats for the chunk.
+        This is what runs in each worker in parallel mode.
+        """
+        worker = copy.copy(self)
+        worker.stats = FilterStats()
+        features = worker.process(worker.validate(worker.intersecting(chunk)))
+        features = list(features)
+        if self.transform is not None:
+            features = list(self.transform(features))
+        return features, worker.stats
+
+    def parallel(self, features):
+        """
+        Lazily filter features in chunks using a pool of workers (see the
+        `executor` option). Stats from each chunk are added to `stats`.
+
+        Parameters:
+            features - an iterator of features
+
+        Returns:
+            an iterator over the filtered (and transformed) features
+        """
+        size = self.chunk or CHUNK_SIZE
+        tasks = ((chunk,) for chunk in grouper(size, features))
+        if self.executor == 'process':
+            schema = None if self._schema is None else \
+                (self._schema.schema, self._schema.required, self._schema.extra)
+            pool = ProcessPoolExecutor(
+                max_workers=self.jobs, initializer=_init_worker,
+                initargs=(self._config, schema, self.transform))
+            func = _filter_chunk
+        else:
+            pool = EXECUTORS[self.executor](max_workers=self.jobs)
+            func = self.filter_chunk
+        results = bounded_map(pool, func, tasks, self.in_flight, self.ordered)
+        try:
+            for chunk, stats in results:
+                self.stats.update(stats)
+                yield from chunk
+        finally:
+            # Closing the map cancels any chunks which haven't started yet
+            results.close()
+            pool.shutdown(wait=True)
+
+    def intersecting(self, features):
+        """
+        Lazily keep the features which intersect the area of interest
+
+        Parameters:
+            features - an iterator of features
+
+        Returns:
+            an iterator over the features intersecting the area
+        """
+        if self.spatial is None:
+            yield from features
+            return
+        spatial, stats = self.spatial, self.stats
+        for feature in features:
+            if spatial(feature.geometry):
+                yield feature
+            else:
+                stats.outside += 1
 
     def validate(self, features):
         """
@@ -86,20 +282,118 @@ class FeatureFilter(LoggerMixin):
         Returns:
             an iterator of valid values
         """
+        # Resolve the logger and log level once rather than per feature
+        logger, stats = self.logger, self.stats
+        verbose = not self.lean and logger.isEnabledFor(logging.DEBUG)
         if self._schema is None:
-            self.logger.info('No schema, returning all features')
-            yield from features
+            logger.info('No schema, returning all features')
+            for feature in features:
+                stats.kept += 1
+                yield feature
             return
 
-        self.logger.info('Validating features against schema')
-        for feature in features:
-            try:  # validation
-                self._schema(feature.properties)
+        logger.info('Validating features against schema')
+        try:
+            if self._predicate is not None:
+                predicate = self._predicate
+                for feature in features:
+                    if predicate(feature.properties):
+                        stats.kept += 1
+                        yield feature
+                    else:
+                        stats.rejected += 1
+                        stats.errors['Invalid'] += 1
+                        if verbose:
+                            logger.debug('Skipping invalid object %s', feature)
+                return
+
+            schema = self._schema
+            for feature in features:
+                try:  # validation
+                    schema(feature.properties)
+                except MultipleInvalid as err:
+                    stats.rejected += 1
+                    stats.errors.update(type(e).__name__ for e in err.errors)
+                    if verbose:
+                        logger.debug('Skipping invalid object %s', feature)
+                        logger.debug('Errors: %s', err.errors)
+                    continue
+                stats.kept += 1
                 yield feature
-            except MultipleInvalid as err:
-                self.logger.debug('Skipping invalid object %s', feature)
-                self.logger.debug('Errors: %s', err.errors)
-                continue
+        finally:
+            if self.lean and logger.isEnabledFor(logging.INFO):
+                logger.info('Validated features: %s', stats)
+
+    def is_valid(self, properties):
+        "Check whether a feature's properties validate against the schema"
+        if self._schema is None:
+            return True
+        if self._predicate is not None:
+            return self._predicate(properties)
+        try:
+            self._schema(properties)
+            return True
+        except MultipleInvalid:
+            return False
+
+    def filter_table(self, table, geometries=None):
+        """
+        Filter features stored column by column
+
+        Schemas are checked against whole columns at once where we can (see
+        `cogj.predicates.compile_mask`), otherwise we check each row. If
+        there's an area of interest, geometries are checked against it first. Property
+        filtering drops columns rather than building new dictionaries. The
+        limit applies as usual but features aren't chunked.
+
+        Parameters:
+            table - a `cogj.table.AttributeTable` of feature properties
+            geometries - the feature geometries, either a
+                `cogj.ColumnarCollection` or a sequence of shapely geometries.
+                Optional, unless we're filtering on an area of interest.
+
+        Returns:
+            the filtered table and geometries (None if no geometries were
+            passed)
+        """
+        if geometries is not None and len(geometries) != len(table):
+            raise ValueError('Need one row of properties per geometry')
+        inside = np.ones(len(table), dtype=bool)
+        if self.spatial is not None:
+            if geometries is None:
+                raise ValueError('Need geometries to filter on an area of interest')
+            inside = self.spatial.mask(geometries)
+            self.stats.outside += int(np.sum(~inside))
+        if self._schema is None:
+            mask = inside
+        elif self._mask is not None:
+            mask = inside & self._mask(table)
+        else:
+            mask = inside.copy()
+            rows = np.flatnonzero(inside)
+            mask[rows] = [self.is_valid(r) for r in table.take(rows).records()]
+        index = np.flatnonzero(mask)
+        rejected = int(np.sum(inside)) - len(index)
+        self.stats.kept += len(index)
+        self.stats.rejected += rejected
+        if rejected:
+            self.stats.errors['Invalid'] += rejected
+        if self.limit is not None:
+            index = index[:self.limit]
+        self.logger.debug('Keeping %s of %s features', len(index), len(table))
+
+        # Filter rows and columns
+        table = table.take(index)
+        if self._keep is False:
+            table = type(table)({}, null=np.ones(len(table), dtype=bool))
+        elif self._keep is not True:
+            table = table.select(self._keep)
+        if geometries is not None:
+            if hasattr(geometries, 'take'):
+                geometries = geometries.take(index)
+            else:
+                geometries = [geometries[i] for i in index.tolist()]
+        return table, geometries
 
     def process(self, features):
         """
@@ -115,25 +409,39 @@ class FeatureFilter(LoggerMixin):
         Returns:
             an iterator over filtered features with properties handled
         """
-        for feature in features:
-            yield self._process_properties(feature)
-
-    def _allow_properties(self, feature):
-        "Allow all features"
-        self.logger.debug("Keeping all properties from features")
-        return feature
-
-    def _remove_properties(self, feature):
-        "Remove properties from feature"
-        self.logger.debug("Removing all properties from features")
-        return Feature(geometry=feature.geometry)
-
-    def _filter_properties(self, keep, feature):
-        "Process removing some features"
-        self.logger.debug("Keeping a subset of features: %s", keep)
-        return Feature(
-            geometry=feature.geometry,
-            properties={
-                k: v for k, v in feature.properties.items()
-                if k in keep
-            })
+        # Log once per batch of features rather than per feature
+        if not self.lean and self.logger.isEnabledFor(logging.DEBUG):
+            if self._keep is True:
+                self.logger.debug("Keeping all properties from features")
+            elif self._keep is False:
+                self.logger.debug("Removing all properties from features")
+            else:
+                self.logger.debug("Keeping a subset of properties: %s", self._keep)
+        if self._keep is True:
+            yield from features
+        elif self._keep is False:
+            for feature in features:
+                yield Feature(geometry=feature.geometry)
+        else:
+            keep = self._keep
+            for feature in features:
+                yield Feature(
+                    geometry=feature.geometry,
+                    properties={k: v for k, v in feature.properties.items() if k in keep}
+                )
+
+
+# Filter used by each worker process, see `FeatureFilter.parallel`
+_WORKER = None
+
+def _init_worker(config, schema, transform):
+    "Build the filter for a worker process"
+    global _WORKER  # pylint: disable=W0603
+    if schema is not None:
+        spec, required, extra = schema
+        schema = Schema(spec, required=required, extra=extra)
+    _WORKER = FeatureFilter(schema=schema, transform=transform, **config)
+
+def _filter_chunk(chunk):
+    "Filter a chunk of features in a worker process"
+    return _WORKER.filter_chunk(chunk)
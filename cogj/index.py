@@ -0,0 +1,289 @@
+""" file:    index.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Packed (bulk-loaded) RTree for partitioning features into
+        COGJ collections and for fast bounding box queries
+"""
+
+import math
+
+import numpy as np
+
+from .utilities import check_bounds
+
+# Number of bits per axis used to compute Hilbert distances
+HILBERT_ORDER = 16
+
+def centres(bounds):
+    """
+    Return the centres of an (n, 4) array of bounds
+
+    Parameters:
+        bounds - an array of (minx, miny, maxx, maxy) bounds
+
+    Returns:
+        an (n, 2) array of centres
+    """
+    bounds = np.asarray(bounds, dtype=float).reshape((-1, 4))
+    return (bounds[:, :2] + bounds[:, 2:]) / 2
+
+def hilbert_distance(points, extent=None, order=HILBERT_ORDER):
+    """
+    Calculate the distance of points along a Hilbert curve
+
+    Points are scaled to a (2 ** order) x (2 ** order) grid over the extent
+    and then the distance calculated for all points at once.
+
+    Parameters:
+        points - an (n, 2) array of points
+        extent - the (minx, miny, maxx, maxy) extent of the grid. Optional,
+            defaults to the bounds of the points
+        order - the number of bits to use per axis. Optional, defaults to 16
+
+    Returns:
+        an (n,) array of integer distances along the curve
+    """
+    points = np.asarray(points, dtype=float).reshape((-1, 2))
+    if extent is None:
+        extent = (*points.min(axis=0), *points.max(axis=0)) if len(points) else (0, 0, 1, 1)
+    minx, miny, maxx, maxy = check_bounds(extent)
+
+    # Map points onto the grid
+    side = (1 << order) - 1
+    scale = np.array([maxx - minx, maxy - miny])
+    scale[scale == 0] = 1
+    grid = ((points - [minx, miny]) / scale * side).round()
+    x, y = np.clip(grid, 0, side).astype(np.int64).T
+
+    # Walk down the bits, rotating the quadrants as we go
+    distance = np.zeros(len(points), dtype=np.int64)
+    step = 1 << (order - 1)
+    while step > 0:
+        rx = (x & step) > 0
+        ry = (y & step) > 0
+        distance += step * step * ((3 * rx) ^ ry)
+
+        # Rotate/flip the quadrant
+        flip = ~ry & rx
+        x[flip], y[flip] = side - x[flip], side - y[flip]
+        swap = ~ry
+        x[swap], y[swap] = y[swap], x[swap]
+        step >>= 1
+    return distance
+
+def pack_str(bounds, node_size):
+    """
+    Pack bounds into nodes using Sort-Tile-Recursive (STR)
+
+    Sorts the centres into ceil(sqrt(n / node_size)) vertical slabs by x,
+    then sorts each slab by y and chunks it into nodes.
+
+    Parameters:
+        bounds - an (n, 4) array of (minx, miny, maxx, maxy) bounds
+        node_size - the maximum number of items in each node
+
+    Returns:
+        a tuple of (order, offsets), where the items in node `i` are
+        `order[offsets[i]:offsets[i + 1]]`
+    """
+    points = centres(bounds)
+    n_items = len(points)
+    n_nodes = math.ceil(n_items / node_size)
+    n_slabs = math.ceil(math.sqrt(n_nodes))
+    slab_size = node_size * math.ceil(n_nodes / n_slabs) if n_items else 1
+
+    # Sort everything by x, and then sort each slab by y
+    order = np.argsort(points[:, 0], kind='stable')
+    offsets = []
+    for start in range(0, n_items, slab_size):
+        slab = order[start:start + slab_size]
+        order[start:start + slab_size] = slab[np.argsort(points[slab, 1], kind='stable')]
+        offsets.extend(range(start, min(start + slab_size, n_items), node_size))
+    offsets.append(n_items)
+    return order, np.array(offsets, dtype=np.int64)
+
+def pack_hilbert(bounds, node_size):
+    """
+    Pack bounds into nodes by sorting along a Hilbert curve
+
+    Parameters:
+        bounds - an (n, 4) array of (minx, miny, maxx, maxy) bounds
+        node_size - the maximum number of items in each node
+
+    Returns:
+        a tuple of (order, offsets), where the items in node `i` are
+        `order[offsets[i]:offsets[i + 1]]`
+    """
+    points = centres(bounds)
+    order = np.argsort(hilbert_distance(points), kind='stable')
+    offsets = np.append(np.arange(0, len(points), node_size), len(points))
+    return order, offsets.astype(np.int64)
+
+PACKERS = {
+    'str': pack_str,
+    'hilbert': pack_hilbert
+}
+
+def get_packer(method):
+    "Return the packing function for a given method"
+    try:
+        return PACKERS[method]
+    except KeyError:
+        raise ValueError(f'Unknown method {method}, allowed values are {list(PACKERS)}')
+
+def node_bounds(bounds, order, offsets):
+    """
+    Calculate the bounds of packed nodes
+
+    Parameters:
+        bounds - the (n, 4) bounds of the items
+        order, offsets - the packing of items into nodes (see `pack_str`)
+
+    Returns:
+        an (m, 4) array of node bounds
+    """
+    if len(order) == 0:
+        return np.empty((0, 4))
+    bounds = np.asarray(bounds, dtype=float).reshape((-1, 4))[order]
+    starts = offsets[:-1]
+    return np.hstack([
+        np.minimum.reduceat(bounds[:, :2], starts),
+        np.maximum.reduceat(bounds[:, 2:], starts)
+    ])
+
+def intersects(bounds, query):
+    """
+    Vectorized bounding box intersection test
+
+    Parameters:
+        bounds - an (n, 4) array of (minx, miny, maxx, maxy) bounds
+        query - a single (minx, miny, maxx, maxy) bounding box
+
+    Returns:
+        an (n,) boolean mask which is True where bounds intersect the query
+    """
+    minx, miny, maxx, maxy = query
+    return (
+        (bounds[:, 0] <= maxx) & (bounds[:, 2] >= minx)
+        & (bounds[:, 1] <= maxy) & (bounds[:, 3] >= miny)
+    )
+
+def _ranges(starts, stops):
+    "Concatenate np.arange(start, stop) for all starts, stops without a loop"
+    lengths = stops - starts
+    total = lengths.sum()
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return shifts + np.arange(total)
+
+def partition(bounds, size, method='str'):
+    """
+    Partition bounding boxes into spatially coherent groups
+
+    These are the leaves of a packed RTree, so each group's bounding box
+    is as small as we can make it (which is what we want for COGJ
+    collections)
+
+    Parameters:
+        bounds - an (n, 4) array of (minx, miny, maxx, maxy) bounds
+        size - the maximum number of items in each group
+        method - the packing method, one of 'str' or 'hilbert'. Optional,
+            defaults to 'str'
+
+    Returns:
+        a list of arrays of indices into bounds, one for each group
+    """
+    order, offsets = get_packer(method)(bounds, size)
+    return [order[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+class PackedTree:
+
+    """
+    A static RTree bulk-loaded from an array of bounds
+
+    Each level of the tree is packed using either Sort-Tile-Recursive or a
+    Hilbert curve sort of the nodes in the level below, so building is
+    O(n log n). Nodes are kept in flat numpy arrays, so searching is a
+    vectorized comparison per level.
+
+    Parameters:
+        bounds - an (n, 4) array of (minx, miny, maxx, maxy) bounds
+        node_size - the maximum number of children in each node. Optional,
+            defaults to 16
+        method - the packing method, one of 'str' or 'hilbert'. Optional,
+            defaults to 'str'
+    """
+
+    def __init__(self, bounds, node_size=16, method='str'):
+        if node_size < 2:
+            raise ValueError('node_size must be at least 2')
+        self.bounds = np.asarray(bounds, dtype=float).reshape((-1, 4))
+        self.node_size = node_size
+        self.method = method
+
+        # Build levels from the leaves up. Each level is a tuple of
+        # (node bounds, child order, child offsets)
+        pack = get_packer(method)
+        self.levels = []
+        level_bounds = self.bounds
+        while True:
+            order, offsets = pack(level_bounds, node_size)
+            level_bounds = node_bounds(level_bounds, order, offsets)
+            self.levels.append((level_bounds, order, offsets))
+            if len(level_bounds) <= 1:
+                break
+
+    def __len__(self):
+        return len(self.bounds)
+
+    @property
+    def height(self):
+        "The number of levels of nodes in the tree"
+        return len(self.levels)
+
+    @property
+    def leaves(self):
+        "A list of arrays of the item indices in each leaf node"
+        _, order, offsets = self.levels[0]
+        return [order[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+    @property
+    def leaf_bounds(self):
+        "The bounds of each leaf node"
+        return self.levels[0][0]
+
+    def search(self, bounds):
+        """
+        Find all items which intersect some bounds
+
+        Parameters:
+            bounds - the (minx, miny, maxx, maxy) bounds to query
+
+        Returns:
+            an array of indices of the intersecting items
+        """
+        bounds = check_bounds(bounds)
+        nodes = np.arange(len(self.levels[-1][0]))
+        for level_bounds, order, offsets in reversed(self.levels):
+            nodes = nodes[intersects(level_bounds[nodes], bounds)]
+            nodes = order[_ranges(offsets[nodes], offsets[nodes + 1])]
+        return np.sort(nodes[intersects(self.bounds[nodes], bounds)])
+
+    def search_leaves(self, bounds):
+        """
+        Find the leaf nodes which intersect some bounds
+
+        Parameters:
+            bounds - the (minx, miny, maxx, maxy) bounds to query
+
+        Returns:
+            an array of indices of the intersecting leaves
+        """
+        bounds = check_bounds(bounds)
+        nodes = np.arange(len(self.levels[-1][0]))
+        for level_bounds, order, offsets in reversed(self.levels[1:]):
+            nodes = nodes[intersects(level_bounds[nodes], bounds)]
+            nodes = order[_ranges(offsets[nodes], offsets[nodes + 1])]
+        return np.sort(nodes[intersects(self.leaf_bounds[nodes], bounds)])
@@ -0,0 +1,187 @@
+""" file:    kernels.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Inner loops for resampling, bounds and reprojection. These
+        use the compiled (Cython/OpenMP) versions in `cogj.extensions.kernels`
+        if they've been built, otherwise they fall back to numpy.
+"""
+
+import numpy as np
+
+try:
+    from .extensions import kernels as _compiled
+except ImportError:
+    _compiled = None
+
+HAVE_EXTENSIONS = _compiled is not None
+
+# eps for managing zero vs nonzero norms
+NORM_TOLERANCE = 1e-10
+
+def _array(values, dtype=np.float64):
+    return np.ascontiguousarray(values, dtype=dtype)
+
+def _segments(coords, offsets):
+    "Return indices of the segments which don't cross from one ring to the next"
+    boundaries = offsets[1:-1]
+    segments = np.ones(max(len(coords) - 1, 0), dtype=bool)
+    segments[boundaries[(boundaries > 0) & (boundaries < len(coords))] - 1] = False
+    return np.flatnonzero(segments)
+
+def _ragged_index(counts):
+    "Return arange(count) for each count, concatenated together"
+    starts = np.append(0, np.cumsum(counts))[:-1]
+    return np.arange(np.sum(counts, dtype=np.int64)) - np.repeat(starts, counts)
+
+def _ring_lengths(coords, offsets):
+    norms = np.zeros(max(len(coords) - 1, 0))
+    segments = _segments(coords, offsets)
+    norms[segments] = np.linalg.norm(coords[segments + 1, :2] - coords[segments, :2], axis=1)
+    cumulative_norm = np.append(0, np.cumsum(norms))
+    return cumulative_norm[np.maximum(offsets[1:] - 1, offsets[:-1])] - cumulative_norm[offsets[:-1]]
+
+def _sample_rings(coords, offsets, new_offsets, lengths):
+    sizes, counts = np.diff(offsets), np.diff(new_offsets)
+    new_coords = np.empty((new_offsets[-1], coords.shape[1]))
+
+    # Segments for all the rings at once, plus cumulative distances. We search over
+    # distances for all rings at once, so each ring's distances are offset by
+    # the total length of the rings before it
+    segments = _segments(coords, offsets)
+    vectors = coords[segments + 1] - coords[segments]
+    norms = np.linalg.norm(vectors[:, :2], axis=1)
+    unit_vectors = vectors.copy()
+    nonzero = norms > NORM_TOLERANCE
+    unit_vectors[nonzero] /= norms[nonzero].reshape((-1, 1))
+    segment_offsets = np.append(0, np.cumsum(np.maximum(sizes - 1, 0)))
+    cumulative_norm = np.append(0, np.cumsum(norms))
+    ring_start = cumulative_norm[segment_offsets[:-1]]
+
+    # Generate linspace(0, length, count) for every ring with segments
+    sampled = sizes > 1
+    sample_ring = np.repeat(np.flatnonzero(sampled), counts[sampled])
+    index = _ragged_index(counts[sampled])
+    distances = index * (lengths / np.maximum(counts - 1, 1))[sample_ring]
+
+    # Segmented searchsorted - find the segment each sample lands in,
+    # keeping each sample within its own ring's segments
+    positions = np.searchsorted(cumulative_norm[1:], ring_start[sample_ring] + distances)
+    positions = np.clip(positions, segment_offsets[sample_ring], segment_offsets[sample_ring + 1] - 1)
+    projection = distances - (cumulative_norm[positions] - ring_start[sample_ring])
+    new_coords[new_offsets[sample_ring] + index] = \
+        coords[segments[positions]] + unit_vectors[positions] * projection.reshape((-1, 1))
+
+    # Copy across the rings we didn't sample
+    copied = np.flatnonzero(~sampled)
+    index = _ragged_index(sizes[copied])
+    new_coords[np.repeat(new_offsets[copied], sizes[copied]) + index] = \
+        coords[np.repeat(offsets[copied], sizes[copied]) + index]
+    return new_coords
+
+def _sample_distances(points, unit_vectors, cumulative_norm, distances):
+    positions = np.searchsorted(cumulative_norm, distances)
+    positions = np.clip(positions, 0, len(unit_vectors) - 1)
+    offsets = np.append(0, cumulative_norm)[positions]
+    projection = distances - offsets
+    return points[positions] + (unit_vectors[positions] * projection.reshape((-1, 1)))
+
+def _bounds(coords, offsets):
+    starts, counts = offsets[:-1], np.diff(offsets)
+    result = np.full((len(counts), 4), np.nan)
+    nonempty = counts > 0
+    if nonempty.any():
+        # reduceat runs from each start to the next - since the empty
+        # geometries have no coordinates we can just skip them
+        xy = coords[:, :2]
+        result[nonempty, :2] = np.minimum.reduceat(xy, starts[nonempty])
+        result[nonempty, 2:] = np.maximum.reduceat(xy, starts[nonempty])
+    return result
+
+def ring_lengths(coords, offsets):
+    """
+    Return the length of each ring in a ragged coordinate array
+
+    Parameters:
+        coords - an (n, ndim) array of coordinates
+        offsets - an (nrings + 1,) array of offsets into coords
+
+    Returns:
+        an (nrings,) array of lengths
+    """
+    coords, offsets = _array(coords), _array(offsets, np.int64)
+    if _compiled is not None:
+        return _compiled.ring_lengths(coords, offsets)
+    return _ring_lengths(coords, offsets)
+
+def sample_rings(coords, offsets, new_offsets, lengths):
+    """
+    Sample evenly spaced points along each ring in a ragged coordinate array
+
+    Parameters:
+        coords - an (n, ndim) array of coordinates
+        offsets - an (nrings + 1,) array of offsets into coords
+        new_offsets - an (nrings + 1,) array of offsets into the result, so
+            ring i gets new_offsets[i + 1] - new_offsets[i] samples. Rings
+            with less than two vertices are copied across, so need the
+            same number of samples as they have vertices.
+        lengths - the length of each ring (see `ring_lengths`)
+
+    Returns:
+        an (new_offsets[-1], ndim) array of samples
+    """
+    coords, lengths = _array(coords), _array(lengths)
+    offsets, new_offsets = _array(offsets, np.int64), _array(new_offsets, np.int64)
+    if _compiled is not None:
+        return _compiled.sample_rings(coords, offsets, new_offsets, lengths)
+    return _sample_rings(coords, offsets, new_offsets, lengths)
+
+def sample_distances(points, unit_vectors, cumulative_norm, distances):
+    """
+    Sample distances along a linestring
+
+    Parameters:
+        points - the (n, ndim) vertices of the linestring
+        unit_vectors - the (n - 1, ndim) unit vectors along each segment
+        cumulative_norm - the (n - 1,) distance along the line at the end
+            of each segment
+        distances - the distances to sample at
+
+    Returns:
+        a (len(distances), ndim) array of samples
+    """
+    points, unit_vectors = _array(points), _array(unit_vectors)
+    cumulative_norm, distances = _array(cumulative_norm), _array(distances)
+    if _compiled is not None:
+        return _compiled.sample_distances(points, unit_vectors, cumulative_norm, distances)
+    return _sample_distances(points, unit_vectors, cumulative_norm, distances)
+
+def bounds(coords, offsets):
+    """
+    Return (minx, miny, maxx, maxy) bounds for each geometry in a ragged
+    coordinate array
+
+    Parameters:
+        coords - an (n, ndim) array of coordinates
+        offsets - an (ngeometries + 1,) array of offsets into coords
+
+    Returns:
+        an (ngeometries, 4) array of bounds. Empty geometries get NaN bounds.
+    """
+    coords, offsets = _array(coords), _array(offsets, np.int64)
+    if _compiled is not None:
+        return _compiled.bounds(coords, offsets)
+    return _bounds(coords, offsets)
+
+def interleave(columns):
+    """
+    Scatter separate coordinate arrays (e.g. x, y from a transform)
+    back into one (n, ndim) array
+
+    Parameters:
+        columns - a sequence of ndim arrays of length n
+    """
+    columns = [_array(c) for c in columns]
+    if _compiled is not None:
+        return _compiled.interleave(columns)
+    return np.column_stack(columns)
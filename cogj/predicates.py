@@ -0,0 +1,345 @@
+""" file:    predicates.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Compile voluptuous schemas into plain predicate functions.
+        Validating with voluptuous raises (and builds) an exception for every
+        rejected feature, which dominates the time spent filtering with a
+        selective schema. Compiled predicates just return True or False.
+"""
+
+import inspect
+
+import numpy as np
+from voluptuous import Schema, Required, Optional, All, Any, Range, In, ALLOW_EXTRA, \
+    REMOVE_EXTRA, PREVENT_EXTRA
+from voluptuous.schema_builder import UNDEFINED
+
+# Literal values we know compare the same way in voluptuous and in Python
+LITERALS = (str, bytes, int, float, bool, type(None))
+
+class CompileError(ValueError):
+
+    "Raised when we don't know how to compile part of a schema"
+
+def _type(kind):
+    return lambda value: isinstance(value, kind)
+
+def _literal(literal):
+    return lambda value: value == literal
+
+def _range(validator):
+    low, high = validator.min, validator.max
+    min_included, max_included = validator.min_included, validator.max_included
+
+    def _check(value):
+        try:
+            if low is not None and not (value >= low if min_included else value > low):
+                return False
+            if high is not None and not (value <= high if max_included else value < high):
+                return False
+            return True
+        except TypeError:
+            # Values without an ordering, e.g. None
+            return False
+    return _check
+
+def _in(validator):
+    container = validator.container
+
+    def _check(value):
+        try:
+            return value in container
+        except TypeError:
+            return False
+    return _check
+
+def _all(validator):
+    if getattr(validator, 'discriminant', None) is not None:
+        raise CompileError('Discriminated validators are not supported')
+    checks = tuple(compile_validator(v) for v in validator.validators)
+    return lambda value: all(check(value) for check in checks)
+
+def _any(validator):
+    if getattr(validator, 'discriminant', None) is not None:
+        raise CompileError('Discriminated validators are not supported')
+    checks = tuple(compile_validator(v) for v in validator.validators)
+    return lambda value: any(check(value) for check in checks)
+
+# Validators which don't change values, so they can be chained as predicates.
+# Note we check exact types since subclasses might behave differently
+VALIDATORS = {
+    Range: _range,
+    In: _in,
+    All: _all,
+    Any: _any
+}
+
+def compile_validator(validator):
+    """
+    Compile a voluptuous validator for a single value into a predicate
+
+    Parameters:
+        validator - a type (checked with isinstance), a literal value, or one
+            of Range, In, All or Any of these
+
+    Returns:
+        a function taking a value and returning True if it's valid
+
+    Raises:
+        CompileError if we don't know how to compile the validator
+    """
+    if inspect.isclass(validator):
+        return _type(validator)
+    if type(validator) in VALIDATORS:  # pylint: disable=C0123
+        return VALIDATORS[type(validator)](validator)
+    if type(validator) in LITERALS:  # pylint: disable=C0123
+        return _literal(validator)
+    raise CompileError("Can't compile validator {!r}".format(validator))
+
+def _key(key, required):
+    "Unpack a schema key into the literal key and whether it's required"
+    if type(key) is Required:  # pylint: disable=C0123
+        if key.default is not UNDEFINED:
+            raise CompileError('Required keys with defaults are not supported')
+        key, required = key.schema, True
+    elif type(key) is Optional:  # pylint: disable=C0123
+        key, required = key.schema, False
+    if type(key) not in LITERALS:  # pylint: disable=C0123
+        raise CompileError("Can't compile key {!r}".format(key))
+    return key, required
+
+def _parse_schema(schema):
+    """
+    Unpack a schema into (key, required, validator) checks plus the set of
+    allowed keys (or None if extra keys are allowed)
+
+    Raises:
+        CompileError if we don't know how to compile the schema
+    """
+    if not isinstance(schema, Schema):
+        schema = Schema(schema, extra=ALLOW_EXTRA)
+    if not isinstance(schema.schema, dict) or \
+            schema.extra not in (ALLOW_EXTRA, REMOVE_EXTRA, PREVENT_EXTRA):
+        raise CompileError('Only dictionary schemas can be compiled')
+    checks = []
+    for key, validator in schema.schema.items():
+        key, required = _key(key, schema.required)
+        checks.append((key, required, validator))
+    allowed = frozenset(key for key, _, _ in checks) if schema.extra == PREVENT_EXTRA else None
+    return checks, allowed
+
+def compile_schema(schema):
+    """
+    Compile a voluptuous schema for feature properties into a predicate
+
+    We can compile dictionary schemas with literal keys (optionally marked
+    with Required or Optional) whose values are types, literal values, or
+    Range, In, All or Any of these. The predicate accepts exactly the same
+    properties as the schema does.
+
+    Parameters:
+        schema - a voluptuous.Schema or a dictionary
+
+    Returns:
+        a function taking a properties dictionary and returning True if it
+        validates, or None if the schema can't be compiled (in which case
+        use the schema itself)
+    """
+    try:
+        checks, allowed = _parse_schema(schema)
+        checks = tuple(
+            (key, required, compile_validator(validator))
+            for key, required, validator in checks
+        )
+    except CompileError:
+        return None
+
+    def _predicate(properties):
+        if not isinstance(properties, dict):
+            return False
+        if allowed is not None and not allowed.issuperset(properties):
+            return False
+        for key, required, check in checks:
+            try:
+                value = properties[key]
+            except KeyError:
+                if required:
+                    return False
+                continue
+            if not check(value):
+                return False
+        return True
+    return _predicate
+
+# Column masks. Native numpy columns (see `cogj.table`) hold values which
+# are all the same Python type, so we can vectorize comparisons over them.
+# Anything else gets checked elementwise with the scalar predicate.
+NUMERIC_KINDS = 'biuf'
+NATIVE_KINDS = NUMERIC_KINDS + 'U'
+
+# Integers bigger than this might not compare exactly against float columns
+MAX_EXACT_INTEGER = 2 ** 53
+
+def _is_number(value):
+    "Check whether we can compare a value against numeric columns exactly"
+    return isinstance(value, (bool, int, float)) \
+        and not (isinstance(value, int) and abs(value) > MAX_EXACT_INTEGER)
+
+def _comparable(column, value):
+    """
+    Check whether a value compares against a column the same way in numpy
+    as it does in Python. Returns True or False, or None if comparisons
+    between them are always False (e.g. strings vs numbers).
+    """
+    kind = column.dtype.kind
+    if kind in NUMERIC_KINDS:
+        return True if _is_number(value) else (None if isinstance(value, str) else False)
+    if kind == 'U':
+        return True if isinstance(value, str) else (None if _is_number(value) else False)
+    return False
+
+def _elementwise(validator):
+    check = compile_validator(validator)
+    return lambda column: np.fromiter(
+        (check(value) for value in column.tolist()), dtype=bool, count=len(column))
+
+def _type_mask(validator):
+    elementwise = _elementwise(validator)
+
+    def _mask(column):
+        if column.dtype.kind in NATIVE_KINDS and len(column):
+            # Every value has the same type, so check the first one
+            return np.full(len(column), isinstance(column[:1].tolist()[0], validator))
+        return elementwise(column)
+    return _mask
+
+def _literal_mask(literal):
+    elementwise = _elementwise(literal)
+
+    def _mask(column):
+        comparable = _comparable(column, literal)
+        if comparable is None or (literal is None and column.dtype.kind in NATIVE_KINDS):
+            return np.zeros(len(column), dtype=bool)
+        if comparable:
+            return np.asarray(column == literal, dtype=bool)
+        return elementwise(column)
+    return _mask
+
+def _range_mask(validator):
+    elementwise = _elementwise(validator)
+    bounds = [value for value in (validator.min, validator.max) if value is not None]
+
+    def _mask(column):
+        comparable = {_comparable(column, value) for value in bounds}
+        if None in comparable:
+            # Comparisons raise TypeError in Python, so nothing is valid
+            return np.zeros(len(column), dtype=bool)
+        if comparable != {True}:
+            return elementwise(column)
+        mask = np.ones(len(column), dtype=bool)
+        if validator.min is not None:
+            mask &= column >= validator.min if validator.min_included else column > validator.min
+        if validator.max is not None:
+            mask &= column <= validator.max if validator.max_included else column < validator.max
+        return mask
+    return _mask
+
+def _in_mask(validator):
+    elementwise = _elementwise(validator)
+    container = validator.container
+
+    def _mask(column):
+        if not isinstance(container, (list, tuple, set, frozenset)):
+            return elementwise(column)
+        comparable = {_comparable(column, value) for value in container}
+        if not comparable <= {True, None}:
+            return elementwise(column)
+        items = [value for value in container if _comparable(column, value)]
+        if not items:
+            return np.zeros(len(column), dtype=bool)
+        return np.isin(column, items)
+    return _mask
+
+def _all_mask(validator):
+    if getattr(validator, 'discriminant', None) is not None:
+        raise CompileError('Discriminated validators are not supported')
+    masks = tuple(compile_column(v) for v in validator.validators)
+    return lambda column: np.logical_and.reduce([m(column) for m in masks]) \
+        if masks else np.ones(len(column), dtype=bool)
+
+def _any_mask(validator):
+    if getattr(validator, 'discriminant', None) is not None:
+        raise CompileError('Discriminated validators are not supported')
+    masks = tuple(compile_column(v) for v in validator.validators)
+    return lambda column: np.logical_or.reduce([m(column) for m in masks]) \
+        if masks else np.zeros(len(column), dtype=bool)
+
+COLUMN_VALIDATORS = {
+    Range: _range_mask,
+    In: _in_mask,
+    All: _all_mask,
+    Any: _any_mask
+}
+
+def compile_column(validator):
+    """
+    Compile a voluptuous validator into a function checking a whole column
+    of values at once
+
+    Parameters:
+        validator - a type, a literal value, or one of Range, In, All or Any
+            of these (see `compile_validator`)
+
+    Returns:
+        a function taking a column (a numpy array) and returning a boolean
+        mask which is True where values are valid
+
+    Raises:
+        CompileError if we don't know how to compile the validator
+    """
+    compile_validator(validator)  # check we can compile it at all
+    if inspect.isclass(validator):
+        return _type_mask(validator)
+    if type(validator) in COLUMN_VALIDATORS:  # pylint: disable=C0123
+        return COLUMN_VALIDATORS[type(validator)](validator)
+    return _literal_mask(validator)
+
+def compile_mask(schema):
+    """
+    Compile a voluptuous schema for feature properties into a function
+    which checks a whole `cogj.table.AttributeTable` at once
+
+    The same schemas can be compiled as for `compile_schema`, and the mask
+    matches validating each row's properties with the schema.
+
+    Parameters:
+        schema - a voluptuous.Schema or a dictionary
+
+    Returns:
+        a function taking an AttributeTable and returning a boolean mask
+        which is True for valid rows, or None if the schema can't be compiled
+    """
+    try:
+        checks, allowed = _parse_schema(schema)
+        checks = tuple(
+            (key, required, compile_column(validator))
+            for key, required, validator in checks
+        )
+    except CompileError:
+        return None
+
+    def _mask(table):
+        mask = ~table.null
+        if allowed is not None:
+            for name in table.columns:
+                if name not in allowed:
+                    mask &= ~table.present(name)
+        for key, required, check in checks:
+            present = table.present(key)
+            valid = np.zeros(len(table), dtype=bool)
+            if present.any():
+                valid = check(table.columns[key])
+            mask &= (valid & present) if required else (valid | ~present)
+        return mask
+    return _mask
@@ -0,0 +1,165 @@
+""" file:    quantize.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Coordinate quantization - rounding coordinates to a number
+        of decimals or snapping them to a grid so COGJ payloads are smaller
+"""
+
+import math
+
+import numpy as np
+from shapely.geometry import Point, MultiPoint, LineString, MultiLineString, \
+    LinearRing, Polygon, MultiPolygon
+
+from .feature import Feature, FeatureCollection
+
+# Most significant digits we need to write a grid step exactly
+MAX_GRID_DIGITS = 15
+
+def grid_decimals(grid):
+    """
+    Find the number of decimal places needed to write a grid step
+
+    Multiples of steps like 0.1 aren't exactly representable in binary, so
+    we round snapped coordinates to this many decimals to get rid of the
+    float noise (e.g. 0.30000000000000004 -> 0.3).
+
+    Parameters:
+        grid - the grid spacing
+
+    Returns:
+        the number of decimals, e.g. 1 for 0.1, 4 for 1e-4 and 0 for 5
+    """
+    first = max(0, -math.floor(math.log10(grid)))
+    for decimals in range(first, first + MAX_GRID_DIGITS):
+        # Close enough that the rounding error is well below the step
+        if abs(round(grid, decimals) - grid) <= 1e-12 * grid:
+            return decimals
+    return first + MAX_GRID_DIGITS
+
+def quantize_coords(coords, precision=None, grid=None):
+    """
+    Round coordinates to a number of decimals or snap them to a grid
+
+    Parameters:
+        coords - an (n, ndim) array of coordinates
+        precision - the number of decimal places to round to, e.g. 6 gives
+            ~10cm resolution for WGS84 coordinates
+        grid - the grid spacing to snap to. Only one of precision and grid
+            can be given.
+
+    Returns:
+        the quantized coordinates
+    """
+    if precision is not None and grid is not None:
+        raise ValueError('Only one of precision or grid can be specified')
+    coords = np.asarray(coords, dtype=float)
+    if precision is not None:
+        coords = np.round(coords, int(precision))
+    elif grid is not None:
+        if grid <= 0:
+            raise ValueError('Grid spacing must be positive')
+        coords = np.round(np.round(coords / grid) * grid, grid_decimals(grid))
+    return coords + 0.0  # gets rid of any -0.0s
+
+def drop_duplicates(coords, min_size=2):
+    """
+    Drop consecutive duplicate vertices
+
+    We keep the first vertex of each run of duplicates, so the first and
+    last vertices keep their values and closed rings stay closed. If
+    dropping duplicates would leave fewer than `min_size` vertices (e.g. a
+    ring collapsing to a point after rounding) we keep them all, so the
+    geometry stays structurally valid.
+
+    Parameters:
+        coords - an (n, ndim) array of coordinates
+        min_size - the minimum number of vertices to leave (use 4 for rings)
+    """
+    coords = np.asarray(coords)
+    if len(coords) < 2:
+        return coords
+    keep = np.ones(len(coords), dtype=bool)
+    keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+    deduped = coords[keep]
+    return deduped if len(deduped) >= min_size else coords
+
+def _coords(geom, precision, grid, min_size=2):
+    return drop_duplicates(quantize_coords(geom.coords, precision, grid), min_size)
+
+def _point(geom, precision, grid):
+    return Point(quantize_coords(geom.coords, precision, grid)[0])
+
+def _multipoint(geom, precision, grid):
+    return MultiPoint([_point(p, precision, grid) for p in geom.geoms])
+
+def _linestring(geom, precision, grid):
+    return LineString(_coords(geom, precision, grid))
+
+def _linearring(geom, precision, grid):
+    return LinearRing(_coords(geom, precision, grid, min_size=4))
+
+def _multilinestring(geom, precision, grid):
+    return MultiLineString([_linestring(g, precision, grid) for g in geom.geoms])
+
+def _polygon(geom, precision, grid):
+    return Polygon(
+        _coords(geom.exterior, precision, grid, min_size=4),
+        [_coords(ring, precision, grid, min_size=4) for ring in geom.interiors]
+    )
+
+def _multipolygon(geom, precision, grid):
+    return MultiPolygon([_polygon(g, precision, grid) for g in geom.geoms])
+
+def _feature(geom, precision, grid):
+    return Feature(quantize(geom.geometry, precision, grid), geom.properties)
+
+def _featurecollection(geom, precision, grid):
+    return FeatureCollection([_feature(f, precision, grid) for f in geom])
+
+QUANTIZERS = {
+    'Point': _point,
+    'MultiPoint': _multipoint,
+    'LineString': _linestring,
+    'LinearRing': _linearring,
+    'MultiLineString': _multilinestring,
+    'Polygon': _polygon,
+    'MultiPolygon': _multipolygon,
+    'Feature': _feature,
+    'FeatureCollection': _featurecollection
+}
+
+def quantize(geom, precision=None, grid=None):
+    """
+    Quantize the coordinates of a shapely geometry, Feature or
+    FeatureCollection, dropping any consecutive duplicate vertices
+    this creates
+
+    Parameters:
+        geom - the geometry to quantize
+        precision - the number of decimal places to round to
+        grid - the grid spacing to snap to. Only one of precision and grid
+            can be given.
+
+    Returns:
+        a new quantized geometry
+    """
+    if geom is None or geom.geom_type not in ('Feature', 'FeatureCollection') and geom.is_empty:
+        return geom
+    try:
+        quantizer = QUANTIZERS[geom.geom_type]
+    except KeyError:
+        raise ValueError("Don't know how to quantize a {}".format(geom.geom_type))
+    return quantizer(geom, precision, grid)
+
+def quantize_features(features, precision=None, grid=None):
+    """
+    Quantize a list of features, for use as a Writer `process` step
+
+    Parameters:
+        features - the features to quantize
+        precision - the number of decimal places to round to
+        grid - the grid spacing to snap to
+    """
+    return [_feature(f, precision, grid) for f in features]
@@ -0,0 +1,429 @@
+""" file:    reader.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Read Cloud-Optimized GeoJSON (COGJ) files. Headers can be
+        read without touching the rest of the file, either locally or with
+        HTTP range requests, and local files can be memory-mapped so we only
+        page in the collections we use.
+"""
+
+import json
+import mmap
+import urllib.request
+
+import numpy as np
+from shapely.geometry import shape
+
+from .compression import decompress_collection
+from .encoding import get_loader
+from .feature import Feature
+from .index import PackedTree
+from .utilities import check_bounds
+from .writer import HEADER_SIZE
+
+# Multiply the amount we read by this each time the header doesn't fit
+HEADER_GROWTH = 4
+
+# Seconds to wait for a server before giving up
+TIMEOUT = 30
+
+def is_url(source):
+    "Check whether a source is an HTTP(S) URL rather than a local path"
+    return str(source).startswith(('http://', 'https://'))
+
+def parse_header(data):
+    """
+    Parse a COGJ header from the start of a file
+
+    Parameters:
+        data - bytes from the start of the file. These can stop partway
+            through the collections, as long as the header is all there.
+
+    Returns:
+        the header as a dictionary
+
+    Raises:
+        ValueError if the header isn't all there or doesn't look like a
+        COGJ header
+    """
+    header, _ = json.JSONDecoder().raw_decode(data.decode('utf-8', 'ignore'))
+    if not isinstance(header, dict) or 'collections' not in header:
+        raise ValueError('COGJ header should be a JSON object with a list of collections')
+    return header
+
+def _read_header(read, source):
+    """
+    Read a header using a function which reads the first n bytes of a
+    file, growing n until the header fits
+    """
+    size = HEADER_SIZE
+    while True:
+        data = read(size)
+        try:
+            return parse_header(data)
+        except json.JSONDecodeError:
+            # Either the header is bigger than what we've read, or it's broken
+            if len(data) < size:
+                # We've got the whole file and it still doesn't parse
+                raise ValueError("Couldn't parse COGJ header from {}".format(source))
+            size *= HEADER_GROWTH
+
+def read_local_header(path):
+    """
+    Read the header from a local COGJ file, only reading the header block
+
+    Parameters:
+        path - the path to the file
+    """
+    with open(path, 'rb') as src:
+        def _read(size):
+            src.seek(0)
+            return src.read(size)
+        return _read_header(_read, path)
+
+def fetch_header(url, timeout=TIMEOUT):
+    """
+    Read the header from a remote COGJ file using HTTP range requests
+
+    Parameters:
+        url - the URL of the file
+        timeout - seconds to wait for the server. Optional, defaults to 30.
+    """
+    def _read(size):
+        request = urllib.request.Request(url, headers={'Range': 'bytes=0-{}'.format(size - 1)})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            # If the server ignores the range we still only read what we need
+            return response.read(size)
+    return _read_header(_read, url)
+
+def read_header(source, timeout=TIMEOUT):
+    """
+    Read the header from a COGJ file
+
+    Parameters:
+        source - a local path or an HTTP(S) URL
+        timeout - seconds to wait for remote servers
+
+    Returns:
+        the header as a dictionary
+    """
+    if is_url(source):
+        return fetch_header(source, timeout=timeout)
+    return read_local_header(source)
+
+def _distribution(values):
+    "Summarize a set of values"
+    if not len(values):
+        return None
+    return {
+        'min': values.min().item(),
+        'median': float(np.median(values)),
+        'mean': float(values.mean()),
+        'max': values.max().item(),
+        'total': values.sum().item()
+    }
+
+def _overlap_area(bounds):
+    """
+    Find the total area of the pairwise intersections between some bounds,
+    using a packed RTree to find the pairs which might intersect
+    """
+    tree = PackedTree(bounds)
+    total = 0.0
+    for idx, (minx, miny, maxx, maxy) in enumerate(bounds):
+        others = tree.search((minx, miny, maxx, maxy))
+        others = others[others > idx]  # count each pair once
+        widths = np.minimum(bounds[others, 2], maxx) - np.maximum(bounds[others, 0], minx)
+        heights = np.minimum(bounds[others, 3], maxy) - np.maximum(bounds[others, 1], miny)
+        total += (widths.clip(min=0) * heights.clip(min=0)).sum()
+    return float(total)
+
+def header_summary(header):
+    """
+    Summarize a COGJ header
+
+    The overlap ratio is the total area of the pairwise intersections
+    between collection bounding boxes divided by the total area of the
+    collection bounding boxes. Zero means collections don't overlap at
+    all, so a bbox query touches as few collections as possible; bigger
+    means they overlap more.
+
+    The coverage ratio is the total area of the collection bounding boxes
+    divided by the area of the dataset bounding box. This is below one for
+    sparse data, whether or not the collections overlap.
+
+    Collection sizes are the number of bytes in the file. If collections
+    are compressed we also give the codecs used, the total uncompressed
+    size and the compression ratio.
+
+    Parameters:
+        header - the header as a dictionary
+
+    Returns:
+        a dictionary of information about the file
+    """
+    collections = header.get('collections', [])
+    sizes = np.array([c['size'] for c in collections], dtype=np.int64)
+    counts = np.array([c.get('features', 0) for c in collections], dtype=np.int64)
+    starts = [c['start'] for c in collections]
+    summary = {
+        key: header[key]
+        for key in ('name', 'description', 'version', 'published')
+        if key in header
+    }
+    summary.update(
+        size=header.get('size'),
+        header_size=min(starts) if starts else header.get('size'),
+        bbox=header.get('bbox'),
+        features=header.get('features', counts.sum().item()),
+        collections=len(collections),
+        collection_bytes=_distribution(sizes),
+        collection_features=_distribution(counts),
+        overlap_ratio=None,
+        coverage_ratio=None,
+        codecs=sorted({c['codec'] for c in collections if c.get('codec')}),
+        uncompressed_bytes=None,
+        compression_ratio=None
+    )
+    if summary['codecs']:
+        uncompressed = sum(c.get('uncompressed_size', c['size']) for c in collections)
+        summary['uncompressed_bytes'] = uncompressed
+        if sizes.sum() > 0:
+            summary['compression_ratio'] = float(uncompressed / sizes.sum())
+    if collections:
+        bounds = np.array([c['bbox'] for c in collections], dtype=float)
+        areas = (bounds[:, 2] - bounds[:, 0]) * (bounds[:, 3] - bounds[:, 1])
+        minx, miny = bounds[:, :2].min(axis=0)
+        maxx, maxy = bounds[:, 2:].max(axis=0)
+        total_area = (maxx - minx) * (maxy - miny)
+        if total_area > 0:
+            summary['coverage_ratio'] = float(areas.sum() / total_area)
+        if areas.sum() > 0:
+            summary['overlap_ratio'] = _overlap_area(bounds) / float(areas.sum())
+    return summary
+
+
+def load_collection(data, backend=None):
+    """
+    Decode the body of a collection into `cogj.Feature` objects
+
+    Parameters:
+        data - the collection's bytes (or a memoryview of them)
+        backend - the JSON backend to decode with (see
+            `cogj.encoding.get_loader`)
+
+    Returns:
+        a list of features
+    """
+    collection = get_loader(backend)(data)
+    return [
+        Feature(
+            geometry=shape(f['geometry']) if f['geometry'] is not None else None,
+            properties=f['properties'])
+        for f in collection['features']
+    ]
+
+def overlapping(bounds, bbox):
+    """
+    Find the bounding boxes which overlap a bbox
+
+    Parameters:
+        bounds - an (n, 4) array of (minx, miny, maxx, maxy) bounding boxes
+        bbox - the (minx, miny, maxx, maxy) bounding box to check against
+
+    Returns:
+        the indices of the overlapping bounding boxes
+    """
+    minx, miny, maxx, maxy = check_bounds(bbox)
+    mask = (bounds[:, 0] <= maxx) & (bounds[:, 2] >= minx) \
+        & (bounds[:, 1] <= maxy) & (bounds[:, 3] >= miny)
+    return np.flatnonzero(mask).tolist()
+
+def features_in_bbox(features, bbox):
+    """
+    Filter features to those whose bounds overlap a bbox
+
+    Parameters:
+        features - an iterable of `cogj.Feature`s
+        bbox - a (minx, miny, maxx, maxy) bounding box
+    """
+    minx, miny, maxx, maxy = check_bounds(bbox)
+    for feature in features:
+        if feature.geometry is None or feature.geometry.is_empty:
+            continue
+        fminx, fminy, fmaxx, fmaxy = feature.geometry.bounds
+        if fminx <= maxx and fmaxx >= minx and fminy <= maxy and fmaxy >= miny:
+            yield feature
+
+def collection_bounds(header):
+    "Return the bounding boxes of a header's collections as an (n, 4) array"
+    return np.array([c['bbox'] for c in header['collections']], dtype=float).reshape((-1, 4))
+
+def decode_collection(data, entry, backend=None):
+    """
+    Decode a collection, decompressing it first if it's compressed
+
+    Parameters:
+        data - the collection's bytes as stored in the file
+        entry - the collection's entry from the header
+        backend - the JSON backend to decode with
+
+    Returns:
+        a list of features
+    """
+    return load_collection(decompress_collection(data, entry), backend)
+
+class CollectionView:
+
+    """
+    A collection in a memory-mapped COGJ file
+
+    Nothing is read or decoded until you ask for the data or iterate over
+    the features, and the features are decoded again each time so we don't
+    hang on to them.
+
+    Parameters:
+        reader - the LocalReader the collection belongs to
+        index - the index of the collection in the header
+    """
+
+    def __init__(self, reader, index):
+        self.reader = reader
+        self.index = index
+        self.entry = reader.header['collections'][index]
+
+    @property
+    def bbox(self):
+        "The bounding box of the collection"
+        return self.entry['bbox']
+
+    @property
+    def data(self):
+        """
+        The bytes of the collection, as a memoryview into the file. These
+        are compressed if the collection's entry has a codec.
+        """
+        return self.reader.collection_bytes(self.index)
+
+    def __len__(self):
+        return self.entry['features']
+
+    def __iter__(self):
+        with self.data as data:
+            return iter(decode_collection(data, self.entry))
+
+    def __repr__(self):
+        return 'CollectionView(index={}, features={}, bbox={})'.format(
+            self.index, len(self), self.bbox)
+
+class LocalReader:
+
+    """
+    Read a local COGJ file with random access to its collections
+
+    The file is memory-mapped and the header parsed once. Collection bytes
+    are slices of the map (no copying), and are only decoded when their
+    features are iterated over, so a bbox query only pages in the
+    collections it touches.
+
+    Parameters:
+        path - the path to the COGJ file
+
+    Use as a context manager, or call `close` when you're done. The map
+    stays open until any memoryviews you've taken from it are released.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as src:
+            self._mmap = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header = _read_header(lambda size: self._mmap[:size], path)
+        collections = self.header['collections']
+        self._starts = np.array([c['start'] for c in collections], dtype=np.int64)
+        self._sizes = np.array([c['size'] for c in collections], dtype=np.int64)
+        self.bounds = collection_bounds(self.header)
+        if len(collections) and (self._starts + self._sizes).max() > len(self._mmap):
+            self.close()
+            raise ValueError('Collections run past the end of {}'.format(path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        "Close the memory map"
+        if self._mmap is None:
+            return
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Someone's still got a memoryview, the map gets closed once
+            # they're all released
+            pass
+        self._mmap = None
+
+    @property
+    def closed(self):
+        "Whether the reader has been closed"
+        return self._mmap is None
+
+    def __len__(self):
+        return len(self._starts)
+
+    def collection_bytes(self, index):
+        """
+        Return the bytes for a collection without copying them
+
+        Parameters:
+            index - the index of the collection in the header
+
+        Returns:
+            a memoryview into the file
+        """
+        if self._mmap is None:
+            raise ValueError('Reader is closed')
+        start, size = int(self._starts[index]), int(self._sizes[index])
+        return memoryview(self._mmap)[start:start + size]
+
+    def collection(self, index):
+        "Return a CollectionView for the collection at index"
+        if not -len(self) <= index < len(self):
+            raise IndexError('Collection index out of range')
+        return CollectionView(self, index % len(self))
+
+    @property
+    def collections(self):
+        "Iterate over all the collections"
+        for index in range(len(self)):
+            yield CollectionView(self, index)
+
+    def query(self, bbox):
+        """
+        Find the collections whose bounding boxes overlap a bbox
+
+        Parameters:
+            bbox - a (minx, miny, maxx, maxy) bounding box
+
+        Returns:
+            a list of CollectionViews
+        """
+        return [CollectionView(self, index) for index in overlapping(self.bounds, bbox)]
+
+    def features(self, bbox=None):
+        """
+        Iterate over features, decoding one collection at a time
+
+        Parameters:
+            bbox - a (minx, miny, maxx, maxy) bounding box. Optional, if
+                given we only decode the collections overlapping the bbox,
+                and only yield features which overlap it.
+        """
+        if bbox is None:
+            for collection in self.collections:
+                yield from collection
+            return
+        for collection in self.query(bbox):
+            yield from features_in_bbox(collection, bbox)
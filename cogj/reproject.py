@@ -5,17 +5,82 @@
     description: Reprojection algorithms for shapely geometries
 """
 
-from functools import partial
+from functools import lru_cache
 
 from shapely.geometry import Polygon, MultiPolygon, MultiLineString, \
     LineString, LinearRing, Point, MultiPoint
 import pyproj
 import numpy as np
 
+from . import kernels
 from .feature import Feature, FeatureCollection
+from .columnar import ColumnarCollection
 
 GEOJSON_PROJ = 'EPSG:4326'  # Default/only projection used by GeoJSON
 
+# Maximum number of transformers to keep around, see `get_transformer`
+TRANSFORMER_CACHE_SIZE = 64
+
+def normalize_crs(crs):
+    """
+    Normalize a coordinate reference system so that equivalent ways
+    of writing it give the same cache key
+
+    EPSG codes are upper-cased ('epsg:3112' and '+init=epsg:3112' both
+    become 'EPSG:3112'), whitespace in PROJ strings is collapsed, and
+    dicts (e.g. from fiona) are converted to sorted tuples so they can
+    be hashed.
+
+    Parameters:
+        crs - the coordinate reference system. Optional, None is
+            treated as 'epsg:4326'
+    """
+    if crs is None:
+        return GEOJSON_PROJ
+    if isinstance(crs, dict):
+        return tuple(sorted(crs.items()))
+    if isinstance(crs, str):
+        crs = ' '.join(crs.split())
+        if crs.lower().startswith('+init=') and ' ' not in crs:
+            crs = crs[len('+init='):]
+        if crs.lower().startswith('epsg:'):
+            crs = 'EPSG:' + crs[len('epsg:'):]
+    return crs
+
+@lru_cache(maxsize=TRANSFORMER_CACHE_SIZE)
+def _transformer(from_crs, to_crs):
+    # Keys are normalized CRSes - turn dict keys back into dicts
+    from_crs, to_crs = [dict(c) if isinstance(c, tuple) else c for c in (from_crs, to_crs)]
+    return pyproj.Transformer.from_crs(from_crs, to_crs, always_xy=True)
+
+def get_transformer(from_crs, to_crs=None):
+    """
+    Return a pyproj Transformer from one CRS to another
+
+    Coordinates are always taken and returned in (x, y) order
+    (i.e. longitude, latitude for geographic CRSes) to match GeoJSON.
+
+    Transformers are cached (keyed by the normalized CRSes, see
+    `normalize_crs`) so we only pay for setting them up once per
+    process. The cache is thread-safe, and pyproj transformers can
+    be shared between threads. See `transformer_cache_info` and
+    `clear_transformer_cache`.
+
+    Parameters:
+        from_crs - the source coordinate reference system
+        to_crs - the destination coordinate reference system.
+            Optional, defaults to 'epsg:4326'
+    """
+    return _transformer(normalize_crs(from_crs), normalize_crs(to_crs))
+
+def transformer_cache_info():
+    "Return the hits, misses, maxsize and currsize of the transformer cache"
+    return _transformer.cache_info()
+
+def clear_transformer_cache():
+    "Remove all cached transformers"
+    _transformer.cache_clear()
+
 def get_projector(from_crs, to_crs=None):
     """
     Return a function to reproject something from one
@@ -33,22 +98,63 @@ def get_projector(from_crs, to_crs=None):
             Mercator projection (to make it easy to pass to
             leaflet maps)
     """
-    # Generate pyproj objects from our CRSes
-    prjs = [from_crs, to_crs or GEOJSON_PROJ]
-    for idx, prj in enumerate(prjs):
-        if isinstance(prj, str) and prj.lower().startswith('epsg'):
-            prjs[idx] = pyproj.Proj(init=prj)
-        else:
-            prjs[idx] = pyproj.Proj(prj)
-
     # Generate the function to actually carry out the transforms
-    if prjs[0] == prjs[1]:
+    if normalize_crs(from_crs) == normalize_crs(to_crs):
         _project = lambda *p: p
     else:
-        _project = lambda *p: \
-            np.asarray(list(partial(pyproj.transform, *prjs)(*p)))  # pylint: disable=E1120
+        transformer = get_transformer(from_crs, to_crs)
+        _project = lambda *p: np.asarray(transformer.transform(*p))
     return _project
 
+def transform_coords(coords, projector):
+    """
+    Transform an (n, ndim) array of coordinates with a single call to
+    the projector
+
+    Parameters:
+        coords - the coordinates to transform
+        projector - a function taking x, y (and z) arrays and returning
+            the transformed arrays, e.g. from `get_projector` or
+            `Transformer.transform`
+
+    Returns:
+        an (n, ndim) array of transformed coordinates
+    """
+    coords = np.asarray(coords, dtype=float)
+    if len(coords) == 0:
+        return coords
+    return kernels.interleave(projector(*coords.T))
+
+def reproject_collection(collection, from_crs=None, to_crs=None, projector=None):
+    """
+    Reproject a whole FeatureCollection at once
+
+    Every coordinate in the collection is gathered into one array (see
+    `cogj.columnar`), transformed in a single call and then scattered back
+    into geometries. This is much faster than reprojecting one geometry at a
+    time for large collections.
+
+    Parameters:
+        collection - the FeatureCollection or ColumnarCollection to reproject
+        from_crs - the source coordinate reference system
+        to_crs - the destination coordinate reference system.
+            Optional, defaults to 'epsg:4326'
+        projector - a function to carry out the transform (see
+            `transform_coords`). Optional, if not given we build a
+            Transformer from from_crs and to_crs
+
+    Returns:
+        the reprojected collection, of the same type as the input
+    """
+    if projector is None:
+        projector = get_transformer(from_crs or GEOJSON_PROJ, to_crs).transform
+    if isinstance(collection, ColumnarCollection):
+        return collection.with_coords(transform_coords(collection.coords, projector))
+    arrays = collection.to_arrays()
+    return FeatureCollection.from_arrays(
+        arrays.with_coords(transform_coords(arrays.coords, projector))
+    )
+
 def reproject(geom, from_crs=None, to_crs=None, projector=None):
     """
     Reproject a shapely {Multi,}Polygon or {Multi,}LineString
@@ -91,10 +197,15 @@ def reproject(geom, from_crs=None, to_crs=None, projector=None):
 
 # Reprojection helpers
 def _featurecollection(geom, projector):
-    return FeatureCollection([
-        reproject(f, projector=projector)
-        for f in geom
-    ])
+    try:
+        return reproject_collection(geom, projector=projector)
+    except ValueError:
+        # Some geometry types can't be stored in columns, so
+        # fall back to doing them one at a time
+        return FeatureCollection([
+            reproject(f, projector=projector)
+            for f in geom
+        ])
 
 def _feature(geom, projector):
     return Feature(
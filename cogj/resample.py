@@ -9,6 +9,10 @@
 import numpy as np
 from shapely.geometry import LineString, Polygon
 
+from . import kernels
+from .feature import Feature, FeatureCollection
+from .columnar import ColumnarCollection
+
 class LinestringSampler:
 
     """
@@ -55,18 +59,11 @@ class LinestringSampler:
         Parameters:
             distances - points given as distances along the boundary
         """
-        # Return the indices in cumulative norm that each sample
-        # would need to be inserted at to maintain the sorted propery
-        positions = np.searchsorted(self.cumulative_norm, distances)
-        positions = np.clip(positions, 0, len(self.unit_vectors) - 1)
-        offsets = np.append(0, self.cumulative_norm)[positions]
-
-        # new points, parameterized as a projection length, direction from
-        # an origin vertex
-        projection = distances - offsets
-        direction = self.unit_vectors[positions]
-        origin = self.points[positions]
-        return origin + (direction * projection.reshape((-1, 1)))
+        # Find the segment each sample lands in, and then project along the
+        # segment from its origin vertex (see `cogj.kernels`)
+        return kernels.sample_distances(
+            self.points, self.unit_vectors, self.cumulative_norm, distances
+        )
 
 def resample_linestring_count(linestring, count=None, step=None,
                               step_round=True):
@@ -134,7 +131,11 @@ def resample(geom, resolution, clip=None, return_points=False):
     """
     mapping = {
         'Polygon': resample_polygon,
-        'LineString': resample_linestring
+        'LineString': resample_linestring,
+        'MultiPolygon': resample_geometry,
+        'MultiLineString': resample_geometry,
+        'Feature': resample_geometry,
+        'FeatureCollection': resample_geometry
     }
     try:
         return mapping[geom.geom_type](
@@ -211,3 +212,97 @@ def resample_polygon(polygon, resolution=0.01, clip=None, return_points=True):
     else:
         result = result['shell']
     return result
+
+def resample_rings(coords, offsets, resolution, clip=None):
+    """
+    Resample a whole set of rings (or linestrings) at once
+
+    The rings are given as one ragged coordinate array plus offsets (see
+    `cogj.columnar`). Segment lengths and cumulative distances are worked out
+    for every ring in one pass, and all the sample positions are located with
+    a single segmented `searchsorted`, so this is a handful of numpy calls no
+    matter how many rings there are. Each ring is sampled in the same way as
+    `resample_linestring`.
+
+    Rings with fewer than two vertices (e.g. points) are passed through
+    unchanged.
+
+    Parameters:
+        coords - an (n, ndim) array of coordinates
+        offsets - an (nrings + 1,) array of offsets into coords, so that ring
+            i is coords[offsets[i]:offsets[i + 1]]
+        resolution - the resolution to resample at
+        clip - the minimum and maximum number of samples per ring. If None,
+            defaults to DEFAULT_CLIP
+
+    Returns:
+        the new coordinates and ring offsets, as an (m, ndim) array and an
+        (nrings + 1,) array
+    """
+    clip = clip or DEFAULT_CLIP
+    coords = np.asarray(coords, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    sizes = np.diff(offsets)
+
+    # Work out how many samples we need in each ring
+    lengths = kernels.ring_lengths(coords, offsets)
+    counts = np.where(
+        sizes > 1,
+        np.clip(lengths / resolution, *clip).astype(np.int64),
+        sizes
+    )
+    new_offsets = np.append(0, np.cumsum(counts))
+    new_coords = kernels.sample_rings(coords, offsets, new_offsets, lengths)
+    return new_coords, new_offsets
+
+def resample_collection(collection, resolution, clip=None):
+    """
+    Resample every ring in a collection in one go using `resample_rings`
+
+    Parameters:
+        collection - the FeatureCollection or ColumnarCollection to resample
+        resolution - the resolution to resample at
+        clip - If None, defaults to DEFAULT_CLIP
+
+    Returns:
+        the resampled collection, of the same type as the input
+    """
+    arrays = collection if isinstance(collection, ColumnarCollection) \
+        else collection.to_arrays()
+    coords, ring_offsets = resample_rings(arrays.coords, arrays.ring_offsets, resolution, clip)
+    arrays = ColumnarCollection(
+        coords, arrays.geometry_offsets, arrays.part_offsets,
+        ring_offsets, arrays.type_codes, arrays.properties
+    )
+    return arrays if isinstance(collection, ColumnarCollection) \
+        else FeatureCollection.from_arrays(arrays)
+
+def resample_geometry(geom, resolution, clip=None, return_points=True):
+    """
+    Resample a multi-part geometry, Feature or FeatureCollection using
+    `resample_collection`
+
+    Parameters:
+        geom - the geometry to resample
+        resolution - the resolution to resample at
+        clip - If None, defaults to DEFAULT_CLIP
+        return_points - if True, returns an array of all the resampled points.
+            If False, returns a new instance of the same type as geom
+
+    Returns:
+        depending on return_points - either an array of points or a new
+        geometry
+    """
+    if geom.geom_type == 'FeatureCollection':
+        collection = geom
+    elif geom.geom_type == 'Feature':
+        collection = FeatureCollection([geom])
+    else:
+        collection = FeatureCollection([Feature(geom)])
+    arrays = resample_collection(collection.to_arrays(), resolution, clip)
+    if return_points:
+        return arrays.coords
+    elif geom.geom_type == 'FeatureCollection':
+        return FeatureCollection.from_arrays(arrays)
+    feature = next(iter(arrays))
+    return feature if geom.geom_type == 'Feature' else feature.geometry
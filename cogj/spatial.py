@@ -0,0 +1,121 @@
+""" file:    spatial.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Spatial predicates for filtering features against an area
+        of interest - a cheap bounding box test first, then an exact test
+        against a prepared geometry
+"""
+
+import warnings
+
+import numpy as np
+from shapely.geometry import box
+from shapely.prepared import prep
+from shapely.strtree import STRtree
+
+from .utilities import check_bounds
+
+class SpatialFilter:
+
+    """
+    Test whether geometries intersect an area of interest
+
+    Geometries are checked against the bounds of the area first, and only
+    the ones which overlap get the exact (prepared geometry) test.
+
+    Parameters:
+        area - the area of interest, either a shapely geometry or a
+            (minx, miny, maxx, maxy) bounding box
+        index - if True, build an STRtree over the parts of a multipart
+            area and only test the parts near each geometry. Worthwhile for
+            complex areas made of lots of polygons (e.g. coastlines).
+            Optional, defaults to False.
+    """
+
+    def __init__(self, area, index=False):
+        if not hasattr(area, 'geom_type'):
+            area = box(*check_bounds(area))
+        if area.is_empty:
+            raise ValueError('Area of interest is empty')
+        self.area = area
+        self.bounds = area.bounds
+        self.prepared = prep(area)
+
+        self.tree = None
+        parts = list(getattr(area, 'geoms', [area]))
+        if index and len(parts) > 1:
+            with warnings.catch_warnings():
+                # shapely 1.8 warns about the STRtree API changing in 2.0
+                warnings.simplefilter('ignore')
+                self.tree = STRtree(parts)
+            self._parts = parts
+            self._prepared_parts = [prep(p) for p in parts]
+            self._part_index = {id(p): idx for idx, p in enumerate(parts)}
+
+    def _candidates(self, geometry):
+        "Return the indices of the parts whose bounds overlap the geometry"
+        result = self.tree.query(geometry)
+        if isinstance(result, np.ndarray) and result.dtype.kind in 'iu':
+            return result.tolist()  # shapely 2 returns indices
+        return [self._part_index[id(g)] for g in result]
+
+    def overlaps_bounds(self, bounds):
+        """
+        Check whether a bounding box overlaps the bounds of the area
+
+        Parameters:
+            bounds - a (minx, miny, maxx, maxy) tuple, or an (n, 4) array of them
+
+        Returns:
+            a bool, or a boolean mask for an array of bounds. NaN (empty)
+            bounds never overlap.
+        """
+        minx, miny, maxx, maxy = self.bounds
+        bounds = np.asarray(bounds, dtype=float)
+        with np.errstate(invalid='ignore'):
+            return (bounds[..., 0] <= maxx) & (bounds[..., 2] >= minx) \
+                & (bounds[..., 1] <= maxy) & (bounds[..., 3] >= miny)
+
+    def intersects(self, geometry):
+        "Exact test, skipping the bounding box check"
+        if self.tree is not None:
+            return any(self._prepared_parts[idx].intersects(geometry)
+                       for idx in self._candidates(geometry))
+        return self.prepared.intersects(geometry)
+
+    def __call__(self, geometry):
+        """
+        Check whether a geometry intersects the area of interest
+
+        Parameters:
+            geometry - a shapely geometry. None and empty geometries never
+                intersect.
+        """
+        if geometry is None or geometry.is_empty:
+            return False
+        gminx, gminy, gmaxx, gmaxy = geometry.bounds
+        minx, miny, maxx, maxy = self.bounds
+        if gminx > maxx or gmaxx < minx or gminy > maxy or gmaxy < miny:
+            return False
+        return self.intersects(geometry)
+
+    def mask(self, geometries):
+        """
+        Check a whole set of geometries at once
+
+        Parameters:
+            geometries - a `cogj.ColumnarCollection` (whose bounds we get in
+                one pass over the coordinate buffer) or a sequence of shapely
+                geometries
+
+        Returns:
+            a boolean mask which is True for geometries intersecting the area
+        """
+        if hasattr(geometries, 'coordinate_offsets'):
+            candidates = np.flatnonzero(self.overlaps_bounds(geometries.bounds))
+            mask = np.zeros(len(geometries), dtype=bool)
+            mask[candidates] = [
+                self.intersects(geometries.geometry(idx)) for idx in candidates.tolist()]
+            return mask
+        return np.fromiter(map(self, geometries), dtype=bool, count=len(geometries))
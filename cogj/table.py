@@ -0,0 +1,179 @@
+""" file:    table.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Column-oriented attribute tables, so we can filter feature
+        properties with boolean masks over whole columns instead of one
+        dictionary at a time
+"""
+
+import numpy as np
+
+# Python types we store in native numpy columns, anything else is an object column
+NATIVE_TYPES = (bool, int, float, str)
+
+def _column(values):
+    """
+    Make a column from a list of values, using a native dtype if every value
+    has the same (bool, int, float or str) type so we can vectorize over it
+    """
+    kinds = {type(v) for v in values}
+    if len(kinds) == 1 and kinds.pop() in NATIVE_TYPES:
+        column = np.asarray(values)
+        if column.dtype.kind in 'biufU':
+            return column
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+class AttributeTable:
+
+    """
+    Feature properties stored column by column
+
+    Rows correspond to features. Each column is a numpy array; since GeoJSON
+    features don't all have to have the same properties we also keep track
+    of which properties each feature is missing, and which features have
+    null properties.
+
+    Parameters:
+        columns - a dictionary mapping property names to arrays, which must
+            all be the same length, or a numpy structured array
+        missing - a dictionary mapping property names to boolean arrays which
+            are True where a feature doesn't have that property. Optional,
+            defaults to every feature having every property.
+        null - a boolean array which is True where a feature has null
+            properties. Optional, defaults to no null properties.
+        size - the number of rows. Optional, only needed if there are no
+            columns and no null array.
+    """
+
+    def __init__(self, columns, missing=None, null=None, size=None):
+        if isinstance(columns, np.ndarray) and columns.dtype.names:
+            columns = {name: columns[name] for name in columns.dtype.names}
+        self.columns = {
+            name: values if isinstance(values, np.ndarray) else _column(list(values))
+            for name, values in columns.items()
+        }
+        sizes = {len(values) for values in self.columns.values()}
+        if null is not None:
+            sizes.add(len(null))
+        if size is not None:
+            sizes.add(size)
+        if len(sizes) > 1:
+            raise ValueError('Columns should all be the same length')
+        self.size = sizes.pop() if sizes else 0
+        self.null = np.zeros(self.size, dtype=bool) if null is None \
+            else np.asarray(null, dtype=bool)
+        self.missing = {}
+        for name, mask in (missing or {}).items():
+            if name not in self.columns:
+                raise ValueError('Missing values given for unknown column {}'.format(name))
+            mask = np.asarray(mask, dtype=bool)
+            if mask.any():
+                self.missing[name] = mask
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a table from a list of property dictionaries
+
+        Parameters:
+            records - a list of dictionaries (or None for null properties),
+                e.g. `[f.properties for f in features]`
+        """
+        records = list(records)
+        names = {}
+        for record in records:
+            names.update(dict.fromkeys(record or ()))
+        columns, missing = {}, {}
+        for name in names:
+            present = np.array([r is not None and name in r for r in records], dtype=bool)
+            values = [r[name] for r, p in zip(records, present) if p]
+            column = _column(values)
+            if not present.all():
+                # Pad with placeholders, which are ignored since they're missing
+                padded = np.zeros(len(records), dtype=column.dtype) \
+                    if column.dtype.kind != 'O' else np.full(len(records), None, dtype=object)
+                padded[present] = column
+                column = padded
+                missing[name] = ~present
+            columns[name] = column
+        null = np.array([r is None for r in records], dtype=bool)
+        return cls(columns, missing=missing, null=null, size=len(records))
+
+    def __len__(self):
+        return self.size
+
+    def present(self, name):
+        "Return a boolean array which is True where features have a property"
+        if name not in self.columns:
+            return np.zeros(self.size, dtype=bool)
+        present = ~self.null
+        if name in self.missing:
+            present &= ~self.missing[name]
+        return present
+
+    def take(self, index):
+        """
+        Select rows from the table
+
+        Parameters:
+            index - an array of row indices, or a boolean mask
+
+        Returns:
+            a new AttributeTable
+        """
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        return type(self)(
+            {name: values[index] for name, values in self.columns.items()},
+            missing={name: mask[index] for name, mask in self.missing.items()},
+            null=self.null[index],
+            size=len(index)
+        )
+
+    def select(self, names):
+        """
+        Keep only some columns of the table. Names which aren't in the
+        table are ignored.
+
+        Parameters:
+            names - the names of the columns to keep
+
+        Returns:
+            a new AttributeTable
+        """
+        names = set(names)
+        names = [name for name in self.columns if name in names]
+        return type(self)(
+            {name: self.columns[name] for name in names},
+            missing={name: self.missing[name] for name in names if name in self.missing},
+            null=self.null,
+            size=self.size
+        )
+
+    def records(self):
+        """
+        Return the properties of each feature as a list of dictionaries
+        (or None for null properties), with Python rather than numpy values
+        """
+        columns = [
+            (name, values.tolist(), self.missing.get(name))
+            for name, values in self.columns.items()
+        ]
+        records = []
+        for idx, null in enumerate(self.null.tolist()):
+            if null:
+                records.append(None)
+                continue
+            records.append({
+                name: values[idx]
+                for name, values, missing in columns
+                if missing is None or not missing[idx]
+            })
+        return records
+
+    def __iter__(self):
+        return iter(self.records())
@@ -6,7 +6,9 @@
 """
 
 import collections
+import collections.abc
 import itertools
+from concurrent.futures import wait, FIRST_COMPLETED
 
 from toolz import curry
 
@@ -20,10 +22,51 @@ def grouper(size, iterable):
             return None
         yield chunk
 
+def bounded_map(executor, func, tasks, in_flight, ordered=True):
+    """
+    Map a function over argument tuples using an executor, with at most
+    `in_flight` tasks submitted (or finished and waiting to be yielded) at
+    once, so a slow consumer doesn't pile up results in memory
+
+    Parameters:
+        executor - a `concurrent.futures` executor
+        func - the function to call
+        tasks - an iterable of argument tuples, consumed lazily
+        in_flight - the maximum number of tasks in flight
+        ordered - if True, yield results in the same order as the tasks,
+            otherwise yield them as they complete
+
+    Tasks which haven't started are cancelled if we stop early.
+    """
+    pending = collections.deque() if ordered else set()
+    try:
+        for args in tasks:
+            future = executor.submit(func, *args)
+            if ordered:
+                pending.append(future)
+                if len(pending) >= in_flight:
+                    yield pending.popleft().result()
+            else:
+                pending.add(future)
+                if len(pending) >= in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+        while pending:
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
 def flatten(list_of_lists):
     "Flatten a list of list of ... of lists"
     for elem in list_of_lists:
-        if isinstance(elem, collections.Iterable) and not isinstance(elem, (str, bytes)):
+        if isinstance(elem, collections.abc.Iterable) and not isinstance(elem, (str, bytes)):
             yield from flatten(elem)
         else:
             yield elem
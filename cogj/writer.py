@@ -0,0 +1,445 @@
+""" file:    writer.py (cogj)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Streaming writer for Cloud-Optimized GeoJSON (COGJ) files
+"""
+
+import array
+import json
+import math
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+from shapely.geometry import shape
+
+from .compression import compress, get_codec
+from .encoding import encode_feature
+from .feature import Feature, FeatureCollection
+from .index import get_packer, partition as pack_partition
+from .logging import LoggerMixin
+from .quantize import quantize_coords, quantize_features
+from .utilities import bounded_map
+
+# Size of the header block in bytes. Readers grab this many bytes from the
+# start of the file and parse the header out of it, so we pad the header
+# out to (a multiple of) this size
+HEADER_SIZE = 10000
+
+# Default number of features in each collection
+COLLECTION_SIZE = 1000
+
+# Wrappers for collection bodies
+COLLECTION_PREFIX = b'{"type":"FeatureCollection","features":['
+COLLECTION_SUFFIX = b']}'
+SEPARATOR = b'\n'
+
+def merge_bounds(bounds):
+    """
+    Merge an (n, 4) array of bounding boxes into one bounding box
+
+    Parameters:
+        bounds - an array of (minx, miny, maxx, maxy) bounds
+
+    Returns:
+        the bounding box of all the bounds as a list
+    """
+    bounds = np.asarray(bounds, dtype=float).reshape((-1, 4))
+    return [
+        float(bounds[:, 0].min()), float(bounds[:, 1].min()),
+        float(bounds[:, 2].max()), float(bounds[:, 3].max())
+    ]
+
+def load_feature(data):
+    "Load a feature serialized with `encode_feature`"
+    feature = json.loads(data.decode('utf-8'))
+    return Feature(shape(feature['geometry']), feature['properties'])
+
+def reproject_features(features, from_crs, to_crs=None):
+    """
+    Reproject a list of features, for use as a Writer `process` step
+
+    Parameters:
+        features - the features to reproject
+        from_crs - the source coordinate reference system
+        to_crs - the destination coordinate reference system.
+            Optional, defaults to 'epsg:4326'
+    """
+    from .reproject import reproject
+    return list(reproject(FeatureCollection(features), from_crs=from_crs, to_crs=to_crs))
+
+def _run_steps(steps, features):
+    for step in steps:
+        features = step(features)
+    return features
+
+def chain(*steps):
+    """
+    Chain together Writer `process` steps, running them in order
+
+    The result is picklable as long as the steps are.
+    """
+    steps = tuple(s for s in steps if s is not None)
+    return partial(_run_steps, steps) if steps else None
+
+def build_collection(features, bounds, process=None, quantizer=None, compressor=None):
+    """
+    Build the body of a collection from serialized features
+
+    This is where the per-collection work happens, so it runs in a worker
+    process when writing in parallel. It has to be a module-level function
+    so it can be pickled.
+
+    Parameters:
+        features - a list of features serialized with `encode_feature`
+        bounds - an (n, 4) array of bounds for the features
+        process - a function taking a list of `cogj.Feature` objects and
+            returning a new list (e.g. reprojected, filtered or resampled).
+            Optional, if None the features are written out as they are.
+        quantizer - a function like `process` which quantizes coordinates
+            (see `cogj.quantize.quantize_features`), run after `process`.
+            We keep track of how many bytes it saves. Optional.
+        compressor - a function compressing the body (see
+            `cogj.compression.compress`). Optional, defaults to writing the
+            body uncompressed.
+
+    Returns:
+        a tuple of the body, its bounding box, the number of features in
+        it, the number of bytes saved by quantizing and the size of the
+        body before compression, or None if processing removed all the
+        features
+    """
+    saved = 0
+    if process is not None or quantizer is not None:
+        processed = [load_feature(f) for f in features]
+        if process is not None:
+            processed = process(processed)
+            features = [encode_feature(f) for f in processed]
+        if quantizer is not None:
+            full_size = sum(len(f) for f in features)
+            processed = quantizer(processed)
+            features = [encode_feature(f) for f in processed]
+            saved = full_size - sum(len(f) for f in features)
+        bounds = [f.geometry.bounds for f in processed]
+    if not features:
+        return None
+    body = COLLECTION_PREFIX + b','.join(features) + COLLECTION_SUFFIX
+    size = len(body)
+    if compressor is not None:
+        body = compressor(body)
+    return body, merge_bounds(bounds), len(features), saved, size
+
+def ordered_map(func, tasks, jobs, buffer=None):
+    """
+    Map a function over argument tuples in a pool of worker processes,
+    yielding the results in the same order as the tasks
+
+    Parameters:
+        func - the function to call, must be picklable
+        tasks - an iterable of argument tuples
+        jobs - the number of worker processes
+        buffer - the maximum number of tasks in flight (or finished and
+            waiting to be yielded) at once. Optional, defaults to 2 * jobs
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from bounded_map(executor, func, tasks, buffer or 2 * jobs)
+
+class Writer(LoggerMixin):
+
+    """
+    Write features out to a COGJ file with bounded memory usage
+
+    Features are serialized one at a time to a temporary spool file as
+    they are added, and we only keep their bounds and offsets in memory.
+    When the writer is closed we partition the features into spatially
+    coherent collections (the leaves of a packed RTree), write each
+    collection into a second spool, and then write the header followed by
+    the collection bodies to the sink.
+    Peak memory depends on the size of a collection rather than the size
+    of the dataset.
+
+    Parameters:
+        sink - the path to write the COGJ file to
+        metadata - a dictionary of extra information for the header (e.g.
+            name, description, version, published). Optional.
+        collection_size - the maximum number of features in each
+            collection. Optional, defaults to 1000.
+        partition - how to group features into collections. Either the name
+            of a packing method from `cogj.index` ('str' or 'hilbert') or a
+            function taking an (n, 4) array of bounds and a collection size
+            and returning a list of index arrays, one for each collection.
+            Optional, defaults to 'str'.
+        spool_dir - the directory to put temporary spool files in.
+            Optional, defaults to the system temporary directory.
+        process - a function applied to the features in each collection
+            before it's written out (see `build_collection`). Must be
+            picklable if jobs > 1. Optional, defaults to None. Note that
+            features are partitioned using their bounds before processing.
+        jobs - the number of worker processes to build collections with.
+            Collections are always written in the same order, so the output
+            doesn't depend on the number of jobs. Optional, defaults to 1
+            (build them in this process), use 0 for one per CPU.
+        precision - the number of decimal places to round coordinates to.
+            Consecutive vertices which end up the same are dropped. Optional,
+            defaults to None (full precision).
+        grid - the grid spacing to snap coordinates to, instead of rounding
+            to a number of decimals. Optional, defaults to None.
+        codec - compress each collection with this codec ('gzip' or 'zstd',
+            see `cogj.compression`). Collections are compressed separately so
+            they can still be read with range requests, and their header
+            entries record the codec and the uncompressed size (`size` is
+            the number of bytes in the file). Optional, defaults to None
+            (no compression).
+        compression_level - the compression level for the codec. Optional,
+            defaults to the codec's default.
+
+    The number of bytes saved by quantizing each collection is logged, and
+    kept in `bytes_saved` once the writer is closed.
+    """
+
+    def __init__(self, sink, metadata=None, collection_size=COLLECTION_SIZE,
+                 partition='str', spool_dir=None, process=None, jobs=1,
+                 precision=None, grid=None, codec=None,
+                 compression_level=None):  # pylint: disable=R0913
+        if collection_size < 1:
+            raise ValueError('collection_size must be a positive integer')
+        self.sink = sink
+        self.metadata = dict(metadata or {})
+        self.collection_size = collection_size
+        if callable(partition):
+            self.partition = partition
+        else:
+            get_packer(partition)  # check we know about the method
+            self.partition = partial(pack_partition, method=partition)
+        self.spool_dir = spool_dir
+        self.process = process
+        self.jobs = jobs or os.cpu_count() or 1
+        self.quantizer = None
+        if precision is not None or grid is not None:
+            quantize_coords([[0, 0]], precision, grid)  # check the arguments
+            self.quantizer = partial(quantize_features, precision=precision, grid=grid)
+        self.codec = codec
+        self.compressor = None
+        if codec is not None:
+            get_codec(codec)  # check we can use it
+            self.compressor = partial(compress, codec=codec, level=compression_level)
+
+        # Storage for spooled features, we only keep offsets & bounds
+        self._spool = tempfile.TemporaryFile(dir=spool_dir)
+        self._offsets = array.array('q')
+        self._bounds = array.array('d')
+        self._position = 0
+        self.collections = None
+        self.bytes_saved = None
+        self.header_size = HEADER_SIZE
+        self._body_size = 0
+        self.closed = False
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        else:
+            self._spool.close()
+
+    def add(self, feature):
+        """
+        Add a feature to the file
+
+        Parameters:
+            feature - a `cogj.Feature` instance
+        """
+        if self.closed:
+            raise ValueError('Cannot add features to a closed writer')
+        data = encode_feature(feature)
+        self._spool.write(data)
+        self._offsets.append(self._position)
+        self._bounds.extend(feature.geometry.bounds)
+        self._position += len(data)
+
+    def extend(self, features):
+        "Add an iterable of features to the file"
+        for feature in features:
+            self.add(feature)
+
+    def close(self):
+        "Partition features into collections and write out the file"
+        if self.closed:
+            return
+        try:
+            with tempfile.TemporaryFile(dir=self.spool_dir) as bodies:
+                self._write_collections(bodies)
+                header = self._write_header_block()
+                with open(self.sink, 'wb') as sink:
+                    sink.write(header)
+                    bodies.seek(0)
+                    shutil.copyfileobj(bodies, sink)
+        finally:
+            self._spool.close()
+            self.closed = True
+
+    def _read_feature(self, index, offsets):
+        "Read the serialized feature at a given index from the spool"
+        self._spool.seek(offsets[index])
+        return self._spool.read(offsets[index + 1] - offsets[index])
+
+    def _tasks(self, groups, offsets, bounds):
+        "Generate arguments for `build_collection` for each group"
+        for group in groups:
+            # Read features in spool order so we're not seeking all over the place
+            group = np.sort(group)
+            features = [self._read_feature(i, offsets) for i in group]
+            yield features, bounds[group], self.process, self.quantizer, self.compressor
+
+    def _write_collections(self, bodies):
+        "Group features into collections and write them to the body spool"
+        offsets = np.append(np.frombuffer(self._offsets, dtype=np.int64), self._position)
+        bounds = np.frombuffer(self._bounds, dtype=float).reshape((-1, 4))
+        groups = self.partition(bounds, self.collection_size)
+        self.logger.info('Writing %s features in %s collections', len(self), len(groups))
+
+        # Build collections, in parallel if we've been asked to
+        tasks = self._tasks(groups, offsets, bounds)
+        if self.jobs > 1 and len(groups) > 1:
+            self.logger.info('Building collections with %s processes', self.jobs)
+            results = ordered_map(build_collection, tasks, self.jobs)
+        else:
+            results = (build_collection(*args) for args in tasks)
+
+        self.collections, self.bytes_saved, position, uncompressed = [], [], 0, 0
+        for result in results:
+            if result is None:
+                continue
+            body, bbox, count, saved, size = result
+            if self.quantizer is not None:
+                self.logger.info('Quantizing collection %s saved %s bytes (%.1f%%)',
+                                 len(self.collections), saved, 100 * saved / (size + saved))
+            self.bytes_saved.append(saved)
+            bodies.write(body + SEPARATOR)
+            entry = {
+                'start': position,
+                'size': len(body),
+                'bbox': bbox,
+                'features': count
+            }
+            if self.codec is not None:
+                entry.update(codec=self.codec, uncompressed_size=size)
+                uncompressed += size
+            self.collections.append(entry)
+            position += len(body) + len(SEPARATOR)
+        self._body_size = position
+        if self.quantizer is not None:
+            self.logger.info('Quantizing saved %s bytes in total', sum(self.bytes_saved))
+        if self.codec is not None and uncompressed:
+            compressed = sum(c['size'] for c in self.collections)
+            self.logger.info('Compressed collections with %s from %s to %s bytes (%.1fx)',
+                             self.codec, uncompressed, compressed, uncompressed / compressed)
+
+    def header(self, header_size=None):
+        """
+        Generate the header for the file
+
+        Parameters:
+            header_size - the size of the header block, used to offset
+                the start of each collection. Optional, defaults to the
+                size of the block written out when the writer was closed
+
+        Returns:
+            the header as a dictionary. Before the writer is closed this is
+            provisional, with the features added so far but no collections.
+        """
+        header_size = header_size or self.header_size
+        header = dict(self.metadata)
+        header.update(
+            size=header_size + self._body_size,
+            features=sum(c['features'] for c in self.collections) \
+                if self.collections is not None else len(self),
+            bbox=merge_bounds([c['bbox'] for c in self.collections]) \
+                if self.collections else [0, 0, 0, 0],
+            collections=[
+                dict(c, start=c['start'] + header_size)
+                for c in self.collections
+            ] if self.collections is not None else []
+        )
+        return header
+
+    def _write_header_block(self):
+        """
+        Serialize the header, padding out to the header block size
+
+        If the header doesn't fit in the default block we expand the block
+        (in multiples of HEADER_SIZE) until it does
+        """
+        header_size = HEADER_SIZE
+        while True:
+            data = json.dumps(self.header(header_size), separators=(',', ':'))
+            data = data.encode('utf-8')
+            if len(data) < header_size:
+                break
+            header_size = HEADER_SIZE * math.ceil((len(data) + 1) / HEADER_SIZE)
+            self.logger.debug('Expanding header block to %s bytes', header_size)
+        self.header_size = header_size
+        return data + b' ' * (header_size - len(data) - 1) + SEPARATOR
+
+def convert(source, sink, layer=None, **kwargs):
+    """
+    Convert a vector dataset to a COGJ file
+
+    Features are streamed from the source one at a time using fiona, and
+    reprojected to WGS84 (the GeoJSON CRS) if required. Reprojection happens
+    a collection at a time when the file is written, so it runs in parallel
+    if jobs > 1 is passed through to the Writer.
+
+    Parameters:
+        source - the path to the vector dataset to read
+        sink - the path to write the COGJ file to
+        layer - the layer to read from the source. Optional, defaults to
+            the first layer
+        kwargs - passed to `cogj.writer.Writer`
+
+    Returns:
+        the header of the written file
+    """
+    # Imports here so we only need fiona for conversion
+    import fiona
+    from fiona.crs import to_string
+
+    from .reproject import GEOJSON_PROJ
+
+    with fiona.open(source, layer=layer) as src:
+        crs = to_string(src.crs) or GEOJSON_PROJ
+        reproject = crs.lower() not in (GEOJSON_PROJ.lower(), '+init=' + GEOJSON_PROJ.lower())
+        if reproject:
+            # Reproject before any other processing
+            kwargs['process'] = chain(
+                partial(reproject_features, from_crs=crs),
+                kwargs.get('process')
+            )
+        with Writer(sink, **kwargs) as writer:
+            if reproject:
+                writer.logger.info('Reprojecting features from %s', crs)
+            _write_records(src, writer)
+    return writer.header()
+
+def _write_records(src, writer):
+    "Add fiona records to a writer, skipping any without geometries"
+    skipped = 0
+    for record in src:
+        if record['geometry'] is None:
+            skipped += 1
+            continue
+        writer.add(Feature(
+            geometry=shape(record['geometry']),
+            properties=dict(record['properties'])
+        ))
+    if skipped:
+        writer.logger.warning('Skipped %s features with no geometry', skipped)
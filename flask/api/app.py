@@ -37,11 +37,11 @@ def describe_feature_type(wfs_server, geo_serverless):
 
 def get_feature(wfs_server, geo_serverless):
     bbox = get_request_arg_casei("BBOX")
-    feature_collections = geo_serverless.read_feature_collections(geo_serverless.get_collections_for_bbox(bbox))
+    features = geo_serverless.iter_features(geo_serverless.get_collections_for_bbox(bbox))
 
-    gml_path = wfs_server.get_feature(get_request_arg_casei("TYPENAME"), feature_collections, bbox)
-    with open(gml_path) as f:
-        return Response(f.read(), mimetype="text/xml; subtype=gml/3.1.1")
+    # Streamed - collections are read and encoded as the response is written out
+    gml = wfs_server.get_feature(get_request_arg_casei("TYPENAME"), features, bbox)
+    return Response(gml, mimetype="text/xml; subtype=gml/3.1.1")
 
 
 # @app.route("/ol_wfs_demo.html")
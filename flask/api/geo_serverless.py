@@ -1,18 +1,38 @@
-import requests
-from shapely.geometry import box
+import json
+import numpy as np
+from cogj.client import RequestError
+from cogj.compression import decompress_collection
 import exceptions
+from header_cache import HEADER_CACHE
+from ranges import get_client, get_session
 from utils import is_dev
-from urlparse import urlparse
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
 import os
 
 
 class Geo_Serverless:
-    def __init__(self, COGJ_URL):
+    def __init__(self, COGJ_URL, client=None, header_cache=None):
         if COGJ_URL is None:
             raise exceptions.GeoServerlessException("COGJ_URL not provided.")
 
         self.COGJ_URL = COGJ_URL
         self.header = None
+        self._derived = {}
+        self._client = client
+        self.header_cache = header_cache if header_cache is not None else HEADER_CACHE
+
+    @property
+    def client(self):
+        # The cogj Client which reads collections, shared between requests for the same URL
+        if self._client is None:
+            try:
+                self._client = get_client(self.COGJ_URL)
+            except ValueError as e:
+                raise exceptions.GeoServerlessException(str(e))
+        return self._client
 
     def get_filename_from_url(self):
         return os.path.basename(urlparse(self.COGJ_URL).path)
@@ -21,10 +41,10 @@ class Geo_Serverless:
         if self.COGJ_URL is None:
             raise exceptions.GeoServerlessException("No S3 URL configured")
 
-        response = requests.get(self.COGJ_URL, headers={
-            "Range": "bytes=0-9999"
-        })
-        self.header = response.json()
+        # Headers are cached between requests and revalidated with their ETag
+        entry = self.header_cache.get_entry(self.COGJ_URL, get_session())
+        self.header = entry.header
+        self._derived = entry.derived
 
     def get_collections(self):
         if self.header is None:
@@ -70,6 +90,15 @@ class Geo_Serverless:
 
     #     return list(cascaded_union(bboxes).bounds)
 
+    def get_collection_bboxes(self):
+        # Collection bboxes as an (n, 4) array, cached with the header so we only build them once
+        if "collection_bboxes" not in self._derived:
+            collections = self.get_collections()
+            self._derived["collection_bboxes"] = np.array(
+                [collection["bbox"] for collection in collections], dtype=float
+            ).reshape((len(collections), 4))
+        return self._derived["collection_bboxes"]
+
     def get_collections_for_bbox(self, bbox=None):
         if self.header is None:
             self.read_header()
@@ -80,13 +109,15 @@ class Geo_Serverless:
             else:
                 return self.header["collections"]
 
-        filter_bbox = box(*[float(i) for i in bbox.split(",")])
-        filtered_collections = []
-        for collection in self.header["collections"]:
-            collection_bbox = box(*collection["bbox"])
-            if filter_bbox.intersects(collection_bbox) is True:
-                filtered_collections.append(collection)
-        return filtered_collections
+        try:
+            minx, miny, maxx, maxy = [float(i) for i in bbox.split(",")[:4]]
+        except ValueError:
+            raise exceptions.GeoServerlessException("Couldn't parse bbox '{}'".format(bbox))
+
+        bboxes = self.get_collection_bboxes()
+        intersects = (bboxes[:, 0] <= maxx) & (bboxes[:, 2] >= minx) & (bboxes[:, 1] <= maxy) & (bboxes[:, 3] >= miny)
+        collections = self.header["collections"]
+        return [collections[i] for i in np.flatnonzero(intersects)]
 
     def find_smallest_collection(self):
         smallest = None
@@ -97,20 +128,43 @@ class Geo_Serverless:
                 smallest = collection
         return smallest
 
-    def read_feature_collections(self, collections):
-        featureCollection = {
-            "type": "FeatureCollection",
-            "features": []
-        }
-
+    @staticmethod
+    def _check_collections(collections):
         for collection in collections:
             if "start" not in collection or "size" not in collection:
                 raise exceptions.GeoServerlessException("FeatureCollection missing 'start'/'size'")
 
-            response = requests.get(self.COGJ_URL, headers={
-                "Range": "bytes={start}-{end}".format(start=collection["start"], end=collection["start"] + collection["size"])
-            })
-            fc = response.json()
-            featureCollection["features"] += fc["features"]
+    @staticmethod
+    def _features(data, collection):
+        # Collections can be compressed one at a time, the header entry says how
+        try:
+            data = decompress_collection(data, collection)
+        except ValueError as e:
+            raise exceptions.GeoServerlessException(str(e))
+        return json.loads(data.decode("utf-8"))["features"]
+
+    def iter_collections(self, collections):
+        # Nearby collections are read in one request, and requests are made concurrently.
+        # Yields (collection, bytes) pairs in the order the requests finish
+        self._check_collections(collections)
+        try:
+            for collection, data in self.client.iter_collections(collections):
+                yield collection, data
+        except RequestError as e:
+            raise exceptions.GeoServerlessException(str(e))
+
+    def iter_features(self, collections):
+        # Yields features one collection at a time, in the order the range reads finish
+        for collection, data in self.iter_collections(collections):
+            for feature in self._features(data, collection):
+                yield feature
 
-        return featureCollection
+    def read_feature_collections(self, collections):
+        # Features come back in the same order as the collections
+        features = {}
+        for collection, data in self.iter_collections(collections):
+            features[id(collection)] = self._features(data, collection)
+        return {
+            "type": "FeatureCollection",
+            "features": [feature for collection in collections for feature in features[id(collection)]]
+        }
@@ -0,0 +1,236 @@
+""" In-process GeoJSON -> GML 3.1.1 encoding for WFS responses.
+
+Output follows what `ogr2ogr -f GML -dsco FORMAT=GML3` used to give us: an ogr:FeatureCollection
+with one gml:featureMember per feature, OGC URN srsNames and lat/long axis order for EPSG:4326.
+Features are encoded one at a time so responses can be streamed.
+"""
+
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+from shapely.geometry import box, shape
+
+OGR_NS = "http://ogr.maptools.org/"
+GML_NS = "http://www.opengis.net/gml"
+SRS_NAME = "urn:ogc:def:crs:EPSG::4326"
+
+# Size of the chunks we write out in streaming responses
+BUFFER_SIZE = 64 * 1024
+
+# Property names have to be valid XML element names
+INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9_.\-]")
+
+XSD_TYPES = {
+    bool: "boolean",
+    int: "integer",
+    float: "double",
+}
+
+
+def safe_name(name):
+    name = INVALID_NAME_CHARS.sub("_", str(name))
+    if not re.match(r"[A-Za-z_]", name):
+        name = "_" + name
+    return name
+
+
+def parse_bbox(bbox):
+    if bbox is None:
+        return None
+    return [float(i) for i in bbox.split(",")[:4]]
+
+
+# Geometry encoders - coordinates are written lat/long to match the URN srsName
+def _pos_list(coords):
+    return " ".join("{!r} {!r}".format(float(c[1]), float(c[0])) for c in coords)
+
+
+def _point(geom, attrs):
+    return "<gml:Point{attrs}><gml:pos>{pos}</gml:pos></gml:Point>".format(
+        attrs=attrs, pos=_pos_list(geom.coords))
+
+
+def _linestring(geom, attrs):
+    return "<gml:LineString{attrs}><gml:posList>{pos}</gml:posList></gml:LineString>".format(
+        attrs=attrs, pos=_pos_list(geom.coords))
+
+
+def _ring(ring):
+    return "<gml:LinearRing><gml:posList>{}</gml:posList></gml:LinearRing>".format(_pos_list(ring.coords))
+
+
+def _polygon(geom, attrs):
+    rings = ["<gml:exterior>{}</gml:exterior>".format(_ring(geom.exterior))]
+    rings += ["<gml:interior>{}</gml:interior>".format(_ring(r)) for r in geom.interiors]
+    return "<gml:Polygon{attrs}>{rings}</gml:Polygon>".format(attrs=attrs, rings="".join(rings))
+
+
+def _multi(collection, member):
+    def _encode(geom, attrs):
+        members = "".join(
+            "<gml:{member}>{geom}</gml:{member}>".format(member=member, geom=encode_geometry(g))
+            for g in geom.geoms)
+        return "<gml:{collection}{attrs}>{members}</gml:{collection}>".format(
+            collection=collection, attrs=attrs, members=members)
+    return _encode
+
+
+GEOMETRY_ENCODERS = {
+    "Point": _point,
+    "LineString": _linestring,
+    "LinearRing": _linestring,
+    "Polygon": _polygon,
+    "MultiPoint": _multi("MultiPoint", "pointMember"),
+    "MultiLineString": _multi("MultiCurve", "curveMember"),
+    "MultiPolygon": _multi("MultiSurface", "surfaceMember"),
+    "GeometryCollection": _multi("MultiGeometry", "geometryMember"),
+}
+
+
+def encode_geometry(geom, srs_name=None, gml_id=None):
+    attrs = ""
+    if srs_name is not None:
+        attrs += " srsName={}".format(quoteattr(srs_name))
+    if gml_id is not None:
+        attrs += " gml:id={}".format(quoteattr(gml_id))
+    try:
+        return GEOMETRY_ENCODERS[geom.geom_type](geom, attrs)
+    except KeyError:
+        raise ValueError("Don't know how to encode a {} as GML".format(geom.geom_type))
+
+
+def encode_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return escape(str(value))
+
+
+def encode_feature(type_name, fid, geometry, properties):
+    parts = ["<gml:featureMember><ogr:{type_name} gml:id={fid}>".format(
+        type_name=type_name, fid=quoteattr("{}.{}".format(type_name, fid)))]
+    if geometry is not None:
+        parts.append("<ogr:geometryProperty>{}</ogr:geometryProperty>".format(
+            encode_geometry(geometry, SRS_NAME, "{}.geom.{}".format(type_name, fid))))
+    for key, value in (properties or {}).items():
+        if value is None:
+            continue
+        parts.append("<ogr:{name}>{value}</ogr:{name}>".format(name=safe_name(key), value=encode_value(value)))
+    parts.append("</ogr:{type_name}></gml:featureMember>".format(type_name=type_name))
+    return "".join(parts)
+
+
+def clip_features(features, bbox=None):
+    """Convert GeoJSON features to shapely geometries, clipping them to the bbox if given."""
+    clip = box(*bbox) if bbox is not None else None
+    for feature in features:
+        geometry = feature.get("geometry")
+        geometry = shape(geometry) if geometry else None
+        if clip is not None and geometry is not None:
+            if not clip.intersects(geometry):
+                continue
+            if not clip.contains(geometry):
+                geometry = clip.intersection(geometry)
+                if geometry.is_empty:
+                    continue
+        yield geometry, feature.get("properties")
+
+
+def preamble(type_name, bbox=None):
+    head = (
+        '<?xml version="1.0" encoding="utf-8" ?>\n'
+        '<ogr:FeatureCollection gml:id="aFeatureCollection" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:schemaLocation="http://ogr.maptools.org/ {type_name}.xsd" '
+        'xmlns:ogr="{ogr}" xmlns:gml="{gml}">'
+    ).format(type_name=escape(type_name), ogr=OGR_NS, gml=GML_NS)
+    if bbox is not None:
+        head += (
+            '<gml:boundedBy><gml:Envelope srsName="{srs}">'
+            '<gml:lowerCorner>{miny!r} {minx!r}</gml:lowerCorner>'
+            '<gml:upperCorner>{maxy!r} {maxx!r}</gml:upperCorner>'
+            '</gml:Envelope></gml:boundedBy>'
+        ).format(srs=SRS_NAME, minx=bbox[0], miny=bbox[1], maxx=bbox[2], maxy=bbox[3])
+    return head
+
+
+def footer():
+    return "</ogr:FeatureCollection>"
+
+
+def iter_gml(type_name, features, bbox=None):
+    """Encode GeoJSON features as a GML 3.1.1 FeatureCollection, yielding chunks of text.
+
+    If a bbox string (minx,miny,maxx,maxy) is given, features are clipped to it.
+    """
+    type_name = safe_name(type_name)
+    bbox = parse_bbox(bbox)
+    yield preamble(type_name, bbox)
+    for fid, (geometry, properties) in enumerate(clip_features(features, bbox)):
+        yield encode_feature(type_name, fid, geometry, properties)
+    yield footer()
+
+
+def buffered(chunks, size=BUFFER_SIZE):
+    """Join small chunks of text together into chunks of at least `size` characters.
+
+    The first chunk is passed straight through so the response starts straight away.
+    """
+    chunks = iter(chunks)
+    for chunk in chunks:
+        yield chunk
+        break
+
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _xsd_type(values):
+    types = set(type(v) for v in values if v is not None)
+    if len(types) == 1:
+        return XSD_TYPES.get(types.pop(), "string")
+    if types and types <= {int, float}:
+        return "double"
+    return "string"
+
+
+def feature_type_schema(type_name, features):
+    """Generate an XML schema describing the features, like ogr2ogr's .xsd output."""
+    type_name = safe_name(type_name)
+
+    # Collect property values by name, in the order we first see them
+    values = {}
+    for feature in features:
+        for key, value in (feature.get("properties") or {}).items():
+            values.setdefault(key, []).append(value)
+
+    elements = "".join(
+        '<xs:element name="{name}" type="xs:{type}" nillable="true" minOccurs="0" maxOccurs="1"/>'.format(
+            name=safe_name(key), type=_xsd_type(vals))
+        for key, vals in values.items()
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<xs:schema targetNamespace="{ogr}" xmlns:ogr="{ogr}" xmlns:xs="http://www.w3.org/2001/XMLSchema" '
+        'xmlns:gml="{gml}" elementFormDefault="qualified" version="1.0">'
+        '<xs:import namespace="{gml}" schemaLocation="http://schemas.opengis.net/gml/3.1.1/base/gml.xsd"/>'
+        '<xs:element name="FeatureCollection" type="ogr:FeatureCollectionType" substitutionGroup="gml:_FeatureCollection"/>'
+        '<xs:complexType name="FeatureCollectionType"><xs:complexContent>'
+        '<xs:extension base="gml:AbstractFeatureCollectionType">'
+        '<xs:attribute name="lockId" type="xs:string" use="optional"/>'
+        '<xs:attribute name="scope" type="xs:string" use="optional"/>'
+        '</xs:extension></xs:complexContent></xs:complexType>'
+        '<xs:element name="{type_name}" type="ogr:{type_name}_Type" substitutionGroup="gml:_Feature"/>'
+        '<xs:complexType name="{type_name}_Type"><xs:complexContent>'
+        '<xs:extension base="gml:AbstractFeatureType"><xs:sequence>'
+        '<xs:element name="geometryProperty" type="gml:GeometryPropertyType" nillable="true" minOccurs="0" maxOccurs="1"/>'
+        '{elements}'
+        '</xs:sequence></xs:extension></xs:complexContent></xs:complexType>'
+        '</xs:schema>'
+    ).format(ogr=OGR_NS, gml=GML_NS, type_name=type_name, elements=elements)
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+import json
+import threading
+import time
+
+import exceptions
+from utils import get_env
+
+# First guess at the header size in bytes, the cogj writer pads headers out to this
+INITIAL_HEADER_SIZE = 10000
+
+# Multiply the range by this each time the header doesn't fit
+HEADER_GROWTH = 4
+
+# Default cache limits - total bytes of headers and seconds before revalidating
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+DEFAULT_CACHE_TTL = 300
+
+
+def fetch_header(session, url, etag=None, initial_size=INITIAL_HEADER_SIZE):
+    """Read the header from the start of a COGJ file, growing the range until it parses.
+
+    If an etag is given then we send If-None-Match, and return None if the server
+    says the file hasn't changed. Otherwise returns a (header, size, etag) tuple where
+    size is the number of bytes we read to get the header.
+    """
+    size = initial_size
+    while True:
+        headers = {"Range": "bytes=0-{}".format(size - 1)}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        response = session.get(url, headers=headers)
+        if response.status_code == 304:
+            return None
+        if response.status_code not in (200, 206):
+            raise exceptions.GeoServerlessException(
+                "Got status {status} reading header from {url}".format(status=response.status_code, url=url))
+
+        data = response.content
+        try:
+            header, _ = json.JSONDecoder().raw_decode(data.decode("utf-8", "ignore"))
+            return header, len(data), response.headers.get("ETag")
+        except ValueError:
+            # If we've already got the whole file then the header is broken, otherwise grow the range
+            if response.status_code == 200 or len(data) < size:
+                raise exceptions.GeoServerlessException("Couldn't parse COGJ header from {url}".format(url=url))
+            size *= HEADER_GROWTH
+
+
+class CacheEntry:
+    def __init__(self, header, size, etag):
+        self.header = header
+        self.size = size
+        self.etag = etag
+        self.fetched = time.time()
+        # Anything worked out from the header which is worth keeping with it
+        self.derived = {}
+
+
+class HeaderCache:
+    """Process-wide LRU cache of parsed COGJ headers, keyed by URL.
+
+    Entries older than `ttl` seconds are revalidated using their ETag (if the server
+    sent one) and refetched if the file has changed. The least recently used entries
+    are evicted when the total size of the cached headers goes over `max_size` bytes.
+    Limits default to the COGJ_HEADER_CACHE_SIZE and COGJ_HEADER_CACHE_TTL
+    environment variables.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = int(max_size if max_size is not None else get_env("COGJ_HEADER_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+        self.ttl = float(ttl if ttl is not None else get_env("COGJ_HEADER_CACHE_TTL", DEFAULT_CACHE_TTL))
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.revalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return url in self._entries
+
+    def get(self, url, session):
+        return self.get_entry(url, session).header
+
+    def get_entry(self, url, session):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and time.time() - entry.fetched < self.ttl:
+                self._entries.move_to_end(url)
+                self.hits += 1
+                return entry
+
+        # Fetch outside the lock so we don't hold up other URLs
+        if entry is not None and entry.etag is not None:
+            result = fetch_header(session, url, etag=entry.etag, initial_size=entry.size)
+            if result is None:
+                with self._lock:
+                    self.revalidations += 1
+                    entry.fetched = time.time()
+                    if url in self._entries:
+                        self._entries.move_to_end(url)
+                return entry
+        else:
+            result = fetch_header(session, url)
+
+        entry = CacheEntry(*result)
+        with self._lock:
+            self.misses += 1
+            self._put(url, entry)
+        return entry
+
+    def _put(self, url, entry):
+        old = self._entries.pop(url, None)
+        if old is not None:
+            self._size -= old.size
+        if entry.size > self.max_size:
+            return
+        self._entries[url] = entry
+        self._size += entry.size
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    def invalidate(self, url):
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry is not None:
+                self._size -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.revalidations = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self._size,
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+            }
+
+
+HEADER_CACHE = HeaderCache()
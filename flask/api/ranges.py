@@ -0,0 +1,57 @@
+from collections import OrderedDict
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cogj.client import Client, DEFAULT_GAP, DEFAULT_MAX_SIZE, DEFAULT_CONCURRENCY
+
+from utils import get_env
+
+# Number of COGJ files we keep a client (and its idle connections) around for
+CLIENT_CACHE_SIZE = 32
+
+_session = None
+_session_lock = threading.Lock()
+
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def get_session(pool_size=None):
+    # One pooled session per process so we reuse connections between header requests
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = pool_size or int(get_env("COGJ_RANGE_CONCURRENCY", DEFAULT_CONCURRENCY))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def make_client(url, gap=None, max_size=None, concurrency=None):
+    """Make a cogj Client to read collections from a URL.
+
+    The gap threshold, maximum merged request size and concurrency can be set with
+    the COGJ_RANGE_GAP, COGJ_RANGE_MAX_SIZE and COGJ_RANGE_CONCURRENCY environment
+    variables, or passed in directly.
+    """
+    return Client(
+        url,
+        gap=int(gap if gap is not None else get_env("COGJ_RANGE_GAP", DEFAULT_GAP)),
+        max_size=int(max_size if max_size is not None else get_env("COGJ_RANGE_MAX_SIZE", DEFAULT_MAX_SIZE)),
+        concurrency=int(concurrency if concurrency is not None else get_env("COGJ_RANGE_CONCURRENCY", DEFAULT_CONCURRENCY))
+    )
+
+
+def get_client(url):
+    """Get the client for a URL, shared between requests so we reuse its connections."""
+    with _clients_lock:
+        client = _clients.pop(url, None) or make_client(url)
+        _clients[url] = client
+        while len(_clients) > CLIENT_CACHE_SIZE:
+            _, evicted = _clients.popitem(last=False)
+            evicted.close()
+        return client
@@ -1,11 +1,7 @@
 from lxml import objectify
 from lxml.etree import parse, fromstring, tostring
-import exceptions
-import json
+import gml
 from utils import get_env, merge_dicts
-from random import getrandbits
-import os
-import subprocess
 import urllib
 
 
@@ -52,33 +48,8 @@ class WFSServer:
 
     def describe_feature_type(self, type_name, gs):
         fc = gs.read_feature_collections([gs.find_smallest_collection()])
-        xsd_path = self.geojson_to_gml(type_name, fc).replace(".gml", ".xsd")
+        return gml.feature_type_schema(type_name, fc["features"])
 
-        with open(xsd_path) as f:
-            return f.read()
-
-    def get_feature(self, type_name, feature_collections, bbox=None):
-        return self.geojson_to_gml(type_name, feature_collections, bbox)
-
-    def geojson_to_gml(self, type_name, feature_collections, bbox=None):
-        scratch_dir = "./scratch/{dir}".format(dir=str(getrandbits(128)))
-        if not os.path.exists(scratch_dir):
-            os.makedirs(scratch_dir)
-
-        geojson_path = "{scratch_dir}/{type_name}.geojson".format(scratch_dir=scratch_dir, type_name=type_name)
-        gml_path = "{scratch_dir}/{type_name}.gml".format(scratch_dir=scratch_dir, type_name=type_name)
-
-        with open(geojson_path, "w") as f:
-            json.dump(feature_collections, f)
-
-        if bbox is not None:
-            command = "ogr2ogr -f GML -dsco FORMAT=GML3 -clipsrc {bbox} {gml_path} {geojson_path}".format(bbox=bbox.replace(",", " "), geojson_path=geojson_path, gml_path=gml_path)
-        else:
-            command = "ogr2ogr -f GML -dsco FORMAT=GML3 {gml_path} {geojson_path}".format(geojson_path=geojson_path, gml_path=gml_path)
-
-        p = subprocess.Popen(command.split(" "), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        output, err = p.communicate()
-
-        if len(err) > 0:
-            raise exceptions.GeoServerlessException("Got error '{err}' whilst reading data".format(err=err))
-        return gml_path
+    def get_feature(self, type_name, features, bbox=None):
+        # Encoded in-process and yielded in chunks, so this can go straight into a streaming response
+        return gml.buffered(gml.iter_gml(type_name, features, bbox))
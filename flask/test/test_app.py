@@ -0,0 +1,87 @@
+from unittest import TestCase
+import json
+import pathlib
+import sys
+
+from lxml import etree
+
+# Add API folder to our current PYTHONPATH so we can load the API modules
+API_LOCATION = pathlib.Path(__file__).parent.parent / 'api'
+sys.path.insert(0, str(API_LOCATION))
+# and the repository root, for the cogj package (if it isn't installed) and the
+# range server the cogj tests use
+sys.path.append(str(pathlib.Path(__file__).parent.parent.parent))
+
+import gml  # noqa: E402
+from app import app  # noqa: E402
+from geo_serverless import Geo_Serverless  # noqa: E402
+from header_cache import HeaderCache  # noqa: E402
+from tests.range_server import RangeServer  # noqa: E402
+from wfsserver import WFSServer  # noqa: E402
+
+HEADER_SIZE = 10000
+
+
+def make_cogj(count=20, per_collection=5):
+    """ Make a COGJ file with `count` collections of points along the diagonal """
+    bodies, collections, position = [], [], HEADER_SIZE
+    for idx in range(count):
+        features = [{
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [idx + 0.1 * jdx, idx + 0.1 * jdx]},
+            "properties": {"id": idx * per_collection + jdx}
+        } for jdx in range(per_collection)]
+        body = json.dumps({"type": "FeatureCollection", "features": features}).encode("utf-8")
+        collections.append({"start": position, "size": len(body), "features": per_collection,
+                            "bbox": [idx, idx, idx + 0.1 * (per_collection - 1), idx + 0.1 * (per_collection - 1)]})
+        bodies.append(body + b"\n")
+        position += len(body) + 1
+    header = json.dumps({"name": "points", "bbox": [0, 0, count, count], "collections": collections}).encode("utf-8")
+    return header + b" " * (HEADER_SIZE - len(header)) + b"".join(bodies)
+
+
+class TestGetFeature(TestCase):
+
+    def test_streaming(self):
+        """ The GML preamble is written before any collections are read """
+        with RangeServer(data=make_cogj()) as server:
+            geo_serverless = Geo_Serverless(server.url, header_cache=HeaderCache())
+            features = geo_serverless.iter_features(geo_serverless.get_collections_for_bbox("-1,-1,100,100"))
+            chunks = WFSServer().get_feature("points", features)
+            first = next(chunks)
+            self.assertTrue(first.startswith("<?xml"))
+            self.assertEqual(len(server.requests), 1)  # just the header
+
+            root = etree.fromstring((first + "".join(chunks)).encode("utf-8"))
+        self.assertEqual(len(root.findall("{%s}featureMember" % gml.GML_NS)), 100)
+
+    def test_get_feature(self):
+        """ GetFeature returns a streamed GML response for the features in the bbox """
+        with RangeServer(data=make_cogj()) as server:
+            response = app.test_client().get("/", query_string={
+                "REQUEST": "GetFeature", "COGJ_URL": server.url, "TYPENAME": "points", "BBOX": "2.5,2.5,5.5,5.5"
+            })
+            self.assertTrue(response.is_streamed)
+            root = etree.fromstring(response.get_data())
+        ids = sorted(int(el.text) for el in root.iter("{%s}id" % gml.OGR_NS))
+        self.assertEqual(ids, list(range(15, 30)))
+
+    def test_get_feature_empty(self):
+        """ GetFeature returns an empty collection for a bbox which misses every collection """
+        with RangeServer(data=make_cogj()) as server:
+            response = app.test_client().get("/", query_string={
+                "REQUEST": "GetFeature", "COGJ_URL": server.url, "TYPENAME": "points", "BBOX": "500,500,600,600"
+            })
+            root = etree.fromstring(response.get_data())
+            self.assertEqual(len(server.requests), 1)  # just the header
+        self.assertEqual(root.findall("{%s}featureMember" % gml.GML_NS), [])
+
+    def test_describe_feature_type(self):
+        """ DescribeFeatureType describes the properties of the features """
+        with RangeServer(data=make_cogj()) as server:
+            response = app.test_client().get("/", query_string={
+                "REQUEST": "DescribeFeatureType", "COGJ_URL": server.url, "TYPENAME": "points"
+            })
+        root = etree.fromstring(response.get_data())
+        names = [el.get("name") for el in root.iter("{http://www.w3.org/2001/XMLSchema}element")]
+        self.assertIn("id", names)
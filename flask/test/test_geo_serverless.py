@@ -0,0 +1,55 @@
+from unittest import TestCase
+import pathlib
+import sys
+
+# Add API folder to our current PYTHONPATH so we can load the API modules
+API_LOCATION = pathlib.Path(__file__).parent.parent / 'api'
+sys.path.insert(0, str(API_LOCATION))
+# and the cogj package itself, if it isn't installed
+sys.path.append(str(pathlib.Path(__file__).parent.parent.parent))
+
+import exceptions  # noqa: E402
+from geo_serverless import Geo_Serverless  # noqa: E402
+
+HEADER = {
+    "bbox": [0, 0, 3, 3],
+    "collections": [
+        {"start": 10000, "size": 10, "features": 1, "bbox": [0, 0, 1, 1]},
+        {"start": 10011, "size": 10, "features": 2, "bbox": [1, 1, 2, 2]},
+        {"start": 10022, "size": 10, "features": 3, "bbox": [2, 2, 3, 3]},
+    ]
+}
+
+
+class TestGeoServerless(TestCase):
+
+    def setUp(self):
+        self.geo_serverless = Geo_Serverless("http://localhost/test.json")
+        self.geo_serverless.header = HEADER
+
+    def starts(self, bbox):
+        return [c["start"] for c in self.geo_serverless.get_collections_for_bbox(bbox)]
+
+    def test_collections_for_bbox(self):
+        """ Collections are selected by bbox intersection """
+        self.assertEqual(self.starts("0.5,0.5,0.6,0.6"), [10000])
+        self.assertEqual(self.starts("0.5,0.5,1.5,1.5"), [10000, 10011])
+        self.assertEqual(self.starts("-1,-1,4,4"), [10000, 10011, 10022])
+        self.assertEqual(self.starts("5,5,6,6"), [])
+
+    def test_collections_for_bbox_touching(self):
+        """ Touching bboxes intersect, like shapely's intersects """
+        self.assertEqual(self.starts("2,2,2.5,2.5"), [10011, 10022])
+
+    def test_collections_for_bbox_with_crs(self):
+        """ A trailing CRS in the WFS BBOX parameter is ignored """
+        self.assertEqual(self.starts("0.5,0.5,0.6,0.6,EPSG:4326"), [10000])
+
+    def test_collections_for_bad_bbox(self):
+        """ Unparseable bboxes raise an error """
+        with self.assertRaises(exceptions.GeoServerlessException):
+            self.geo_serverless.get_collections_for_bbox("a,b,c,d")
+
+    def test_collection_bboxes(self):
+        """ Collection bboxes are stored as an array """
+        self.assertEqual(self.geo_serverless.get_collection_bboxes().shape, (3, 4))
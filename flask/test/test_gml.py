@@ -0,0 +1,103 @@
+from unittest import TestCase
+import pathlib
+import sys
+
+from lxml import etree
+
+# Add API folder to our current PYTHONPATH so we can load the API modules
+API_LOCATION = pathlib.Path(__file__).parent.parent / 'api'
+sys.path.insert(0, str(API_LOCATION))
+
+import gml  # noqa: E402
+
+NS = {"ogr": gml.OGR_NS, "gml": gml.GML_NS, "xs": "http://www.w3.org/2001/XMLSchema"}
+
+FEATURES = [
+    {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [115.5, -32.5]},
+        "properties": {"name": "a & b", "count": 1, "valid": True, "area": 1.5, "missing": None}
+    },
+    {
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]]},
+        "properties": {"name": "square", "count": 2, "valid": False, "area": 4}
+    },
+    {
+        "type": "Feature",
+        "geometry": {"type": "MultiLineString", "coordinates": [[[0, 0], [1, 1]], [[10, 10], [11, 11]]]},
+        "properties": {"name": "lines", "count": 3, "valid": True, "area": 0.0}
+    },
+]
+
+
+def parse(chunks):
+    return etree.fromstring("".join(chunks).encode("utf-8"))
+
+
+class TestGML(TestCase):
+
+    def test_feature_collection(self):
+        """ Every feature ends up as a featureMember """
+        root = parse(gml.iter_gml("things", FEATURES))
+        self.assertEqual(root.tag, "{%s}FeatureCollection" % gml.OGR_NS)
+        members = root.findall("gml:featureMember/ogr:things", NS)
+        self.assertEqual(len(members), 3)
+        self.assertEqual(members[0].get("{%s}id" % gml.GML_NS), "things.0")
+
+    def test_properties(self):
+        """ Properties are escaped, and missing values are skipped """
+        feature = parse(gml.iter_gml("things", FEATURES)).find("gml:featureMember/ogr:things", NS)
+        self.assertEqual(feature.find("ogr:name", NS).text, "a & b")
+        self.assertEqual(feature.find("ogr:valid", NS).text, "true")
+        self.assertEqual(feature.find("ogr:count", NS).text, "1")
+        self.assertIsNone(feature.find("ogr:missing", NS))
+
+    def test_axis_order(self):
+        """ Coordinates are written lat/long for the URN srsName """
+        root = parse(gml.iter_gml("things", FEATURES[:1]))
+        point = root.find(".//gml:Point", NS)
+        self.assertEqual(point.get("srsName"), gml.SRS_NAME)
+        self.assertEqual(point.find("gml:pos", NS).text, "-32.5 115.5")
+
+    def test_geometry_types(self):
+        """ Multi-geometries are encoded as GML3 multi-geometries """
+        root = parse(gml.iter_gml("things", FEATURES))
+        self.assertIsNotNone(root.find(".//gml:Polygon/gml:exterior/gml:LinearRing/gml:posList", NS))
+        self.assertEqual(len(root.findall(".//gml:MultiCurve/gml:curveMember/gml:LineString", NS)), 2)
+
+    def test_clip(self):
+        """ Features are clipped to the bbox, and those outside it are dropped """
+        root = parse(gml.iter_gml("things", FEATURES, bbox="0,0,1,1"))
+        members = root.findall("gml:featureMember/ogr:things", NS)
+        self.assertEqual([m.find("ogr:name", NS).text for m in members], ["square", "lines"])
+        coords = [float(c) for c in members[0].find(".//gml:posList", NS).text.split()]
+        self.assertTrue(all(0 <= c <= 1 for c in coords))
+        self.assertIsNotNone(root.find("gml:boundedBy/gml:Envelope", NS))
+        self.assertEqual(len(members[1].findall(".//gml:LineString", NS)), 1)
+
+    def test_streaming(self):
+        """ Output comes out one feature at a time """
+        chunks = list(gml.iter_gml("things", FEATURES))
+        self.assertEqual(len(chunks), len(FEATURES) + 2)
+
+    def test_buffered(self):
+        """ Small chunks are joined together, apart from the first one """
+        chunks = list(gml.buffered(["head"] + ["x" * 10] * 25, size=100))
+        self.assertEqual(chunks, ["head", "x" * 100, "x" * 100, "x" * 50])
+
+    def test_schema(self):
+        """ The schema describes the properties with types inferred from the values """
+        root = etree.fromstring(gml.feature_type_schema("things", FEATURES).encode("utf-8"))
+        types = {
+            el.get("name"): el.get("type")
+            for el in root.findall("xs:complexType[@name='things_Type']//xs:element", NS)
+        }
+        self.assertEqual(types, {
+            "geometryProperty": "gml:GeometryPropertyType",
+            "name": "xs:string",
+            "count": "xs:integer",
+            "valid": "xs:boolean",
+            "area": "xs:double",
+            "missing": "xs:string",
+        })
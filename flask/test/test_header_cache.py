@@ -0,0 +1,119 @@
+from unittest import TestCase
+import json
+import pathlib
+import sys
+import time
+
+# Add API folder to our current PYTHONPATH so we can load the API modules
+API_LOCATION = pathlib.Path(__file__).parent.parent / 'api'
+sys.path.insert(0, str(API_LOCATION))
+# and the repository root, for the cogj package (if it isn't installed) and the
+# range server the cogj tests use
+sys.path.append(str(pathlib.Path(__file__).parent.parent.parent))
+
+import exceptions  # noqa: E402
+from geo_serverless import Geo_Serverless  # noqa: E402
+from header_cache import HeaderCache, fetch_header  # noqa: E402
+from ranges import get_session  # noqa: E402
+from tests.range_server import RangeServer  # noqa: E402
+
+
+def make_file(name="test", collections=1, padding=10000):
+    """ Make a COGJ-ish file with a padded header """
+    header = json.dumps({
+        "name": name,
+        "bbox": [0, 0, 1, 1],
+        "collections": [{"start": 0, "size": 0, "features": 0, "bbox": [0, 0, 1, 1]}] * collections
+    }).encode("utf-8")
+    return header + b" " * max(padding - len(header), 1) + b"{}" * 1000
+
+
+class TestFetchHeader(TestCase):
+
+    def test_fetch(self):
+        """ Headers that fit in the first range take one request """
+        with RangeServer(data=make_file()) as server:
+            header, size, etag = fetch_header(get_session(), server.url)
+        self.assertEqual(header["name"], "test")
+        self.assertEqual(size, 10000)
+        self.assertEqual(etag, server.etag)
+        self.assertEqual(server.requests, [("/data.json", "bytes=0-9999")])
+
+    def test_fetch_large(self):
+        """ Headers bigger than 10 KB are read by growing the range """
+        data = make_file(collections=2000, padding=0)
+        with RangeServer(data=data) as server:
+            header, size, _ = fetch_header(get_session(), server.url)
+        self.assertEqual(len(header["collections"]), 2000)
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(server.requests[-1], ("/data.json", "bytes=0-159999"))
+
+    def test_fetch_broken(self):
+        """ Files without a valid header raise an error """
+        with RangeServer(data=b'{"name": "broken"') as server:
+            with self.assertRaises(exceptions.GeoServerlessException):
+                fetch_header(get_session(), server.url)
+
+
+class TestHeaderCache(TestCase):
+
+    def test_hit(self):
+        """ Repeated reads come from the cache """
+        cache = HeaderCache()
+        with RangeServer(data=make_file()) as server:
+            for _ in range(5):
+                geo_serverless = Geo_Serverless(server.url, header_cache=cache)
+                self.assertEqual(geo_serverless.get_metadata()["title"], "test")
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(cache.info()["hits"], 4)
+
+    def test_revalidate(self):
+        """ Stale entries are revalidated with If-None-Match """
+        cache = HeaderCache(ttl=0.01)
+        with RangeServer(data=make_file()) as server:
+            session = get_session()
+            cache.get(server.url, session)
+            time.sleep(0.02)
+            self.assertEqual(cache.get(server.url, session)["name"], "test")
+            self.assertEqual(cache.info()["revalidations"], 1)
+
+            # Now update the file, we should get the new header
+            server.data = make_file(name="updated")
+            time.sleep(0.02)
+            self.assertEqual(cache.get(server.url, session)["name"], "updated")
+        self.assertEqual(len(server.requests), 3)
+
+    def test_evict(self):
+        """ Least recently used entries are evicted when the cache is full """
+        cache = HeaderCache(max_size=25000)
+        with RangeServer(data=make_file()) as first, RangeServer(data=make_file()) as second, \
+                RangeServer(data=make_file()) as third:
+            session = get_session()
+            cache.get(first.url, session)
+            cache.get(second.url, session)
+            cache.get(first.url, session)
+            cache.get(third.url, session)
+        self.assertIn(first.url, cache)
+        self.assertNotIn(second.url, cache)
+        self.assertIn(third.url, cache)
+        self.assertEqual(cache.info()["size"], 20000)
+
+    def test_clear(self):
+        """ Clearing the cache removes everything """
+        cache = HeaderCache()
+        with RangeServer(data=make_file()) as server:
+            cache.get(server.url, get_session())
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.info()["size"], 0)
+
+    def test_derived(self):
+        """ Values worked out from the header are shared between requests """
+        cache = HeaderCache()
+        with RangeServer(data=make_file()) as server:
+            first = Geo_Serverless(server.url, header_cache=cache)
+            first.get_collections_for_bbox("0,0,1,1")
+            bboxes = first.get_collection_bboxes()
+            second = Geo_Serverless(server.url, header_cache=cache)
+            second.read_header()
+            self.assertIs(second.get_collection_bboxes(), bboxes)
@@ -0,0 +1,119 @@
+from unittest import TestCase
+import gzip
+import json
+import pathlib
+import sys
+
+# Add API folder to our current PYTHONPATH so we can load the API modules
+API_LOCATION = pathlib.Path(__file__).parent.parent / 'api'
+sys.path.insert(0, str(API_LOCATION))
+# and the repository root, for the cogj package (if it isn't installed) and the
+# range server the cogj tests use
+sys.path.append(str(pathlib.Path(__file__).parent.parent.parent))
+
+import exceptions  # noqa: E402
+from geo_serverless import Geo_Serverless  # noqa: E402
+from cogj.client import Client  # noqa: E402
+from ranges import get_client, make_client  # noqa: E402
+from tests.range_server import RangeServer  # noqa: E402
+
+
+def make_cogj(count, padding=1, codec=None):
+    """ Make a fake COGJ file with `count` collections separated by `padding` bytes """
+    header, bodies, position = [], [], 100
+    for idx in range(count):
+        body = json.dumps({
+            "type": "FeatureCollection",
+            "features": [{"type": "Feature", "geometry": None, "properties": {"id": idx}}]
+        }).encode("utf-8")
+        entry = {"features": 1, "bbox": [0, 0, 1, 1]}
+        if codec == "gzip":
+            entry.update(codec=codec, uncompressed_size=len(body))
+            body = gzip.compress(body)
+        entry.update(start=position, size=len(body))
+        header.append(entry)
+        bodies.append(body + b" " * padding)
+        position += len(body) + padding
+    return header, b" " * 100 + b"".join(bodies)
+
+
+class TestClient(TestCase):
+
+    def test_read_collections(self):
+        """ 200 adjacent collections are read in one request """
+        collections, data = make_cogj(200)
+        with RangeServer(data=data) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url, gap=16))
+            fc = geo_serverless.read_feature_collections(collections)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual([f["properties"]["id"] for f in fc["features"]], list(range(200)))
+
+    def test_read_collections_concurrent(self):
+        """ Collections which can't be merged are read concurrently """
+        collections, data = make_cogj(50, padding=100)
+        with RangeServer(data=data) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url, gap=16, concurrency=4))
+            fc = geo_serverless.read_feature_collections(collections[::-1])
+        self.assertEqual(len(server.requests), 50)
+        self.assertEqual([f["properties"]["id"] for f in fc["features"]], list(range(50))[::-1])
+
+    def test_no_collections(self):
+        """ Reading no collections doesn't make any requests """
+        with RangeServer(data=make_cogj(1)[1]) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url))
+            self.assertEqual(list(geo_serverless.iter_features([])), [])
+        self.assertEqual(server.requests, [])
+
+    def test_short_read(self):
+        """ Collections which run past the end of the file raise errors """
+        collections, data = make_cogj(5)
+        with RangeServer(data=data[:-20]) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url))
+            with self.assertRaises(exceptions.GeoServerlessException):
+                geo_serverless.read_feature_collections(collections)
+
+    def test_get_client(self):
+        """ Clients are shared between requests for the same URL """
+        client = get_client("http://127.0.0.1:1/shared.json")
+        self.assertIsInstance(client, Client)
+        self.assertIs(get_client("http://127.0.0.1:1/shared.json"), client)
+        self.assertIsNot(get_client("http://127.0.0.1:1/other.json"), client)
+        with self.assertRaises(exceptions.GeoServerlessException):
+            Geo_Serverless("s3://bucket/data.json").read_feature_collections([])
+
+    def test_read_feature_collections(self):
+        """ Geo_Serverless merges features from all collections """
+        collections, data = make_cogj(50)
+        with RangeServer(data=data) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url, max_size=1000))
+            fc = geo_serverless.read_feature_collections(collections)
+        self.assertEqual([f["properties"]["id"] for f in fc["features"]], list(range(50)))
+        self.assertTrue(1 < len(server.requests) < 50)
+
+    def test_read_compressed_collections(self):
+        """ Compressed collections are decompressed transparently """
+        collections, data = make_cogj(20, codec="gzip")
+        with RangeServer(data=data) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url))
+            fc = geo_serverless.read_feature_collections(collections)
+            features = list(geo_serverless.iter_features(collections[::-1]))
+        self.assertEqual([f["properties"]["id"] for f in fc["features"]], list(range(20)))
+        self.assertEqual(sorted(f["properties"]["id"] for f in features), list(range(20)))
+
+    def test_wrong_uncompressed_size(self):
+        """ Collections which don't decompress to the size in the header raise errors """
+        collections, data = make_cogj(1, codec="gzip")
+        collections[0]["uncompressed_size"] += 1
+        with RangeServer(data=data) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url))
+            with self.assertRaises(exceptions.GeoServerlessException):
+                geo_serverless.read_feature_collections(collections)
+
+    def test_unknown_codec(self):
+        """ Collections with codecs we don't know about raise errors """
+        collections, data = make_cogj(1)
+        collections[0]["codec"] = "lzma"
+        with RangeServer(data=data) as server:
+            geo_serverless = Geo_Serverless(server.url, client=make_client(server.url))
+            with self.assertRaises(exceptions.GeoServerlessException):
+                geo_serverless.read_feature_collections(collections)
@@ -7,6 +7,9 @@
 
 import math
 
+import numpy as np
+
+from cogj.index import PackedTree
 from cogj.utilities import check_bounds
 from .node import Node
 
@@ -131,9 +134,15 @@ class TreeBuilder:
         if len(subset) <= self.max_items:
             return subset
 
-        # Otherwise we need to keep splitting
+        # Otherwise we need to keep splitting, alternating directions as we go.
+        # See cogj.index for the vectorized version of this
         sort_idx = self.argsort(sort_direction=sort_direction, subset=subset)
-        split = 
+        split = math.ceil(len(sort_idx) / max(self.n_subtrees(len(sort_idx)), 2))
+        next_direction = 'y' if sort_direction in ('x', 0) else 'x'
+        return [
+            self.pack(sort_idx[idx:idx + split], next_direction)
+            for idx in range(0, len(sort_idx), split)
+        ]
 
 
 class Tree:
@@ -165,16 +174,35 @@ class Tree:
             self.leaf_depth = 1
         return self._root
 
-    def construct(self, nodes):
+    def construct(self, nodes, max_items=10):
         """
         Construct the RTree from the nodes.
 
-        Uses a top-down balanced approach
+        Uses a bottom-up Sort-Tile-Recursive packing from `cogj.index`
 
         Parameters:
             nodes - a list of rtree.Node instances.
-        """
-        raise NotImplementedError()
+            max_items - the maximum entries in a node within the tree
+        """
+        nodes = list(nodes)
+        packed = PackedTree(np.array([n.bounds for n in nodes]), node_size=max_items)
+
+        # Build the nodes from the bottom up
+        for level, (bounds, order, offsets) in enumerate(packed.levels, 1):
+            parents = []
+            for idx, (start, stop) in enumerate(zip(offsets[:-1], offsets[1:])):
+                parent = Node(bounds=tuple(bounds[idx]), level=level,
+                              children=[nodes[i] for i in order[start:stop]])
+                parent.is_leaf = level == 1
+                for child in parent.children:
+                    child.parent = parent
+                parents.append(parent)
+            nodes = parents
+
+        self._root = nodes[0] if nodes else Node()
+        self.depth = self.leaf_depth = packed.height
+        self.count = len(packed)
+        return self
 
     def search(self, bounds):
         "Find all rectangles that are stored in the tree which intersect these bounds"
@@ -5,6 +5,11 @@
     description: Set up Cython extensions for CO-GJ
 """
 
+import os
+import tempfile
+from distutils.ccompiler import new_compiler
+from distutils.errors import CompileError, LinkError
+from distutils.sysconfig import customize_compiler
 from pathlib import Path
 from logging import getLogger
 from multiprocessing import cpu_count
@@ -28,47 +33,69 @@ LOGGER = getLogger()
 # Where are our extensions located?
 EXTENSIONS_MODULE = Path('cogj/extensions')
 
-def update_thread_count():
-    """ Update the thread count for OpenMP extensions
+# Flags to build and link with OpenMP
+OPENMP_FLAGS = ['-fopenmp']
 
-        Uses one thread per core, with the estimate of the number of cores from
-        multiprocessing.cpu_count.
-    """
-    LOGGER.info('Updating thread count for cython code to %s', cpu_count())
-    num_threads = cpu_count()  # We're just going for 1 thread/CPU here
-    fname = EXTENSIONS_MODULE / 'common.pxd'
+# A minimal OpenMP program to check the compiler supports it
+OPENMP_TEST = """
+#include <omp.h>
+int main(void) { return omp_get_max_threads() > 0 ? 0 : 1; }
+"""
 
-    # Don't clobber other definitions
-    try:
-        with open(fname, 'r') as src:
-            content = src.readlines()  # this is short, just slurp it
+def have_openmp():
+    """ Check whether the compiler can build and link OpenMP code
 
-        # Write out a new definition
-        with open(fname, 'w') as sink:
-            for line in content:
-                if line.startswith('cdef int NUM_THREADS'):
-                    sink.write('cdef int NUM_THREADS = {0}'.format(num_threads))
-                else:
-                    sink.write(line)
+        Stock Apple clang doesn't understand -fopenmp, so we try compiling a
+        small OpenMP program first and build the extensions without OpenMP
+        if that fails.
+
+        Returns:
+            True if OpenMP is available, False otherwise
+    """
+    compiler = new_compiler()
+    customize_compiler(compiler)
+    with tempfile.TemporaryDirectory() as tempdir:
+        source = os.path.join(tempdir, 'openmp_test.c')
+        with open(source, 'w') as sink:
+            sink.write(OPENMP_TEST)
+        try:
+            objects = compiler.compile([source], output_dir=tempdir,
+                                       extra_postargs=OPENMP_FLAGS)
+            compiler.link_executable(objects, os.path.join(tempdir, 'openmp_test'),
+                                     extra_postargs=OPENMP_FLAGS)
+        except (CompileError, LinkError):
+            LOGGER.warning('OpenMP is not available, building extensions without it')
+            return False
+    return True
+
+def thread_count_macro(openmp=True):
+    """ Get the thread count for OpenMP extensions
 
-    except FileNotFoundError:
-        # doesn't exist so just leave it
-        with open(fname, 'w') as sink:
-            sink.write('cdef int NUM_THREADS = {0}'.format(num_threads))
+        Uses one thread per core, with the estimate of the number of cores from
+        multiprocessing.cpu_count. This is passed to the compiler as a macro
+        (see common.pxd) rather than written into the sources, so building
+        doesn't change any tracked files.
 
+        Parameters:
+            openmp - whether we're building with OpenMP. If not we use one
+                thread.
 
+        Returns:
+            a (name, value) tuple for Extension.define_macros
+    """
+    num_threads = cpu_count() if openmp else 1  # We're just going for 1 thread/CPU here
+    LOGGER.info('Setting thread count for cython code to %s', num_threads)
+    return ('COGJ_NUM_THREADS', str(num_threads))
 
 def get_extensions():
     """ Find our extensions to build.
 
-        Also updates the thread count for OpenMP extensions to the number of CPUs
-        availble on the current machine.
+        OpenMP extensions use one thread per CPU on the current machine, or
+        run serially if the compiler doesn't support OpenMP.
 
         Returns:
             a list of Extension objects to pass to setup
     """
-    update_thread_count()
-
     # Get the extensions
     if HAVE_CYTHON:
         files = [f for f in EXTENSIONS_MODULE.iterdir() if f.suffix == '.pyx']
@@ -76,10 +103,12 @@ def get_extensions():
         files = [f for f in EXTENSIONS_MODULE.iterdir() if f.suffix == '.c']
 
     # Construct keyword arguments for all extensions
+    openmp = have_openmp()
     kwargs = dict(
-        # extra_compile_args=['-fopenmp'],
-        # extra_link_args=['-fopenmp'],
-        include_dirs=[numpy.get_include(), EXTENSIONS_MODULE]
+        extra_compile_args=OPENMP_FLAGS if openmp else [],
+        extra_link_args=OPENMP_FLAGS if openmp else [],
+        define_macros=[thread_count_macro(openmp)],
+        include_dirs=[numpy.get_include(), str(EXTENSIONS_MODULE)]
     )
 
     # Construct all the extension objects and return them
@@ -99,7 +128,6 @@ class cython_sdist(sdist):  # pylint: disable=C0103
     def run(self):
         # Make sure the compiled Cython files in the distribution are up-to-date
         from Cython.Build import cythonize
-        update_thread_count()
         cythonize([str(f)
                    for f in EXTENSIONS_MODULE.iterdir()
                    if f.suffix == '.pyx'])
@@ -0,0 +1,128 @@
+""" file:    range_server.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: A local HTTP server which understands range requests, for
+        testing remote COGJ readers. The flask API tests use it too.
+"""
+
+import hashlib
+import io
+import os
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE = re.compile(r'bytes=(\d+)-(\d*)$')
+
+# Where we serve `data` when we're not serving a directory
+DATA_PATH = '/data.json'
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+
+    "Serve files with HTTP/1.1 keep-alive, range requests and ETags"
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):  # pylint: disable=W0221
+        "Keep test output quiet"
+
+    def _read(self):
+        "Get the bytes at the requested path, or None if there aren't any"
+        data = self.server.data
+        if data is not None:
+            return data if self.path == DATA_PATH else None
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as src:
+            return src.read()
+
+    def send_head(self):
+        "Send headers for a (range of a) file, returning the body"
+        range_header = self.headers.get('Range')
+        with self.server.lock:
+            self.server.requests.append((self.path, range_header))
+        data = self._read()
+        if data is None:
+            self.send_error(404, 'File not found')
+            return None
+
+        etag = '"{}"'.format(hashlib.md5(data).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+
+        match = RANGE.match(range_header or '') if self.server.ranges else None
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+            if start >= len(data):
+                self.send_error(416, 'Range not satisfiable')
+                return None
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end, len(data)))
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
+        return io.BytesIO(body)
+
+class RangeServer(ThreadingHTTPServer):
+
+    """
+    Serve a directory, or some bytes, on a random local port
+
+    Use as a context manager. Change `data` while the server is running to
+    simulate the file being updated.
+
+    Parameters:
+        directory - the directory to serve
+        data - bytes to serve instead of a directory
+        ranges - whether to honour range requests
+
+    Attributes:
+        url - the URL of the directory, or of the data
+        requests - the (path, range) of each request the server has seen
+        bytes_sent - the number of body bytes sent
+    """
+
+    daemon_threads = True
+
+    def __init__(self, directory=None, data=None, ranges=True):
+        if (directory is None) == (data is None):
+            raise ValueError('Expected one of directory or data')
+        handler = partial(RangeRequestHandler, directory=str(directory or os.getcwd()))
+        super().__init__(('127.0.0.1', 0), handler)
+        self.data = data
+        self.ranges = ranges
+        self.requests = []
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        root = 'http://127.0.0.1:{}'.format(self.server_address[1])
+        self.url = root + DATA_PATH if data is not None else root + '/'
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def etag(self):
+        "The ETag we send for `data`"
+        return '"{}"'.format(hashlib.md5(self.data).hexdigest())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
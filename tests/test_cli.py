@@ -6,11 +6,13 @@
     description: Tests for CLI
 """
 
+import json
 import unittest
 import logging
 import sys
 import shlex
 import pathlib
+import tempfile
 
 import ddt
 from click.testing import CliRunner
@@ -77,10 +79,63 @@ class TestCLI(unittest.TestCase):
         result = self.run_command('cogj info')
         self.assertTrue(result.output is not None)
 
+    def test_info_file(self):
+        "Check info reads the header of a COGJ file, as text or JSON"
+        source = pathlib.Path(__file__).parent / 'resources' / 'boundary.json'
+        with tempfile.TemporaryDirectory() as tempdir:
+            sink = pathlib.Path(tempdir) / 'boundary.cogj.json'
+            self.run_command(['convert', str(source), str(sink), '--name', 'boundary'])
+            result = self.run_command(['info', str(sink)])
+            self.assertEqual(result.exit_code, 0)
+            self.assertTrue('Name: boundary' in result.output)
+            self.assertTrue('Features: 1 in 1 collections' in result.output)
+            result = self.run_command(['info', str(sink), '--json'])
+            self.assertEqual(result.exit_code, 0)
+            summary = json.loads(result.output)
+            self.assertEqual(summary['features'], 1)
+            self.assertEqual(summary['source'], str(sink))
+            result = self.run_command(['info', str(source)])
+            self.assertNotEqual(result.exit_code, 0)
+
     def test_convert(self):
         "Check convert command works"
         result = self.run_command('cogj convert')
         self.assertTrue(result.output is not None)
 
+    def test_convert_file(self):
+        "Check convert command writes a COGJ file"
+        source = pathlib.Path(__file__).parent / 'resources' / 'boundary.json'
+        with tempfile.TemporaryDirectory() as tempdir:
+            sink = pathlib.Path(tempdir) / 'boundary.cogj.json'
+            result = self.run_command(['convert', str(source), str(sink), '--name', 'boundary'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertTrue('Wrote 1 features in 1 collections' in result.output)
+            self.assertTrue(sink.exists())
+
+    def test_convert_precision(self):
+        "Check we can quantize coordinates when converting, but not two ways at once"
+        source = pathlib.Path(__file__).parent / 'resources' / 'boundary.json'
+        with tempfile.TemporaryDirectory() as tempdir:
+            sink = pathlib.Path(tempdir) / 'boundary.cogj.json'
+            result = self.run_command(['convert', str(source), str(sink), '--precision', '4'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertTrue('saved' in result.output)
+            result = self.run_command(['convert', str(source), str(sink),
+                                       '--precision', '4', '--grid', '0.1'])
+            self.assertNotEqual(result.exit_code, 0)
+
+    def test_convert_codec(self):
+        "Check we can compress collections, and info tells us about it"
+        source = pathlib.Path(__file__).parent / 'resources' / 'boundary.json'
+        with tempfile.TemporaryDirectory() as tempdir:
+            sink = pathlib.Path(tempdir) / 'boundary.cogj.json'
+            result = self.run_command(['convert', str(source), str(sink), '--codec', 'gzip'])
+            self.assertEqual(result.exit_code, 0)
+            result = self.run_command(['info', str(sink)])
+            self.assertEqual(result.exit_code, 0)
+            self.assertTrue('Compression: gzip' in result.output)
+            result = self.run_command(['convert', str(source), str(sink), '--codec', 'lzma'])
+            self.assertNotEqual(result.exit_code, 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,208 @@
+""" file:    test_client.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for reading remote COGJ files
+"""
+
+import asyncio
+import pathlib
+import socket
+import tempfile
+import time
+import unittest
+
+import ddt
+from shapely import geometry
+
+from cogj.client import Client, AsyncClient, RateLimiter, RequestError, coalesce
+from cogj.writer import Writer
+
+from .range_server import RangeServer
+from .test_writer import make_features, read_cogj
+
+def sort_features(features):
+    "Sort features by id so we can compare them"
+    return sorted(features, key=lambda f: f.properties['id'])
+
+async def collect(iterator):
+    "Collect the items from an async iterator"
+    return [item async for item in iterator]
+
+class TestCoalesce(unittest.TestCase):
+
+    "Test merging ranges"
+
+    def test_coalesce(self):
+        "Nearby ranges get merged"
+        ranges = [(100, 10), (0, 10), (15, 5), (1000, 10)]
+        self.assertEqual(
+            coalesce(ranges, gap=10, max_size=100),
+            [(0, 20, [1, 2]), (100, 110, [0]), (1000, 1010, [3])])
+
+    def test_max_size(self):
+        "Merged ranges don't get too big"
+        self.assertEqual(
+            coalesce([(0, 10), (10, 10), (20, 10)], gap=0, max_size=20),
+            [(0, 20, [0, 1]), (20, 30, [2])])
+
+    def test_negative_gap(self):
+        "Negative gaps never merge"
+        self.assertEqual(len(coalesce([(0, 10), (10, 10)], gap=-1)), 2)
+
+class TestRateLimiter(unittest.TestCase):
+
+    "Test rate limiting"
+
+    def test_rate(self):
+        "Requests are spaced out"
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_bad_rate(self):
+        "Rates have to be positive"
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+@ddt.ddt
+class TestClient(unittest.TestCase):
+
+    "Test reading from a range server"
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tempdir.name) / 'points.json'
+        self.features = make_features(95)
+        with Writer(self.path, collection_size=10) as writer:
+            writer.extend(self.features)
+        self.header = read_cogj(self.path)[0]
+        self.bbox = (-10, -10, -5, -5)
+        self.expected = [
+            f for f in self.features if f.geometry.intersects(geometry.box(*self.bbox))]
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    @ddt.data(True, False)
+    def test_features(self, ranges):
+        "We get all the features back, even if the server ignores ranges"
+        with RangeServer(self.tempdir.name, ranges=ranges) as server, \
+                Client(server.url + 'points.json', concurrency=4, gap=-1) as client:
+            self.assertEqual(client.header, self.header)
+            self.assertEqual(sort_features(client.features()), self.features)
+
+    def test_bbox(self):
+        "Only the collections overlapping a bbox get fetched"
+        with RangeServer(self.tempdir.name) as server, \
+                Client(server.url + 'points.json', gap=-1) as client:
+            collections = client.collections(self.bbox)
+            self.assertEqual(collections, [
+                c for c in self.header['collections']
+                if geometry.box(*c['bbox']).intersects(geometry.box(*self.bbox))])
+            self.assertTrue(0 < len(collections) < len(self.header['collections']))
+            self.assertEqual(sort_features(client.features(self.bbox)), self.expected)
+            # One header request, then one per collection
+            self.assertEqual(len(server.requests), 1 + len(collections))
+            self.assertEqual(
+                sorted(r for _, r in server.requests[1:]),
+                sorted('bytes={}-{}'.format(c['start'], c['start'] + c['size'] - 1)
+                       for c in collections))
+
+    def test_merged(self):
+        "Nearby collections are fetched in one request"
+        with RangeServer(self.tempdir.name) as server, \
+                Client(server.url + 'points.json') as client:
+            fetched = list(client.iter_collections(client.collections()))
+            self.assertEqual(len(server.requests), 2)
+        data = self.path.read_bytes()
+        for collection, body in fetched:
+            self.assertEqual(body, data[collection['start']:collection['start'] + collection['size']])
+
+    def test_compressed(self):
+        "Compressed collections are decompressed transparently"
+        with Writer(self.path, collection_size=10, codec='gzip') as writer:
+            writer.extend(self.features)
+        with RangeServer(self.tempdir.name) as server, \
+                Client(server.url + 'points.json', gap=-1) as client:
+            self.assertEqual(sort_features(client.features(self.bbox)), self.expected)
+            fetched = sum(len(body) for _, body in client.iter_collections(client.collections()))
+        self.assertEqual(fetched, sum(c['size'] for c in client.header['collections']))
+        self.assertTrue(fetched < sum(c['size'] for c in self.header['collections']))
+
+    def test_keep_alive(self):
+        "Connections get reused"
+        with RangeServer(self.tempdir.name) as server, \
+                Client(server.url + 'points.json', concurrency=2, gap=-1) as client:
+            self.assertEqual(len(list(client.features())), 95)
+            self.assertEqual(len(server.requests), 11)
+            self.assertLessEqual(client.pool.opened, 2)
+
+    def test_stale_connection(self):
+        "We reconnect if the server has closed an idle connection"
+        with RangeServer(self.tempdir.name) as server, \
+                Client(server.url + 'points.json', concurrency=1) as client:
+            self.assertEqual(client.header, self.header)
+            # Swap the idle connection's socket for one the other end has closed
+            idle = client.pool._idle.get_nowait()  # pylint: disable=W0212
+            ours, theirs = socket.socketpair()
+            theirs.close()
+            idle.sock.close()
+            idle.sock = ours
+            client.pool._idle.put_nowait(idle)  # pylint: disable=W0212
+            self.assertEqual(sort_features(client.features(self.bbox)), self.expected)
+            self.assertEqual(client.pool.opened, 2)
+
+    def test_rate_limit(self):
+        "Requests are rate limited"
+        with RangeServer(self.tempdir.name) as server, \
+                Client(server.url + 'points.json', rate=40, gap=-1) as client:
+            start = time.monotonic()
+            self.assertEqual(len(list(client.features())), 95)
+            # 11 requests at 40 per second
+            self.assertGreaterEqual(time.monotonic() - start, 0.24)
+
+    def test_missing(self):
+        "Missing files raise errors"
+        with RangeServer(self.tempdir.name) as server, \
+                Client(server.url + 'missing.json') as client:
+            with self.assertRaises(RequestError):
+                client.header  # pylint: disable=W0104
+
+    def test_bad_url(self):
+        "Clients need HTTP URLs"
+        with self.assertRaises(ValueError):
+            Client(str(self.path))
+
+    def test_async(self):
+        "The async client gets the same features"
+        async def _read(url):
+            async with AsyncClient(url, concurrency=3, gap=-1) as client:
+                header = await client.header()
+                every = await collect(client.features())
+                some = await collect(client.features(self.bbox))
+                return header, every, some
+
+        with RangeServer(self.tempdir.name) as server:
+            header, every, some = asyncio.run(_read(server.url + 'points.json'))
+        self.assertEqual(header, self.header)
+        self.assertEqual(sort_features(every), self.features)
+        self.assertEqual(sort_features(some), self.expected)
+
+    def test_async_early_exit(self):
+        "Stopping early doesn't leave requests hanging"
+        async def _read(url):
+            async with AsyncClient(url, concurrency=2, gap=-1) as client:
+                collections = client.iter_collections(await client.collections())
+                async for _ in collections:
+                    break
+                await collections.aclose()
+                return True
+
+        with RangeServer(self.tempdir.name) as server:
+            self.assertTrue(asyncio.run(_read(server.url + 'points.json')))
+
+if __name__ == '__main__':
+    unittest.main()
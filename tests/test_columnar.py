@@ -0,0 +1,133 @@
+""" file:    test_columnar.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for columnar feature collections
+"""
+
+import unittest
+
+import ddt
+import numpy as np
+from shapely import geometry, wkb, wkt
+
+from cogj import Feature, FeatureCollection, ColumnarCollection
+from cogj.columnar import POINT, LINESTRING, POLYGON, MULTIPOLYGON, _read_wkb
+
+from .test_features import GEOMS
+
+@ddt.ddt
+class TestColumnarCollection(unittest.TestCase):
+
+    "Test columnar storage"
+
+    def setUp(self):
+        self.features = FeatureCollection([
+            Feature(geom, {'idx': idx}) for idx, geom in enumerate(GEOMS)
+        ])
+        self.arrays = self.features.to_arrays()
+
+    def test_structure(self):
+        "All coordinates end up in one buffer with offsets into it"
+        self.assertEqual(len(self.arrays), len(GEOMS))
+        self.assertEqual(self.arrays.coords.shape, (21, 2))
+        self.assertEqual(self.arrays.type_codes[0], POINT)
+        self.assertEqual(self.arrays.type_codes[-1], MULTIPOLYGON)
+        np.testing.assert_array_equal(self.arrays.geometry_offsets, [0, 1, 3, 4, 5, 7, 9])
+        np.testing.assert_array_equal(self.arrays.coordinate_offsets, [0, 1, 3, 5, 9, 13, 21])
+
+    @ddt.data(*range(len(GEOMS)))
+    def test_roundtrip(self, idx):
+        "Geometries survive the trip to arrays and back"
+        self.assertTrue(self.arrays.geometry(idx).equals(GEOMS[idx]))
+        self.assertEqual(self.arrays.geometry(idx).geom_type, GEOMS[idx].geom_type)
+
+    def test_from_arrays(self):
+        "We can get back to a FeatureCollection"
+        self.assertEqual(FeatureCollection.from_arrays(self.arrays), self.features)
+        self.assertEqual(self.arrays.to_features(), self.features)
+
+    def test_take(self):
+        "We can select geometries without going through shapely"
+        index = [5, 0, 3]
+        taken = self.arrays.take(index)
+        self.assertEqual(list(taken), [self.features.features[i] for i in index])
+        mask = np.arange(len(GEOMS)) % 2 == 1
+        self.assertEqual(len(self.arrays.take(mask)), 3)
+        self.assertEqual(len(self.arrays.take([])), 0)
+
+    def test_holes(self):
+        "Polygon holes get their own rings"
+        poly = geometry.box(0, 0, 10, 10).difference(geometry.box(2, 2, 4, 4))
+        arrays = ColumnarCollection.from_features([poly])
+        self.assertEqual(arrays.type_codes[0], POLYGON)
+        self.assertEqual(len(arrays.ring_offsets), 3)
+        self.assertTrue(arrays.geometry(0).equals(poly))
+
+    def test_empty_and_null(self):
+        "Empty and null geometries have no coordinates"
+        arrays = ColumnarCollection.from_features([
+            Feature(None), wkt.loads('LINESTRING EMPTY'), geometry.Point(1, 2)
+        ])
+        self.assertIsNone(arrays.geometry(0))
+        self.assertTrue(arrays.geometry(1).is_empty)
+        self.assertEqual(arrays.geometry(1).geom_type, 'LineString')
+        self.assertEqual(arrays.geometry(2), geometry.Point(1, 2))
+        self.assertEqual(arrays.type_codes[1], LINESTRING)
+        bounds = arrays.bounds
+        self.assertTrue(np.isnan(bounds[:2]).all())
+        np.testing.assert_array_equal(bounds[2], [1, 2, 1, 2])
+
+    def test_bounds(self):
+        "Bounds are calculated over the buffer"
+        np.testing.assert_allclose(self.arrays.bounds, [g.bounds for g in GEOMS])
+
+    def test_with_coords(self):
+        "Bulk operations can swap out the coordinate buffer"
+        shifted = self.arrays.with_coords(self.arrays.coords + 10)
+        for idx, geom in enumerate(shifted.geometries):
+            np.testing.assert_allclose(geom.bounds, np.asarray(GEOMS[idx].bounds) + 10)
+        self.assertEqual(shifted.properties, self.arrays.properties)
+        with self.assertRaises(ValueError):
+            self.arrays.with_coords(self.arrays.coords[1:])
+
+    def test_3d(self):
+        "Z coordinates are kept"
+        arrays = ColumnarCollection.from_features([geometry.LineString([(0, 0, 1), (1, 1, 2)])])
+        self.assertEqual(arrays.coords.shape, (2, 3))
+        self.assertTrue(arrays.geometry(0).has_z)
+        with self.assertRaises(ValueError):
+            ColumnarCollection.from_features([geometry.Point(0, 0, 0), geometry.Point(0, 0)])
+
+    @ddt.data(*range(len(GEOMS)))
+    def test_read_wkb(self, idx):
+        "WKB in either byte order gets split into the same parts"
+        little = _read_wkb(wkb.dumps(GEOMS[idx]), 0, 2)[0]
+        big = _read_wkb(wkb.dumps(GEOMS[idx], big_endian=True), 0, 2)[0]
+        self.assertEqual([len(rings) for rings in little], [len(rings) for rings in big])
+        for rings, big_rings in zip(little, big):
+            for ring, big_ring in zip(rings, big_rings):
+                np.testing.assert_array_equal(ring, big_ring)
+        with self.assertRaises(ValueError):
+            _read_wkb(wkb.dumps(GEOMS[idx]), 0, 3)
+
+    def test_unclosed_rings(self):
+        "Rings which aren't closed any more (e.g. after swapping coords) get closed"
+        arrays = ColumnarCollection.from_features([geometry.box(0, 0, 1, 1)])
+        coords = arrays.coords.copy()
+        coords[-1] += 0.5
+        poly = arrays.with_coords(coords).geometry(0)
+        self.assertEqual(poly.geom_type, 'Polygon')
+        self.assertEqual(poly.exterior.coords[0], poly.exterior.coords[-1])
+
+    def test_bad_inputs(self):
+        "Unsupported geometries and broken offsets raise errors"
+        with self.assertRaises(ValueError):
+            ColumnarCollection.from_features([
+                geometry.GeometryCollection([geometry.Point(0, 0)])
+            ])
+        with self.assertRaises(ValueError):
+            ColumnarCollection(np.zeros((2, 2)), [0, 1], [0, 1], [0, 3], [POINT])
+
+if __name__ == '__main__':
+    unittest.main()
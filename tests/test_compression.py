@@ -0,0 +1,65 @@
+""" file:    test_compression.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for compressing collections
+"""
+
+import unittest
+
+import ddt
+
+from cogj.compression import compress, decompress_collection, get_codec, available_codecs
+
+BODY = b'{"type":"FeatureCollection","features":[' \
+    + b','.join(b'{"type":"Feature","geometry":null,"properties":{"id":%d}}' % i
+                for i in range(100)) \
+    + b']}'
+
+@ddt.ddt
+class TestCompression(unittest.TestCase):
+
+    "Test compressing and decompressing collections"
+
+    @ddt.data(*available_codecs())
+    def test_roundtrip(self, codec):
+        "Collections come back the way they went in"
+        data = compress(BODY, codec)
+        self.assertTrue(len(data) < len(BODY))
+        entry = {'codec': codec, 'uncompressed_size': len(BODY)}
+        self.assertEqual(decompress_collection(data, entry), BODY)
+        self.assertEqual(decompress_collection(memoryview(data), entry), BODY)
+
+    def test_gzip_deterministic(self):
+        "gzip output doesn't depend on when it was written, and levels get used"
+        self.assertEqual(compress(BODY, 'gzip'), compress(BODY, 'gzip'))
+        # Level 0 just stores the data
+        self.assertTrue(len(compress(BODY, 'gzip', level=0)) > len(BODY))
+
+    def test_uncompressed(self):
+        "Collections without a codec are passed through"
+        self.assertIs(decompress_collection(BODY, {'size': len(BODY)}), BODY)
+
+    def test_errors(self):
+        "Corrupt collections and unknown codecs raise ValueError"
+        data = compress(BODY, 'gzip')
+        with self.assertRaises(ValueError):
+            decompress_collection(data[:-10], {'codec': 'gzip'})
+        with self.assertRaises(ValueError):
+            decompress_collection(data, {'codec': 'gzip', 'uncompressed_size': 10})
+        with self.assertRaises(ValueError):
+            get_codec('lzma')
+
+    def test_zstd_optional(self):
+        "zstd is only available with zstandard installed"
+        try:
+            import zstandard  # pylint: disable=W0611,C0415
+        except ImportError:
+            self.assertNotIn('zstd', available_codecs())
+            with self.assertRaises(ValueError):
+                get_codec('zstd')
+        else:
+            self.assertIn('zstd', available_codecs())
+
+if __name__ == '__main__':
+    unittest.main()
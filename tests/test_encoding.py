@@ -0,0 +1,107 @@
+""" file:    test_encoding.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for fast JSON encoding
+"""
+
+import io
+import json
+import unittest
+
+import ddt
+import numpy as np
+from shapely import geometry
+
+from cogj import Feature, FeatureCollection
+from cogj.encoding import encode_feature, encode_geometry, encode_collection, \
+    write_collection, format_coords, get_backend
+
+from .test_features import GEOMS
+
+try:
+    import orjson  # pylint: disable=W0611
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+def stdlib(obj):
+    "Encode the way Feature.json used to"
+    return json.dumps(geometry.mapping(obj), separators=(',', ':')).encode('utf-8')
+
+@ddt.ddt
+class TestEncoding(unittest.TestCase):
+
+    "Test encoding features"
+
+    @ddt.data(*GEOMS)
+    def test_geometry(self, geom):
+        "Geometries come out exactly the same as the json module"
+        self.assertEqual(encode_geometry(geom), stdlib(geom))
+
+    @ddt.data(*GEOMS)
+    def test_feature(self, geom):
+        "Features come out exactly the same with the json backend"
+        feature = Feature(geom, {'name': 'café', 'value': 0.1, 'list': [1, 2]})
+        self.assertEqual(encode_feature(feature, backend='json'), stdlib(feature))
+
+    @unittest.skipUnless(HAVE_ORJSON, 'orjson not installed')
+    def test_orjson(self):
+        "The orjson backend gives the same JSON"
+        feature = Feature(GEOMS[3], {'name': 'café', 'big': 2 ** 70, 'value': np.float64(1.5)})
+        encoded = encode_feature(feature, backend='orjson')
+        self.assertEqual(json.loads(encoded.decode('utf-8'))['properties'],
+                         {'name': 'café', 'big': 2 ** 70, 'value': 1.5})
+        self.assertEqual(get_backend('orjson').backend, 'orjson')
+
+    @ddt.data('orjson', 'json')
+    def test_nonfinite(self, backend):
+        "NaN and infinite properties are written the same way on every backend"
+        if backend == 'orjson' and not HAVE_ORJSON:
+            self.skipTest('orjson not installed')
+        properties = {'x': float('nan'), 'y': [float('inf'), None], 'z': np.float64('-inf')}
+        encoded = get_backend(backend)(properties)
+        self.assertEqual(encoded, b'{"x":NaN,"y":[Infinity,null],"z":-Infinity}')
+        self.assertEqual(get_backend(backend)({'x': None}), b'{"x":null}')
+        feature = Feature(GEOMS[0], {'x': float('nan')})
+        self.assertIn('"x":NaN', feature.json(compact=True))
+        self.assertIn('"x": NaN', feature.json())
+        self.assertIn(b'NaN', encode_feature(feature, backend=backend))
+
+    def test_unknown_backend(self):
+        "Unknown backends are an error"
+        with self.assertRaises(ValueError):
+            get_backend('yaml')
+
+    def test_z(self):
+        "Z coordinates are written"
+        geom = geometry.LineString([(0, 0, 1), (1, 1, 2)])
+        self.assertEqual(encode_geometry(geom), stdlib(geom))
+
+    def test_geometry_collection(self):
+        "Geometry collections are written member by member"
+        geom = geometry.GeometryCollection([geometry.Point(0, 0), geometry.LineString([(0, 0), (1, 1)])])
+        self.assertEqual(json.loads(encode_geometry(geom)), json.loads(stdlib(geom)))
+
+    def test_precision(self):
+        "Coordinates are rounded to the given number of decimals"
+        coords = np.array([[-76.57139851406845, 2.0], [1.5, -0.0000001]])
+        self.assertEqual(format_coords(coords, precision=6), b'[[-76.571399,2.0],[1.5,0.0]]')
+        self.assertEqual(format_coords(coords, precision=0), b'[[-77.0,2.0],[2.0,0.0]]')
+        self.assertEqual(format_coords(coords[0]), b'[-76.57139851406845,2.0]')
+        self.assertEqual(format_coords(np.empty((0, 2))), b'[]')
+
+    def test_write(self):
+        "Collections can be written straight into a buffer"
+        features = [Feature(g, {'idx': i}) for i, g in enumerate(GEOMS)]
+        buffer = io.BytesIO()
+        written = write_collection(features, buffer)
+        self.assertEqual(buffer.getvalue(), encode_collection(features))
+        self.assertEqual(written, len(buffer.getvalue()))
+        self.assertEqual(
+            json.loads(FeatureCollection(features).json(compact=True)),
+            json.loads(FeatureCollection(features).json())
+        )
+
+if __name__ == '__main__':
+    unittest.main()
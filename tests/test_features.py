@@ -5,12 +5,13 @@
     description: Tests for feature objects
 """
 
+import json
 import unittest
 
 import ddt
 from shapely import geometry
 
-from cogj.feature import Feature, FeatureCollection
+from cogj.feature import Feature, FeatureCollection, LazyFeatureCollection
 
 GEOMS = (
     geometry.Point(0, 0),
@@ -101,5 +102,74 @@ class TestFeatureCollection(unittest.TestCase):
         for feat1, feat2 in zip(coll, feats):
             self.assertEqual(feat1, feat2)
 
+class TestLazyFeatureCollection(unittest.TestCase):
+
+    "Test streaming FeatureCollections"
+
+    def setUp(self):
+        self.features = [Feature(g, {'id': idx}) for idx, g in enumerate(GEOMS)]
+
+    def test_json(self):
+        "Streamed JSON matches FeatureCollection.json"
+        lazy = LazyFeatureCollection(lambda: iter(self.features))
+        collection = FeatureCollection(self.features)
+        for kwargs in ({}, {'compact': True}, {'compact': True, 'sort_keys': True}):
+            self.assertEqual(lazy.json(**kwargs), collection.json(**kwargs))
+        self.assertEqual(json.loads(lazy.json(indent=2)), json.loads(collection.json()))
+        self.assertEqual(lazy.json(compact=True, precision=2),
+                         collection.json(compact=True, precision=2))
+
+    def test_empty(self):
+        "Empty collections are still valid JSON"
+        lazy = LazyFeatureCollection([])
+        for kwargs in ({}, {'compact': True}, {'indent': 2}):
+            self.assertEqual(json.loads(lazy.json(**kwargs)),
+                             {'type': 'FeatureCollection', 'features': []})
+
+    def test_iter_json(self):
+        "JSON is generated one feature at a time"
+        chunks = list(LazyFeatureCollection(self.features).iter_json(compact=True))
+        self.assertEqual(len(chunks), len(self.features) + 2)
+
+    def test_lazy(self):
+        "Nothing gets read until we iterate, and only as much as we need"
+        consumed = []
+        def _source():
+            for feature in self.features:
+                consumed.append(feature)
+                yield feature
+        lazy = LazyFeatureCollection(_source()).filter(lambda f: f.properties['id'] % 2)
+        self.assertEqual(consumed, [])
+        self.assertEqual(next(iter(lazy)).properties['id'], 1)
+        self.assertEqual(len(consumed), 2)
+
+    def test_consumed(self):
+        "One-shot iterators can't be read twice, reopenable sources can"
+        lazy = LazyFeatureCollection(iter(self.features))
+        self.assertEqual(lazy.count(), len(self.features))
+        with self.assertRaises(ValueError):
+            lazy.count()
+        lazy = LazyFeatureCollection(lambda: iter(self.features))
+        self.assertEqual(lazy.count(), lazy.count())
+
+    def test_conversion(self):
+        "Geometries and GeoJSON mappings get converted to features"
+        records = [json.loads(f.json()) for f in self.features]
+        for source in (records, GEOMS):
+            lazy = LazyFeatureCollection(source)
+            self.assertTrue(all(isinstance(f, Feature) for f in lazy))
+            self.assertEqual(list(lazy.geometries), list(GEOMS))
+        with self.assertRaises(ValueError):
+            list(LazyFeatureCollection([1, 2, 3]))
+
+    def test_pipe(self):
+        "Map and pipe compose lazily, and we can materialize the result"
+        lazy = LazyFeatureCollection(self.features) \
+            .map(lambda f: Feature(f.geometry, {'id': f.properties['id'] * 10})) \
+            .pipe(lambda features: (f for f in features if f.properties['id'] > 20))
+        collection = lazy.materialize()
+        self.assertIsInstance(collection, FeatureCollection)
+        self.assertEqual([f.properties['id'] for f in collection], [30, 40, 50])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -5,13 +5,14 @@
     description: Testing filter implementation
 """
 
+import itertools
 import unittest
 
 from shapely import geometry
 import ddt
 from voluptuous import Schema, Range, Required, All, ALLOW_EXTRA
 
-from cogj import Feature, FeatureCollection, FeatureFilter
+from cogj import Feature, FeatureCollection, FeatureFilter, AttributeTable, ColumnarCollection
 
 GEOMS = (
     geometry.Point(0, 0),
@@ -38,6 +39,10 @@ FEATURES = list(map(lambda args: Feature(geometry=args[0], properties=args[1]),
                     zip(GEOMS, PROPERTIES)))
 FCOLLECTION = FeatureCollection(FEATURES)
 
+def reverse_ids(features):
+    "Transform for parallel filtering, must be picklable"
+    return [Feature(f.geometry, {'id': -f.properties['id']}) for f in features]
+
 @ddt.ddt
 class TestFilter(unittest.TestCase):
 
@@ -142,5 +147,130 @@ class TestFilter(unittest.TestCase):
             self.assertEqual(orig.properties['id'], filtered.properties['id'])
             self.assertNotIn('is_multi', filtered.properties.keys())
 
+    @ddt.data(
+        (None, True, None),
+        ({Required('id'): All(int, Range(min=2, max=5))}, ('id',), None),
+        ({'is_multi': True}, False, None),
+        ({Required('id'): lambda v: v % 2}, 'is_multi', 2),
+        ({Required('id'): Range(min=4)}, True, 1)
+    )
+    @ddt.unpack
+    def test_filter_table(self, schema, keep_properties, limit):
+        "Filtering tables gives the same results as filtering features"
+        filt = FeatureFilter(schema=schema, keep_properties=keep_properties, limit=limit)
+        expected = list(filt(FCOLLECTION))
+        table = AttributeTable.from_records(f.properties for f in FCOLLECTION)
+        for geometries in (GEOMS, ColumnarCollection.from_features(GEOMS)):
+            filtered, geoms = filt.filter_table(table, geometries)
+            self.assertEqual(filtered.records(), [f.properties for f in expected])
+            for geom, feature in zip(geoms if isinstance(geoms, list) else geoms.geometries,
+                                     expected):
+                self.assertTrue(geom.equals(feature.geometry))
+        self.assertIsNone(filt.filter_table(table)[1])
+
+    def test_filter_table_lengths(self):
+        "Tables and geometries have to match up"
+        table = AttributeTable.from_records(f.properties for f in FCOLLECTION)
+        with self.assertRaises(ValueError):
+            FeatureFilter().filter_table(table, GEOMS[:2])
+
+    @ddt.data(True, False)
+    def test_stats(self, compiled):
+        "Stats count kept and rejected features by error type"
+        filt = FeatureFilter(schema={Required('id'): Range(min=3)}, compile_schema=compiled)
+        self.assertEqual(len(list(filt(FCOLLECTION))), 4)
+        self.assertEqual(filt.stats.as_dict(), {
+            'seen': 6, 'outside': 0, 'kept': 4, 'rejected': 2,
+            'errors': {'Invalid' if compiled else 'RangeInvalid': 2}
+        })
+        list(filt(FCOLLECTION))
+        self.assertEqual(filt.stats.seen, 12)
+        filt.stats.reset()
+        self.assertEqual(filt.stats.seen, 0)
+
+    @ddt.data(True, False, 'id', ('id',))
+    def test_lean(self, keep_properties):
+        "Lean mode gives the same features, with a summary instead of per-feature logs"
+        schema = {Required('id'): All(int, Range(min=2))}
+        expected = list(FeatureFilter(schema=schema, keep_properties=keep_properties)(FCOLLECTION))
+        filt = FeatureFilter(schema=schema, keep_properties=keep_properties, lean=True)
+        with self.assertLogs('cogj.filter', level='DEBUG') as logs:
+            self.assertEqual(list(filt(FCOLLECTION)), expected)
+        self.assertFalse(any('Skipping' in line for line in logs.output))
+        self.assertTrue(any('kept=5, rejected=1' in line for line in logs.output))
+
+    def test_verbose(self):
+        "Without lean mode we log each rejected feature at DEBUG level"
+        filt = FeatureFilter(schema={Required('id'): Range(min=2)})
+        with self.assertLogs('cogj.filter', level='DEBUG') as logs:
+            list(filt(FCOLLECTION))
+        self.assertTrue(any('Skipping' in line for line in logs.output))
+
+    @ddt.data(True, False, 'id')
+    def test_property_logging(self, keep_properties):
+        "Property handling is logged once, not once per feature"
+        filt = FeatureFilter(keep_properties=keep_properties)
+        with self.assertLogs('cogj.filter', level='DEBUG') as logs:
+            list(filt(FCOLLECTION))
+        self.assertEqual(sum('properties' in line for line in logs.output), 1)
+
+    @ddt.data(False, True)
+    def test_area(self, spatial_index):
+        "We can filter on an area of interest, which composes with limits and chunks"
+        area = geometry.MultiPolygon([geometry.box(1.5, 1.5, 3, 3), geometry.box(-1, -1, 0.1, 0.1)])
+        expected = [f for f in FCOLLECTION if f.geometry.intersects(area)]
+        filt = FeatureFilter(area=area, spatial_index=spatial_index)
+        self.assertEqual(list(filt(FCOLLECTION)), expected)
+        self.assertEqual(filt.stats.outside, len(FCOLLECTION) - len(expected))
+
+        filt = FeatureFilter(area=area, spatial_index=spatial_index, limit=2, chunk=1,
+                             schema={Required('id'): Range(min=2)})
+        self.assertEqual(list(filt(FCOLLECTION)),
+                         [(f,) for f in expected if f.properties['id'] >= 2][:2])
+
+    def test_area_table(self):
+        "Tables get filtered on the area of interest too"
+        filt = FeatureFilter(area=(0.9, 0.9, 1.1, 1.1), schema={Required('id'): Range(max=5)})
+        expected = list(filt(FCOLLECTION))
+        table = AttributeTable.from_records(f.properties for f in FCOLLECTION)
+        for geometries in (GEOMS, ColumnarCollection.from_features(GEOMS)):
+            filtered, _ = filt.filter_table(table, geometries)
+            self.assertEqual(filtered.records(), [f.properties for f in expected])
+        with self.assertRaises(ValueError):
+            filt.filter_table(table)
+
+    @ddt.data(*itertools.product(('thread', 'process'), (True, False)))
+    @ddt.unpack
+    def test_executor(self, executor, ordered):
+        "Filtering chunks in parallel gives the same features and stats"
+        features = FEATURES * 20
+        kwargs = dict(schema={Required('id'): All(int, Range(min=2))}, keep_properties='id',
+                      area=(-0.5, -0.5, 1.5, 1.5))
+        serial = FeatureFilter(**kwargs)
+        expected = list(serial(features))
+        filt = FeatureFilter(executor=executor, jobs=2, chunk=7, ordered=ordered,
+                             in_flight=3, transform=reverse_ids, **kwargs)
+        output = [f for chunk in filt(features) for f in chunk]
+        expected = reverse_ids(expected)
+        if ordered:
+            self.assertEqual(output, expected)
+        else:
+            self.assertCountEqual([f.json() for f in output], [f.json() for f in expected])
+        self.assertEqual(filt.stats.as_dict(), serial.stats.as_dict())
+
+    def test_executor_limit(self):
+        "Limits and chunks apply to the parallel output"
+        filt = FeatureFilter(executor='thread', jobs=2, limit=5, chunk=2)
+        chunks = list(filt(FEATURES * 10))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        with self.assertRaises(ValueError):
+            FeatureFilter(executor='fork')
+
+    def test_executor_stops_early(self):
+        "Chunks which haven't started are cancelled when we stop early"
+        filt = FeatureFilter(executor='thread', jobs=2, limit=5, chunk=1, in_flight=4)
+        self.assertEqual(sum(len(c) for c in filt(FEATURES * 1000)), 5)
+        self.assertLess(filt.stats.seen, 20)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,101 @@
+""" file:    test_index.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for the packed RTree
+"""
+
+import unittest
+import itertools
+
+import ddt
+import numpy as np
+
+from cogj.index import PackedTree, partition, hilbert_distance, intersects
+
+def random_bounds(count, seed=42):
+    "Generate some random boxes"
+    rand = np.random.RandomState(seed)
+    corner = rand.uniform(-10, 10, (count, 2))
+    size = rand.lognormal(-2, 1, (count, 2))
+    return np.hstack([corner, corner + size])
+
+@ddt.ddt
+class TestPartition(unittest.TestCase):
+
+    "Test partitioning bounds into groups"
+
+    @ddt.data(*itertools.product((1, 7, 100, 1000), ('str', 'hilbert')))
+    @ddt.unpack
+    def test_partition_covers(self, count, method):
+        "Every item ends up in exactly one group"
+        groups = partition(random_bounds(count), 10, method=method)
+        indices = np.sort(np.concatenate(groups))
+        self.assertTrue(np.array_equal(indices, np.arange(count)))
+        self.assertTrue(all(0 < len(g) <= 10 for g in groups))
+
+    @ddt.data('str', 'hilbert')
+    def test_partition_empty(self, method):
+        "Empty bounds give no groups"
+        self.assertEqual(partition(np.empty((0, 4)), 10, method=method), [])
+
+    @ddt.data('str', 'hilbert')
+    def test_partition_locality(self, method):
+        "Packed groups should be much smaller than the full extent"
+        bounds = random_bounds(2000)
+        groups = partition(bounds, 50, method=method)
+        area = lambda b: (b[2] - b[0]) * (b[3] - b[1])
+        total = area([*bounds[:, :2].min(axis=0), *bounds[:, 2:].max(axis=0)])
+        for group in groups:
+            group_bounds = [*bounds[group, :2].min(axis=0), *bounds[group, 2:].max(axis=0)]
+            self.assertTrue(area(group_bounds) < total / 4)
+
+    def test_unknown_method(self):
+        "Unknown methods raise an error"
+        with self.assertRaises(ValueError):
+            partition(random_bounds(10), 2, method='quadtree')
+
+    def test_hilbert_curve(self):
+        "Check the first order curve visits quadrants in the right order"
+        points = [[0, 0], [0, 1], [1, 1], [1, 0]]
+        distances = hilbert_distance(points, extent=(0, 0, 1, 1), order=1)
+        self.assertEqual(list(distances), [0, 1, 2, 3])
+
+@ddt.ddt
+class TestPackedTree(unittest.TestCase):
+
+    "Test searching the packed tree"
+
+    @ddt.data(*itertools.product((0, 1, 15, 16, 17, 5000), ('str', 'hilbert')))
+    @ddt.unpack
+    def test_search(self, count, method):
+        "Tree search should match a brute force search"
+        bounds = random_bounds(count)
+        tree = PackedTree(bounds, node_size=16, method=method)
+        self.assertEqual(len(tree), count)
+        for query in random_bounds(20, seed=1):
+            expected = np.flatnonzero(intersects(bounds, query))
+            self.assertTrue(np.array_equal(tree.search(query), expected))
+
+    def test_height(self):
+        "Height should be logarithmic in the number of items"
+        tree = PackedTree(random_bounds(5000), node_size=16)
+        self.assertEqual(tree.height, 4)
+        self.assertEqual(len(tree.levels[-1][0]), 1)
+
+    def test_leaves(self):
+        "Leaves should cover all items"
+        tree = PackedTree(random_bounds(1000), node_size=16)
+        self.assertEqual(sum(len(leaf) for leaf in tree.leaves), 1000)
+        query = (-1, -1, 1, 1)
+        leaves = tree.search_leaves(query)
+        expected = np.flatnonzero(intersects(tree.leaf_bounds, query))
+        self.assertTrue(np.array_equal(leaves, expected))
+
+    def test_bad_node_size(self):
+        "Nodes need at least two children"
+        with self.assertRaises(ValueError):
+            PackedTree(random_bounds(10), node_size=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+""" file:    test_kernels.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for the compiled kernels and their numpy fallbacks
+"""
+
+import unittest
+
+import numpy as np
+
+from cogj import kernels
+
+def make_rings(count=50, seed=42):
+    "Make some random rings, including some with less than two points"
+    rand = np.random.RandomState(seed)
+    sizes = rand.randint(0, 20, count)
+    offsets = np.append(0, np.cumsum(sizes))
+    coords = rand.uniform(-10, 10, (offsets[-1], 2))
+    return coords, offsets
+
+class TestKernels(unittest.TestCase):
+
+    "Check kernels give the right answers"
+
+    def setUp(self):
+        self.coords, self.offsets = make_rings()
+
+    def test_ring_lengths(self):
+        "Ring lengths match a loop over rings"
+        expected = [
+            np.linalg.norm(np.diff(self.coords[start:end], axis=0), axis=1).sum()
+            for start, end in zip(self.offsets[:-1], self.offsets[1:])
+        ]
+        np.testing.assert_allclose(kernels.ring_lengths(self.coords, self.offsets), expected)
+
+    def test_sample_rings(self):
+        "Samples are evenly spaced along each ring, short rings are copied"
+        lengths = kernels.ring_lengths(self.coords, self.offsets)
+        sizes = np.diff(self.offsets)
+        counts = np.where(sizes > 1, 10, sizes)
+        new_offsets = np.append(0, np.cumsum(counts))
+        samples = kernels.sample_rings(self.coords, self.offsets, new_offsets, lengths)
+        for idx, size in enumerate(sizes):
+            ring = samples[new_offsets[idx]:new_offsets[idx + 1]]
+            original = self.coords[self.offsets[idx]:self.offsets[idx + 1]]
+            if size < 2:
+                np.testing.assert_array_equal(ring, original)
+            else:
+                np.testing.assert_allclose(ring[0], original[0])
+                np.testing.assert_allclose(ring[-1], original[-1])
+
+    def test_bounds(self):
+        "Bounds match min/max per geometry"
+        result = kernels.bounds(self.coords, self.offsets)
+        for idx, (start, end) in enumerate(zip(self.offsets[:-1], self.offsets[1:])):
+            if start == end:
+                self.assertTrue(np.isnan(result[idx]).all())
+            else:
+                ring = self.coords[start:end]
+                np.testing.assert_array_equal(result[idx], [*ring.min(axis=0), *ring.max(axis=0)])
+
+    def test_interleave(self):
+        "Columns are put back together"
+        np.testing.assert_array_equal(kernels.interleave(self.coords.T), self.coords)
+
+@unittest.skipUnless(kernels.HAVE_EXTENSIONS, 'Compiled extensions not built')
+class TestCompiledKernels(unittest.TestCase):
+
+    "Check compiled kernels match the numpy fallbacks"
+
+    def setUp(self):
+        self.coords, self.offsets = make_rings(1000)
+
+    def test_ring_lengths(self):
+        "Ring lengths match"
+        np.testing.assert_allclose(
+            kernels.ring_lengths(self.coords, self.offsets),
+            kernels._ring_lengths(self.coords, self.offsets)  # pylint: disable=W0212
+        )
+
+    def test_sample_rings(self):
+        "Samples match"
+        lengths = kernels.ring_lengths(self.coords, self.offsets)
+        sizes = np.diff(self.offsets)
+        new_offsets = np.append(0, np.cumsum(np.where(sizes > 1, 25, sizes)))
+        np.testing.assert_allclose(
+            kernels.sample_rings(self.coords, self.offsets, new_offsets, lengths),
+            kernels._sample_rings(self.coords, self.offsets, new_offsets, lengths),  # pylint: disable=W0212
+            atol=1e-9
+        )
+
+    def test_sample_distances(self):
+        "Samples along a single line match"
+        points = self.coords[:20]
+        vectors = np.diff(points, axis=0)
+        norms = np.linalg.norm(vectors, axis=1)
+        unit_vectors = vectors / norms.reshape((-1, 1))
+        cumulative_norm = np.cumsum(norms)
+        distances = np.linspace(0, cumulative_norm[-1], 100)
+        np.testing.assert_allclose(
+            kernels.sample_distances(points, unit_vectors, cumulative_norm, distances),
+            kernels._sample_distances(points, unit_vectors, cumulative_norm, distances)  # pylint: disable=W0212
+        )
+
+    def test_bounds(self):
+        "Bounds match"
+        np.testing.assert_array_equal(
+            kernels.bounds(self.coords, self.offsets),
+            kernels._bounds(self.coords, self.offsets)  # pylint: disable=W0212
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+""" file:    test_predicates.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for compiling schemas into predicates
+"""
+
+import itertools
+import unittest
+
+import ddt
+from voluptuous import Schema, Required, Optional, All, Any, Range, In, Coerce, \
+    Length, ALLOW_EXTRA, PREVENT_EXTRA, MultipleInvalid
+
+import numpy as np
+
+from cogj import Feature, FeatureFilter, AttributeTable
+from cogj.predicates import compile_schema, compile_validator, compile_mask, CompileError
+
+from .test_filter import FEATURES
+
+# Compilable schemas
+SCHEMAS = (
+    {'id': int},
+    {Required('id'): int},
+    {Required('id'): All(int, Range(min=2, max=4))},
+    {Required('id'): Range(min=2, max=4, min_included=False, max_included=False)},
+    {'id': Range(min=3)},
+    {'is_multi': True},
+    {Required('name'): 'river'},
+    {Required('name'): In(['river', 'creek'])},
+    {Required('id'): Any(In([1, 2]), Range(min=5))},
+    {Required('id'): int, Optional('name'): str},
+    {Required('missing'): int},
+    {'missing': int},
+    Schema({Required('id'): int}, extra=PREVENT_EXTRA),
+    Schema({'id': int, 'is_multi': bool, 'name': str}, extra=PREVENT_EXTRA),
+    Schema({'id': int, 'name': Any(str, None)}, required=True, extra=ALLOW_EXTRA),
+)
+
+PROPERTIES = (
+    {'id': 1, 'is_multi': False},
+    {'id': 3, 'is_multi': True, 'name': 'river'},
+    {'id': 4.0, 'is_multi': 1},
+    {'id': '2', 'name': 'creek'},
+    {'id': None, 'name': None},
+    {'id': True, 'name': ['river']},
+    {'id': 5},
+    {'id': [1, 2], 'name': {'a': 1}},
+    {},
+    None,
+    ['id', 1],
+)
+
+def voluptuous_valid(schema, properties):
+    "Check properties the slow way"
+    if not isinstance(schema, Schema):
+        schema = Schema(schema, extra=ALLOW_EXTRA)
+    try:
+        schema(properties)
+        return True
+    except MultipleInvalid:
+        return False
+
+@ddt.ddt
+class TestPredicates(unittest.TestCase):
+
+    "Test compiling schemas"
+
+    @ddt.data(*SCHEMAS)
+    def test_matches_voluptuous(self, schema):
+        "Compiled predicates accept exactly the same properties as voluptuous"
+        predicate = compile_schema(schema)
+        self.assertIsNotNone(predicate)
+        for properties in PROPERTIES:
+            self.assertEqual(predicate(properties), voluptuous_valid(schema, properties),
+                             msg='{} vs {}'.format(schema, properties))
+
+    @ddt.data(*SCHEMAS)
+    def test_mask(self, schema):
+        "Column masks match checking each row"
+        predicate, mask = compile_schema(schema), compile_mask(schema)
+        tables = (
+            # Mixed types and missing values
+            AttributeTable.from_records(PROPERTIES[:-1]),
+            # Native columns
+            AttributeTable({
+                'id': np.arange(-2, 8),
+                'is_multi': np.arange(10) % 2 == 0,
+                'name': np.array(['river', 'creek', 'pond', ''] * 2 + ['a', 'b'])
+            }),
+            AttributeTable({'id': np.linspace(0, 6, 13), 'name': [None, 'river'] * 6 + [1]}),
+            AttributeTable.from_records([{'id': idx} for idx in range(5)] + [{'name': 'river'}])
+        )
+        for table in tables:
+            expected = [predicate(r) for r in table.records()]
+            self.assertEqual(mask(table).tolist(), expected, msg=str(schema))
+
+    @ddt.data(
+        {'id': Coerce(int)},
+        {'name': Length(min=2)},
+        {Required('id', default=3): int},
+        {str: int},
+        {'nested': {'id': int}},
+        {'id': All(Coerce(int), Range(min=2))},
+        [int]
+    )
+    def test_fallback(self, schema):
+        "Schemas we can't compile return None"
+        self.assertIsNone(compile_schema(schema))
+
+    def test_compile_validator(self):
+        "Unknown validators raise"
+        with self.assertRaises(CompileError):
+            compile_validator(lambda value: value)
+        self.assertTrue(compile_validator(All(int, Range(max=3)))(2))
+
+    @ddt.data(*itertools.product(SCHEMAS + ({'id': Coerce(int)},), (True, False)))
+    @ddt.unpack
+    def test_filter(self, schema, compiled):
+        "FeatureFilter gives the same features whether or not schemas are compiled"
+        features = FEATURES + [Feature(f.geometry, p) for f, p in zip(FEATURES, PROPERTIES)]
+        expected = [f for f in features if voluptuous_valid(schema, f.properties)]
+        filt = FeatureFilter(schema=schema, compile_schema=compiled)
+        self.assertEqual(filt._predicate is not None, compiled and schema in SCHEMAS)  # pylint: disable=W0212
+        self.assertEqual(list(filt(features)), expected)
+
+if __name__ == '__main__':
+    unittest.main()
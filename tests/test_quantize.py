@@ -0,0 +1,119 @@
+""" file:    test_quantize.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for coordinate quantization
+"""
+
+import json
+import unittest
+
+import ddt
+import numpy as np
+from shapely import geometry, wkt
+
+from cogj import Feature, FeatureCollection
+from cogj.quantize import quantize, quantize_coords, drop_duplicates, grid_decimals
+
+from .test_features import GEOMS
+
+@ddt.ddt
+class TestQuantize(unittest.TestCase):
+
+    "Test quantizing coordinates"
+
+    def test_precision(self):
+        "Coordinates get rounded to a number of decimals"
+        coords = quantize_coords([[1.23456, -0.00001], [2.5, 3.14159]], precision=2)
+        self.assertEqual(coords.tolist(), [[1.23, 0.0], [2.5, 3.14]])
+        self.assertFalse(np.signbit(coords).any())
+
+    def test_grid(self):
+        "Coordinates get snapped to a grid"
+        coords = quantize_coords([[1.2, 3.7], [-2.6, 0.4]], grid=0.5)
+        self.assertEqual(coords.tolist(), [[1.0, 3.5], [-2.5, 0.5]])
+
+    @ddt.data(
+        (0.1, [[0.3, 1.7], [2.3, 0.9]]),
+        (1e-4, [[0.3, 1.7], [2.3, 0.9001]]),
+        (0.25, [[0.25, 1.75], [2.25, 1.0]]),
+        (5, [[0.0, 0.0], [0.0, 0.0]])
+    )
+    @ddt.unpack
+    def test_grid_noise(self, grid, expected):
+        "Snapping to steps which aren't exact in binary doesn't add float noise"
+        feature = Feature(geometry.LineString([(0.3, 1.7), (2.3, 0.90007)]))
+        output = feature.json(compact=True, grid=grid)
+        self.assertEqual(json.loads(output)['geometry']['coordinates'], expected)
+        for value in expected:
+            for coord in value:
+                self.assertTrue(len(repr(coord)) <= 7, output)
+
+    @ddt.data((0.1, 1), (1e-4, 4), (0.25, 2), (5, 0), (2.5, 1), (1 / 3, 12))
+    @ddt.unpack
+    def test_grid_decimals(self, grid, decimals):
+        "We know how many decimals grid steps need"
+        self.assertEqual(grid_decimals(grid), decimals)
+
+    def test_bad_arguments(self):
+        "Can't round and snap at the same time, and grids must be positive"
+        with self.assertRaises(ValueError):
+            quantize_coords([[0, 0]], precision=2, grid=0.5)
+        with self.assertRaises(ValueError):
+            quantize_coords([[0, 0]], grid=0)
+
+    def test_drop_duplicates(self):
+        "Consecutive duplicates get dropped, closing vertices don't"
+        coords = np.array([[0, 0], [0, 0], [1, 0], [1, 1], [1, 1], [0, 0]])
+        expected = [[0, 0], [1, 0], [1, 1], [0, 0]]
+        self.assertEqual(drop_duplicates(coords, min_size=4).tolist(), expected)
+
+    def test_collapsed_ring(self):
+        "Rings which collapse after rounding keep enough vertices to be valid"
+        polygon = geometry.Polygon([(0, 0), (0.001, 0), (0.001, 0.001), (0, 0)])
+        quantized = quantize(polygon, precision=1)
+        self.assertEqual(len(quantized.exterior.coords), 4)
+
+        line = geometry.LineString([(0, 0), (0.001, 0.001)])
+        self.assertEqual(len(quantize(line, precision=1).coords), 2)
+
+    def test_polygon(self):
+        "Polygons stay closed when vertices are dropped"
+        polygon = geometry.Polygon(
+            [(0, 0), (1.001, 0), (1.002, 0), (1, 1), (0, 1.004), (0, 0)],
+            [[(0.2, 0.2), (0.2, 0.21), (0.5, 0.5), (0.2, 0.5), (0.2, 0.2)]]
+        )
+        quantized = quantize(polygon, precision=1)
+        self.assertEqual(list(quantized.exterior.coords),
+                         [(0, 0), (1, 0), (1, 1), (0, 1), (0, 0)])
+        self.assertEqual(len(quantized.interiors[0].coords), 4)
+        self.assertTrue(quantized.is_valid)
+
+    @ddt.data(*GEOMS)
+    def test_geometries(self, geom):
+        "All the geometry types come back as the same type"
+        quantized = quantize(geom, precision=3)
+        self.assertEqual(quantized.geom_type, geom.geom_type)
+
+    def test_empty(self):
+        "Empty geometries pass through"
+        empty = wkt.loads('LINESTRING EMPTY')
+        self.assertTrue(quantize(empty, precision=2).is_empty)
+
+    def test_feature_json(self):
+        "Feature.json and FeatureCollection.json take a precision"
+        feature = Feature(geometry.LineString([(0.1234, 0.5678), (0.1231, 0.5681), (1, 1)]),
+                          {'name': 'line'})
+        expected = {
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': [[0.12, 0.57], [1.0, 1.0]]},
+            'properties': {'name': 'line'}
+        }
+        self.assertEqual(json.loads(feature.json(compact=True, precision=2)), expected)
+        self.assertEqual(json.loads(feature.json(precision=2, indent=2)), expected)
+        collection = json.loads(FeatureCollection([feature]).json(compact=True, grid=0.5))
+        self.assertEqual(collection['features'][0]['geometry']['coordinates'],
+                         [[0.0, 0.5], [1.0, 1.0]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+""" file:    test_reader.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for reading COGJ files
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+import ddt
+
+from shapely import geometry
+
+from cogj import Feature
+from cogj.encoding import get_loader
+from cogj.reader import read_header, header_summary, parse_header, LocalReader, load_collection
+from cogj.writer import Writer, HEADER_SIZE
+
+from .range_server import RangeServer
+from .test_writer import make_features, read_cogj
+
+@ddt.ddt
+class TestReadHeader(unittest.TestCase):
+
+    "Test reading headers"
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tempdir.name) / 'points.json'
+        with Writer(self.path, metadata={'name': 'points'}, collection_size=10) as writer:
+            writer.extend(make_features(95))
+        self.header = read_cogj(self.path)[0]
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_local(self):
+        "We can read local headers"
+        self.assertEqual(read_header(self.path), self.header)
+        self.assertEqual(read_header(str(self.path)), self.header)
+
+    def test_large_header(self):
+        "Headers bigger than the default block get read too"
+        path = pathlib.Path(self.tempdir.name) / 'large.json'
+        with Writer(path, collection_size=1) as writer:
+            writer.extend(make_features(300))
+        header = read_header(path)
+        self.assertEqual(len(header['collections']), 300)
+        self.assertTrue(header['collections'][0]['start'] > HEADER_SIZE)
+
+    @ddt.data(True, False)
+    def test_remote(self, ranges):
+        "We only fetch the header, even if the server ignores ranges"
+        with RangeServer(self.tempdir.name, ranges=ranges) as server:
+            self.assertEqual(read_header(server.url + 'points.json'), self.header)
+            self.assertEqual(server.requests, [('/points.json', 'bytes=0-9999')])
+            with self.assertRaises(OSError):
+                read_header(server.url + 'missing.json')
+
+    def test_broken(self):
+        "Files which aren't COGJ raise errors"
+        path = pathlib.Path(self.tempdir.name) / 'broken.json'
+        path.write_text('{"collections": [')
+        with self.assertRaises(ValueError):
+            read_header(path)
+        with self.assertRaises(ValueError):
+            parse_header(b'[1, 2]')
+
+    def test_summary(self):
+        "Summaries add up"
+        summary = header_summary(self.header)
+        self.assertEqual(summary['name'], 'points')
+        self.assertEqual(summary['features'], 95)
+        self.assertEqual(summary['collections'], 10)
+        self.assertEqual(summary['header_size'], HEADER_SIZE)
+        self.assertEqual(summary['collection_features']['max'], 10)
+        self.assertEqual(summary['collection_features']['total'], 95)
+        self.assertEqual(summary['collection_bytes']['total'] + 10 + HEADER_SIZE,
+                         summary['size'])
+        self.assertTrue(0 <= summary['overlap_ratio'] < 1)
+        self.assertTrue(0 < summary['coverage_ratio'] < 2)
+        self.assertIsNone(header_summary({'collections': []})['overlap_ratio'])
+        self.assertIsNone(header_summary({'collections': []})['coverage_ratio'])
+
+    def test_summary_overlap(self):
+        "Overlapping collections in a sparse extent have low coverage but overlap"
+        header = {'collections': [
+            {'start': 0, 'size': 1, 'bbox': [0, 0, 2, 2]},
+            {'start': 1, 'size': 1, 'bbox': [1, 1, 3, 3]},
+            {'start': 2, 'size': 1, 'bbox': [1.5, 0, 2.5, 1]},
+            {'start': 3, 'size': 1, 'bbox': [99, 99, 100, 100]}
+        ]}
+        summary = header_summary(header)
+        # The first two overlap by 1, the first and third by 0.5 and the second
+        # and third only touch
+        self.assertAlmostEqual(summary['overlap_ratio'], 1.5 / 10)
+        self.assertAlmostEqual(summary['coverage_ratio'], 10 / 100 ** 2)
+        header['collections'] = header['collections'][-2:]
+        self.assertEqual(header_summary(header)['overlap_ratio'], 0)
+
+def sort_features(features):
+    "Sort features by id so we can compare them"
+    return sorted(features, key=lambda f: f.properties['id'])
+
+class TestLocalReader(unittest.TestCase):
+
+    "Test reading memory-mapped files"
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tempdir.name) / 'points.json'
+        self.features = make_features(95)
+        with Writer(self.path, collection_size=10) as writer:
+            writer.extend(self.features)
+        self.header, self.collections, self.data = read_cogj(self.path)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_collections(self):
+        "Collection bytes are slices of the file"
+        with LocalReader(self.path) as reader:
+            self.assertEqual(reader.header, self.header)
+            self.assertEqual(len(reader), 10)
+            for entry, collection in zip(self.header['collections'], reader.collections):
+                with collection.data as data:
+                    self.assertIsInstance(data, memoryview)
+                    self.assertEqual(data, self.data[entry['start']:entry['start'] + entry['size']])
+                self.assertEqual(len(collection), entry['features'])
+                self.assertEqual(collection.bbox, entry['bbox'])
+            self.assertEqual(reader.collection(-1).index, 9)
+            with self.assertRaises(IndexError):
+                reader.collection(10)
+        self.assertTrue(reader.closed)
+        with self.assertRaises(ValueError):
+            reader.collection_bytes(0)
+
+    def test_features(self):
+        "Features get decoded when we iterate over them"
+        with LocalReader(self.path) as reader:
+            features = sort_features(reader.features())
+        self.assertEqual(features, self.features)
+
+    def test_query(self):
+        "Bbox queries only decode the collections they touch"
+        bbox = (-10, -10, -5, -5)
+        with LocalReader(self.path) as reader:
+            collections = reader.query(bbox)
+            expected = [
+                idx for idx, c in enumerate(self.header['collections'])
+                if geometry.box(*c['bbox']).intersects(geometry.box(*bbox))]
+            self.assertEqual([c.index for c in collections], expected)
+            self.assertTrue(0 < len(collections) < len(reader))
+            features = list(reader.features(bbox))
+        self.assertEqual(
+            sorted(f.properties['id'] for f in features),
+            [f.properties['id'] for f in self.features
+             if f.geometry.intersects(geometry.box(*bbox))])
+
+        # Break the collections we shouldn't touch, we should never notice
+        data = bytearray(self.data)
+        for idx, entry in enumerate(self.header['collections']):
+            if idx not in expected:
+                data[entry['start']] = ord('!')
+        self.path.write_bytes(bytes(data))
+        with LocalReader(self.path) as reader:
+            self.assertEqual(len(list(reader.features(bbox))), len(features))
+            with self.assertRaises(ValueError):
+                list(reader.features())
+
+    def test_compressed(self):
+        "Compressed collections get decompressed when we iterate over them"
+        with Writer(self.path, collection_size=10, codec='gzip') as writer:
+            writer.extend(self.features)
+        with LocalReader(self.path) as reader:
+            self.assertEqual(sort_features(reader.features()), self.features)
+            bbox = (-10, -10, -5, -5)
+            self.assertEqual(
+                sort_features(reader.features(bbox)),
+                [f for f in self.features if f.geometry.intersects(geometry.box(*bbox))])
+        summary = header_summary(read_header(self.path))
+        self.assertEqual(summary['codecs'], ['gzip'])
+        self.assertEqual(summary['uncompressed_bytes'], sum(
+            c['size'] for c in self.header['collections']))
+        self.assertTrue(summary['compression_ratio'] > 1)
+
+    def test_open_views(self):
+        "Closing with views still open doesn't break them"
+        reader = LocalReader(self.path)
+        view = reader.collection_bytes(0)
+        reader.close()
+        self.assertEqual(load_collection(view), list(LocalReader(self.path).collection(0)))
+        view.release()
+
+    def test_truncated(self):
+        "Truncated files raise errors"
+        self.path.write_bytes(self.data[:-1000])
+        with self.assertRaises(ValueError):
+            LocalReader(self.path)
+
+    def test_loaders(self):
+        "All the JSON backends decode memoryviews"
+        view = memoryview(b'{"a": [1, 2]}')
+        self.assertEqual(get_loader('json')(view), {'a': [1, 2]})
+        self.assertEqual(get_loader()(view), {'a': [1, 2]})
+        with self.assertRaises(ValueError):
+            get_loader('yaml')
+
+if __name__ == '__main__':
+    unittest.main()
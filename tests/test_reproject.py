@@ -6,11 +6,14 @@
 """
 
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import ddt
+import numpy as np
 from shapely import geometry
 
-from cogj.reproject import reproject
+from cogj.reproject import reproject, reproject_collection, get_projector, \
+    get_transformer, normalize_crs, transformer_cache_info, clear_transformer_cache
 from cogj import FeatureCollection, Feature
 
 GEOMS = (
@@ -46,5 +49,89 @@ class TestReprojection(unittest.TestCase):
         self.assertIsNotNone(output)
         self.assertEqual(output.geom_type, geom.geom_type)
 
+    def test_collection(self):
+        "Reprojecting a collection in one go matches doing it per geometry"
+        collection = FeatureCollection([
+            Feature(geom, {'idx': idx}) for idx, geom in enumerate(GEOMS[:6])
+        ])
+        projector = get_projector('epsg:3112')
+        expected = [reproject(f, projector=projector) for f in collection]
+        output = reproject_collection(collection, from_crs='epsg:3112')
+        self.assertIsInstance(output, FeatureCollection)
+        for feat, exp in zip(output, expected):
+            self.assertEqual(feat.properties, exp.properties)
+            self.assertEqual(feat.geometry.geom_type, exp.geometry.geom_type)
+            self.assertTrue(feat.geometry.equals_exact(exp.geometry, 1e-9))
+
+    def test_columnar(self):
+        "Columnar collections stay columnar"
+        arrays = FeatureCollection(GEOMS[:6]).to_arrays()
+        output = reproject_collection(arrays, from_crs='epsg:3857')
+        self.assertEqual(output.coords.shape, arrays.coords.shape)
+        np.testing.assert_array_equal(output.ring_offsets, arrays.ring_offsets)
+        self.assertFalse(np.allclose(output.coords, arrays.coords))
+
+    def test_fallback(self):
+        "Collections with geometries we can't store in columns still work"
+        collection = FeatureCollection([
+            geometry.LinearRing([[0, 0], [1, 1], [0, 1]]),
+            geometry.Point(0, 0)
+        ])
+        output = reproject(collection, from_crs='epsg:3112')
+        self.assertEqual([f.geometry.geom_type for f in output], ['LinearRing', 'Point'])
+
+class TestTransformerCache(unittest.TestCase):
+
+    "Test transformers are cached"
+
+    def setUp(self):
+        clear_transformer_cache()
+
+    def test_normalize(self):
+        "Equivalent ways of writing a CRS give the same key"
+        self.assertEqual(normalize_crs('epsg:3112'), 'EPSG:3112')
+        self.assertEqual(normalize_crs('+init=epsg:3112'), 'EPSG:3112')
+        self.assertEqual(normalize_crs(None), normalize_crs('epsg:4326'))
+        self.assertEqual(normalize_crs('+proj=longlat  +datum=WGS84'), '+proj=longlat +datum=WGS84')
+        self.assertEqual(normalize_crs({'init': 'epsg:3112'}), (('init', 'epsg:3112'),))
+
+    def test_cached(self):
+        "Repeated calls reuse the transformer"
+        first = get_transformer('epsg:3112')
+        self.assertIs(get_transformer('EPSG:3112', 'epsg:4326'), first)
+        self.assertIs(get_transformer('+init=epsg:3112'), first)
+        info = transformer_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+        # Reprojecting without a projector uses the cache too
+        reproject(geometry.Point(0, 0), from_crs='epsg:3112')
+        self.assertEqual(transformer_cache_info().misses, 1)
+
+    def test_clear(self):
+        "Clearing the cache throws the transformers away"
+        first = get_transformer('epsg:3112')
+        clear_transformer_cache()
+        self.assertEqual(transformer_cache_info().currsize, 0)
+        self.assertIsNot(get_transformer('epsg:3112'), first)
+
+    def test_identity(self):
+        "Projecting to the same CRS doesn't make a transformer"
+        projector = get_projector('+init=epsg:4326')
+        self.assertEqual(projector(1, 2), (1, 2))
+        self.assertEqual(transformer_cache_info().currsize, 0)
+
+    def test_threads(self):
+        "Cached transformers can be used from multiple threads"
+        projector = get_projector('epsg:3112')
+        expected = projector(np.arange(100.), np.arange(100.))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: get_projector('epsg:3112')(np.arange(100.), np.arange(100.)),
+                range(32)
+            ))
+        for result in results:
+            np.testing.assert_array_equal(result, expected)
+        self.assertEqual(transformer_cache_info().currsize, 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -11,9 +11,11 @@ import os
 import pathlib
 
 import fiona
-from shapely.geometry import shape, Point
+import numpy as np
+from shapely.geometry import shape, Point, MultiPolygon, MultiLineString, MultiPoint
 
-from cogj import resample, resample_linestring_count
+from cogj import resample, resample_linestring_count, Feature, FeatureCollection
+from cogj.resample import resample_rings, resample_collection
 
 RESOURCES = pathlib.Path(__file__).parent / 'resources'
 
@@ -117,5 +119,55 @@ class TestResample(unittest.TestCase):
         pts_bound = resample(bound, **kwargs)
         self.assertTrue(all_close(pts_poly, pts_bound))
 
+    def test_resample_rings(self):
+        "Resampling rings in one go matches doing them one at a time"
+        rings = [self.poly.boundary, self.poly.buffer(0.01).boundary, self.poly.buffer(-0.01).boundary]
+        coords = np.vstack([np.asarray(r.coords) for r in rings])
+        offsets = np.cumsum([0] + [len(r.coords) for r in rings])
+        new_coords, new_offsets = resample_rings(coords, offsets, 0.001, clip=[10, 3000])
+        for idx, ring in enumerate(rings):
+            expected = resample(ring, 0.001, clip=[10, 3000], return_points=True)
+            self.assertTrue(np.allclose(new_coords[new_offsets[idx]:new_offsets[idx + 1]], expected))
+
+    def test_resample_short_rings(self):
+        "Rings with less than two points and empty rings are passed through"
+        coords = np.array([[0, 0], [1, 0], [5, 5], [0, 1], [0, 2]], dtype=float)
+        new_coords, new_offsets = resample_rings(coords, [0, 2, 2, 3, 5], 0.25, clip=[2, 100])
+        np.testing.assert_array_equal(new_offsets, [0, 4, 4, 5, 9])
+        np.testing.assert_array_equal(new_coords[4], [5, 5])
+        np.testing.assert_allclose(new_coords[:4, 0], [0, 1 / 3, 2 / 3, 1])
+        np.testing.assert_allclose(new_coords[5:, 1], [1, 4 / 3, 5 / 3, 2])
+
+    def test_resample_multipolygon(self):
+        "Check we can resample a multipolygon"
+        multi = MultiPolygon([self.poly, self.poly.buffer(-0.01)])
+        output = resample(multi, **self.kwargs)
+        self.assertEqual(output.geom_type, 'MultiPolygon')
+        self.assertEqual(len(output.geoms), 2)
+        expected = resample(self.poly, **self.kwargs)
+
+        # Rings may or may not get an extra closing point, depending on rounding
+        self.assertTrue(np.allclose(output.geoms[0].exterior.coords[:3000], expected.exterior.coords[:3000]))
+
+    def test_resample_multilinestring(self):
+        "Check we can resample a multilinestring"
+        multi = MultiLineString([self.poly.boundary, self.poly.buffer(0.01).boundary])
+        output = resample(multi, **self.kwargs)
+        self.assertEqual(output.geom_type, 'MultiLineString')
+        self.assertTrue(len(output.geoms[0].coords) > len(multi.geoms[0].coords))
+
+    def test_resample_collection(self):
+        "Check we can resample a FeatureCollection, leaving points alone"
+        collection = FeatureCollection([
+            Feature(self.poly, {'name': 'poly'}),
+            Feature(self.poly.boundary, {'name': 'line'}),
+            Feature(MultiPoint([[0, 0], [1, 1]]), {'name': 'points'})
+        ])
+        output = resample(collection, **self.kwargs)
+        self.assertEqual([f.properties['name'] for f in output], ['poly', 'line', 'points'])
+        self.assertEqual(output.features[2].geometry, collection.features[2].geometry)
+        arrays = resample_collection(collection.to_arrays(), 0.001, clip=[10, 3000])
+        self.assertEqual(arrays.geometry(1), output.features[1].geometry)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+""" file:    test_spatial.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for spatial predicates
+"""
+
+import unittest
+
+import ddt
+import numpy as np
+from shapely import geometry, wkt
+
+from cogj import ColumnarCollection
+from cogj.spatial import SpatialFilter
+
+from .test_features import GEOMS
+
+# An L-shaped line whose bounds overlap the box but which doesn't touch it
+NEAR_MISS = geometry.LineString([(0, 5), (0, 0), (5, 0)])
+AREA = geometry.box(1, 1, 4, 4)
+
+@ddt.ddt
+class TestSpatialFilter(unittest.TestCase):
+
+    "Test spatial predicates"
+
+    def test_bounds(self):
+        "Bounding boxes work as areas, and the exact test still runs"
+        spatial = SpatialFilter((1, 1, 4, 4))
+        self.assertFalse(spatial(NEAR_MISS))
+        self.assertTrue(spatial(geometry.Point(2, 2)))
+        self.assertFalse(spatial(geometry.Point(10, 10)))
+        self.assertFalse(spatial(None))
+        self.assertFalse(spatial(wkt.loads('POINT EMPTY')))
+        with self.assertRaises(ValueError):
+            SpatialFilter((4, 4, 1, 1))
+
+    @ddt.data(False, True)
+    def test_matches_shapely(self, index):
+        "Results match shapely's intersects, with or without an index"
+        area = geometry.MultiPolygon([
+            geometry.Point(x, y).buffer(0.3) for x in range(5) for y in range(5)])
+        spatial = SpatialFilter(area, index=index)
+        self.assertEqual(spatial.tree is not None, index)
+        rand = np.random.RandomState(42)
+        geoms = [geometry.Point(*rand.uniform(-1, 5, 2)) for _ in range(200)] + list(GEOMS)
+        expected = [g.intersects(area) for g in geoms]
+        self.assertEqual([spatial(g) for g in geoms], expected)
+        self.assertEqual(spatial.mask(geoms).tolist(), expected)
+        self.assertEqual(spatial.mask(ColumnarCollection.from_features(geoms)).tolist(), expected)
+
+    def test_overlaps_bounds(self):
+        "Bounds checks work on arrays, and empty bounds never overlap"
+        spatial = SpatialFilter(AREA)
+        bounds = np.array([[0, 0, 2, 2], [5, 5, 6, 6], [np.nan] * 4])
+        self.assertEqual(spatial.overlaps_bounds(bounds).tolist(), [True, False, False])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+""" file:    test_table.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for column-oriented attribute tables
+"""
+
+import unittest
+
+import numpy as np
+
+from cogj import AttributeTable
+
+RECORDS = [
+    {'id': 1, 'name': 'river', 'length': 1.5},
+    {'id': 2, 'name': 'creek'},
+    None,
+    {'id': 4, 'name': 5, 'extra': [1, 2]},
+    {}
+]
+
+class TestAttributeTable(unittest.TestCase):
+
+    "Test attribute tables"
+
+    def test_records(self):
+        "Records round-trip through the table"
+        table = AttributeTable.from_records(RECORDS)
+        self.assertEqual(len(table), len(RECORDS))
+        self.assertEqual(table.records(), RECORDS)
+        self.assertEqual(table.columns['id'].dtype.kind, 'i')
+        self.assertEqual(table.columns['name'].dtype.kind, 'O')
+        self.assertEqual(table.present('length').tolist(), [True, False, False, False, False])
+        self.assertFalse(table.present('unknown').any())
+
+    def test_columns(self):
+        "Tables can be made from dicts of arrays or structured arrays"
+        data = np.array([(1, 2.5), (2, 3.5)], dtype=[('id', 'i8'), ('value', 'f8')])
+        for columns in (data, {'id': [1, 2], 'value': np.array([2.5, 3.5])}):
+            table = AttributeTable(columns)
+            self.assertEqual(table.records(), [{'id': 1, 'value': 2.5}, {'id': 2, 'value': 3.5}])
+            self.assertIsInstance(table.records()[0]['id'], int)
+
+    def test_mixed_lists(self):
+        "Lists with mixed types aren't coerced to strings"
+        table = AttributeTable({'value': [1, 'a']})
+        self.assertEqual(table.records(), [{'value': 1}, {'value': 'a'}])
+
+    def test_take_select(self):
+        "We can select rows and columns"
+        table = AttributeTable.from_records(RECORDS)
+        self.assertEqual(table.take([3, 0]).records(), [RECORDS[3], RECORDS[0]])
+        self.assertEqual(table.take(np.array([False, True, True, False, False])).records(),
+                         [RECORDS[1], None])
+        self.assertEqual(table.select(['id', 'unknown']).records(),
+                         [{'id': 1}, {'id': 2}, None, {'id': 4}, {}])
+
+    def test_bad_lengths(self):
+        "Columns must be the same length"
+        with self.assertRaises(ValueError):
+            AttributeTable({'a': [1, 2], 'b': [1]})
+        with self.assertRaises(ValueError):
+            AttributeTable({'a': [1, 2]}, missing={'b': [True, False]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,11 +5,13 @@
     description: Tests for utilities
 """
 
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import ddt
 
-from cogj.utilities import flatten
+from cogj.utilities import flatten, bounded_map
 
 @ddt.ddt
 class TestFlatten(unittest.TestCase):
@@ -28,6 +30,47 @@ class TestFlatten(unittest.TestCase):
         self.assertTrue(isinstance(output, list))
         self.assertEqual(output, [2, 3, 4, 5, 6, 7])
 
+def slow_square(value):
+    "Square a value, taking longer for smaller ones"
+    time.sleep(0.01 * (5 - value))
+    return value ** 2
+
+class TestBoundedMap(unittest.TestCase):
+
+    "Test mapping with a bounded number of tasks in flight"
+
+    def test_ordered(self):
+        "Results come back in order by default"
+        with ThreadPoolExecutor(4) as executor:
+            results = list(bounded_map(executor, slow_square, ((i,) for i in range(5)), 2))
+        self.assertEqual(results, [0, 1, 4, 9, 16])
+
+    def test_unordered(self):
+        "Results can come back as they finish, with a bounded number in flight"
+        consumed, results = [], []
+        def _tasks():
+            for idx in range(10):
+                consumed.append(idx)
+                yield (idx % 5,)
+        with ThreadPoolExecutor(5) as executor:
+            for result in bounded_map(executor, slow_square, _tasks(), 3, ordered=False):
+                results.append(result)
+                # Submitted tasks which we haven't had the results of yet
+                self.assertLessEqual(len(consumed) - len(results), 3)
+        self.assertEqual(sorted(results), sorted([0, 1, 4, 9, 16] * 2))
+
+    def test_bounded(self):
+        "Tasks are only taken from the input as results are consumed"
+        consumed = []
+        def _tasks():
+            for idx in range(100):
+                consumed.append(idx)
+                yield (idx,)
+        with ThreadPoolExecutor(2) as executor:
+            results = bounded_map(executor, abs, _tasks(), 3)
+            self.assertEqual(next(results), 0)
+            self.assertEqual(len(consumed), 3)
+            results.close()
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
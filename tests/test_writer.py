@@ -0,0 +1,235 @@
+""" file:    test_writer.py (tests)
+    author: Jess Robertson, @jesserobertson
+    date:    Sunday, 18 October 2026
+
+    description: Tests for the streaming COGJ writer
+"""
+
+import unittest
+import itertools
+import json
+import pathlib
+import tempfile
+from functools import partial
+
+import ddt
+import numpy as np
+from shapely import geometry
+
+from cogj import Feature, FeatureCollection
+from cogj.compression import decompress_collection
+from cogj.writer import Writer, convert, chain, reproject_features, HEADER_SIZE
+
+def make_features(count, seed=42):
+    "Make some random point features"
+    rand = np.random.RandomState(seed)
+    return [
+        Feature(geometry.Point(*rand.uniform(-10, 10, 2)), {'id': idx})
+        for idx in range(count)
+    ]
+
+def drop_odd(features):
+    "Process step which throws away features with odd ids"
+    return [f for f in features if f.properties['id'] % 2 == 0]
+
+def read_cogj(path):
+    "Read a COGJ file back into a header and a list of collections"
+    with open(path, 'rb') as src:
+        data = src.read()
+    header, _ = json.JSONDecoder().raw_decode(data.decode('utf-8', 'ignore'))
+    collections = [
+        json.loads(decompress_collection(data[c['start']:c['start'] + c['size']], c).decode('utf-8'))
+        for c in header['collections']
+    ]
+    return header, collections, data
+
+@ddt.ddt
+class TestWriter(unittest.TestCase):
+
+    "Test writing COGJ files"
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sink = pathlib.Path(self.tempdir.name) / 'output.json'
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    @ddt.data(*itertools.product((1, 10, 95), ('str', 'hilbert')))
+    @ddt.unpack
+    def test_write(self, collection_size, method):
+        "Check we can write features and read them back"
+        features = make_features(200)
+        with Writer(self.sink, collection_size=collection_size, partition=method) as writer:
+            writer.extend(features)
+        header, collections, data = read_cogj(self.sink)
+
+        # Check header is consistent with the file
+        self.assertEqual(header['size'], len(data))
+        self.assertEqual(header['features'], 200)
+        self.assertEqual(len(collections), len(header['collections']))
+        self.assertEqual(
+            sum(c['features'] for c in header['collections']), 200)
+
+        # Check each collection
+        ids = []
+        for info, collection in zip(header['collections'], collections):
+            self.assertEqual(collection['type'], 'FeatureCollection')
+            self.assertEqual(len(collection['features']), info['features'])
+            self.assertTrue(info['features'] <= collection_size)
+            minx, miny, maxx, maxy = info['bbox']
+            for feature in collection['features']:
+                x, y = feature['geometry']['coordinates']
+                self.assertTrue(minx <= x <= maxx and miny <= y <= maxy)
+                ids.append(feature['properties']['id'])
+        self.assertEqual(sorted(ids), list(range(200)))
+
+    def test_collection_roundtrip(self):
+        "Collections should match the features that went in"
+        features = make_features(5)
+        with Writer(self.sink) as writer:
+            writer.extend(features)
+        _, collections, _ = read_cogj(self.sink)
+        self.assertEqual(json.loads(FeatureCollection(features).json()), collections[0])
+
+    def test_large_header(self):
+        "Headers larger than the default block get a bigger block"
+        with Writer(self.sink, collection_size=1) as writer:
+            writer.extend(make_features(500))
+        header, collections, data = read_cogj(self.sink)
+        self.assertTrue(writer.header_size > HEADER_SIZE)
+        self.assertEqual(writer.header_size % HEADER_SIZE, 0)
+        self.assertEqual(header['collections'][0]['start'], writer.header_size)
+        self.assertEqual(header['size'], len(data))
+        self.assertEqual(len(collections), 500)
+
+    def test_metadata(self):
+        "Metadata ends up in the header"
+        with Writer(self.sink, metadata={'name': 'Points'}) as writer:
+            writer.extend(make_features(3))
+        header, _, _ = read_cogj(self.sink)
+        self.assertEqual(header['name'], 'Points')
+
+    def test_unknown_method(self):
+        "Unknown packing methods are an error"
+        with self.assertRaises(ValueError):
+            Writer(self.sink, partition='quadtree')
+
+    def test_provisional_header(self):
+        "We can get a header before the writer is closed"
+        writer = Writer(self.sink)
+        writer.extend(make_features(3))
+        header = writer.header()
+        self.assertEqual(header['features'], 3)
+        self.assertEqual(header['collections'], [])
+        writer.close()
+        self.assertEqual(len(writer.header()['collections']), 1)
+
+    def test_closed(self):
+        "Can't add features after closing"
+        writer = Writer(self.sink)
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.add(make_features(1)[0])
+
+    @ddt.data(None, drop_odd, chain(partial(reproject_features, from_crs='epsg:3857'), drop_odd))
+    def test_jobs(self, process):
+        "Building collections in parallel gives exactly the same file"
+        outputs = []
+        for jobs in (1, 3):
+            sink = pathlib.Path(self.tempdir.name) / 'output-{}.json'.format(jobs)
+            with Writer(sink, collection_size=10, process=process, jobs=jobs) as writer:
+                writer.extend(make_features(200))
+            outputs.append(read_cogj(sink))
+        self.assertEqual(outputs[0][2], outputs[1][2])
+
+        # Check the header adds up after processing
+        header, collections, _ = outputs[0]
+        self.assertEqual(header['features'], sum(len(c['features']) for c in collections))
+        if process is not None:
+            self.assertEqual(header['features'], 100)
+
+    def test_process(self):
+        "Collection bounds come from the processed features"
+        process = partial(reproject_features, from_crs='epsg:3857')
+        with Writer(self.sink, process=process) as writer:
+            writer.extend(make_features(10))
+        header, collections, _ = read_cogj(self.sink)
+        self.assertTrue(abs(header['bbox'][0]) < 1e-3)
+        minx, miny, maxx, maxy = header['collections'][0]['bbox']
+        for feature in collections[0]['features']:
+            x, y = feature['geometry']['coordinates']
+            self.assertTrue(minx <= x <= maxx and miny <= y <= maxy)
+
+    def test_precision(self):
+        "Quantizing makes smaller collections and we know by how much"
+        with Writer(self.sink, collection_size=10) as writer:
+            writer.extend(make_features(50))
+        full_header = read_cogj(self.sink)[0]
+        with Writer(self.sink, collection_size=10, precision=3, jobs=2) as writer:
+            writer.extend(make_features(50))
+        header, collections, _ = read_cogj(self.sink)
+        self.assertEqual(len(writer.bytes_saved), 5)
+        for full, small, saved in zip(full_header['collections'], header['collections'],
+                                      writer.bytes_saved):
+            self.assertTrue(saved > 0)
+            self.assertEqual(full['size'] - small['size'], saved)
+        for feature in collections[0]['features']:
+            for value in feature['geometry']['coordinates']:
+                self.assertEqual(value, round(value, 3))
+
+    @ddt.data(1, 2)
+    def test_compression(self, jobs):
+        "Compressed collections decode to the same features and stay addressable"
+        with Writer(self.sink, collection_size=10) as writer:
+            writer.extend(make_features(50))
+        plain_header, plain_collections, _ = read_cogj(self.sink)
+        with Writer(self.sink, collection_size=10, codec='gzip', jobs=jobs) as writer:
+            writer.extend(make_features(50))
+        header, collections, data = read_cogj(self.sink)
+        self.assertEqual(collections, plain_collections)
+        self.assertEqual(header['size'], len(data))
+        for plain, entry in zip(plain_header['collections'], header['collections']):
+            self.assertEqual(entry['codec'], 'gzip')
+            self.assertEqual(entry['uncompressed_size'], plain['size'])
+            self.assertTrue(entry['size'] < plain['size'])
+            self.assertEqual(data[entry['start'] + entry['size']:][:1], b'\n')
+
+    def test_unknown_codec(self):
+        "Unknown codecs raise errors straight away"
+        with self.assertRaises(ValueError):
+            Writer(self.sink, codec='lzma')
+
+    def test_convert(self):
+        "Check we can convert a GeoJSON file"
+        source = pathlib.Path(self.tempdir.name) / 'source.geojson'
+        with open(source, 'w') as sink:
+            sink.write(FeatureCollection(make_features(50)).json())
+        header = convert(source, self.sink, collection_size=20)
+        self.assertEqual(header['features'], 50)
+        self.assertEqual(len(header['collections']), 3)
+        self.assertEqual(read_cogj(self.sink)[0], header)
+
+    def test_convert_jobs(self):
+        "Parallel conversion matches a serial run"
+        source = pathlib.Path(self.tempdir.name) / 'source.geojson'
+        with open(source, 'w') as sink:
+            sink.write(FeatureCollection(make_features(50)).json())
+        outputs = []
+        for jobs in (1, 2):
+            sink = pathlib.Path(self.tempdir.name) / 'output-{}.json'.format(jobs)
+            convert(source, sink, collection_size=10, jobs=jobs, process=drop_odd)
+            outputs.append(read_cogj(sink)[2])
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_convert_logging(self):
+        "We only say we're reprojecting when we are"
+        source = pathlib.Path(self.tempdir.name) / 'source.geojson'
+        with open(source, 'w') as sink:
+            sink.write(FeatureCollection(make_features(10)).json())
+        with self.assertLogs('cogj.writer', level='INFO') as logs:
+            convert(source, self.sink, process=drop_odd)
+        self.assertFalse(any('Reprojecting' in line for line in logs.output))
+
+if __name__ == '__main__':
+    unittest.main()